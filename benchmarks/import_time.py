@@ -0,0 +1,59 @@
+"""Measure the cold start cost of importing and using the client.
+
+Runs each scenario in a fresh interpreter, and prints the best time over
+several runs, minus the time to start an interpreter that does nothing::
+
+    python benchmarks/import_time.py --runs 20
+
+To see which modules the time goes to, use Python's own import profiler::
+
+    python -X importtime -c "import brreg.enhetsregisteret"
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+DATA_DIR = Path(__file__).parent.parent / "tests" / "data"
+
+SCENARIOS = {
+    "startup": "pass",
+    "import brreg.enhetsregisteret": "import brreg.enhetsregisteret",
+    "import EnhetQuery": "from brreg.enhetsregisteret import EnhetQuery",
+    "get_enhet": f"""
+import httpx2
+from brreg.enhetsregisteret import Client
+
+content = open({str(DATA_DIR / "enheter-details-response.json")!r}, "rb").read()
+transport = httpx2.MockTransport(lambda _: httpx2.Response(200, content=content))
+Client(transport=transport).get_enhet("112233445")
+""",
+}
+
+
+def best_time(code: str, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)  # noqa: S603
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    startup = best_time(SCENARIOS["startup"], args.runs)
+    print(f"{'startup':>30}: {startup * 1000:6.1f} ms")
+    for name, code in SCENARIOS.items():
+        if name != "startup":
+            seconds = best_time(code, args.runs) - startup
+            print(f"{name:>30}: {seconds * 1000:+6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Measure the memory saved by interning parsed enheter.
+
+Parses copies of the enhet in the test data, with and without an interner,
+and prints the memory held by the parsed objects::
+
+    python benchmarks/interning.py --items 100000
+"""
+
+import argparse
+import tracemalloc
+from pathlib import Path
+
+from brreg.enhetsregisteret import Enhet, Interner
+from brreg.enhetsregisteret._parsing import Parser
+
+DATA_DIR = Path(__file__).parent.parent / "tests" / "data"
+
+
+def memory_per_item(content: bytes, items: int, interner: Interner | None) -> float:
+    parser = Parser(interner=interner)
+    tracemalloc.start()
+    try:
+        enheter = [parser.model(Enhet, content) for _ in range(items)]
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del enheter
+    return size / items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100_000)
+    args = parser.parse_args()
+
+    content = (DATA_DIR / "enheter-details-response.json").read_bytes()
+    plain = memory_per_item(content, args.items, None)
+    interned = memory_per_item(content, args.items, Interner())
+    print(f"{args.items} items")
+    print(f"{'plain':>10}: {plain:7.0f} bytes per item")
+    print(f"{'interned':>10}: {interned:7.0f} bytes per item")
+
+
+if __name__ == "__main__":
+    main()
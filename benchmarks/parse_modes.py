@@ -0,0 +1,54 @@
+"""Measure the per-item cost of each parse mode.
+
+Parses a search results page of copies of the enhet in the test data, in each
+of the client's parse modes, and prints the best time per item::
+
+    python benchmarks/parse_modes.py --items 10000
+"""
+
+import argparse
+import json
+import timeit
+from pathlib import Path
+
+from brreg.enhetsregisteret import EnhetPage, ParseMode
+from brreg.enhetsregisteret._parsing import PARSE_MODES, Parser
+
+DATA_DIR = Path(__file__).parent.parent / "tests" / "data"
+
+
+def make_page(items: int) -> bytes:
+    enhet = json.loads((DATA_DIR / "enheter-details-response.json").read_bytes())
+    return json.dumps(
+        {
+            "_embedded": {"enheter": [enhet] * items},
+            "page": {
+                "size": items,
+                "totalElements": items,
+                "totalPages": 1,
+                "number": 0,
+            },
+        },
+    ).encode()
+
+
+def time_per_item(content: bytes, items: int, parse_mode: ParseMode) -> float:
+    parser = Parser(parse_mode)
+    timer = timeit.Timer(lambda: parser.page(EnhetPage, content))
+    return min(timer.repeat(repeat=5, number=1)) / items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10_000)
+    args = parser.parse_args()
+
+    content = make_page(args.items)
+    print(f"{args.items} items, {len(content) / args.items:.0f} bytes per item")
+    for parse_mode in PARSE_MODES:
+        seconds = time_per_item(content, args.items, parse_mode)
+        print(f"{parse_mode:>10}: {seconds * 1e6:7.1f} µs per item")
+
+
+if __name__ == "__main__":
+    main()
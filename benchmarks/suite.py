@@ -0,0 +1,272 @@
+"""Benchmark the parsing and pagination hot paths against a stored baseline.
+
+Runs each benchmark on data built from the recorded responses in the test
+data, and prints the throughput in items per second and the peak memory
+allocated per item. The results are compared to the stored baseline, and the
+script fails if any benchmark is slower, or allocates more, than the
+thresholds allow::
+
+    python benchmarks/suite.py
+    python benchmarks/suite.py -k page
+    python benchmarks/suite.py --save
+
+Timings are only comparable on the machine the baseline was recorded on, so
+save a new baseline before comparing changes on another machine. Even then,
+timings vary from run to run, so the threshold for them is loose, while the
+allocations are deterministic, and have a tight threshold.
+"""
+
+import argparse
+import json
+import re
+import sys
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import httpx2
+
+from brreg.enhetsregisteret import (
+    Client,
+    Enhet,
+    EnhetPage,
+    EnhetQuery,
+    RollerResponse,
+)
+
+DATA_DIR = Path(__file__).parent.parent / "tests" / "data"
+BASELINE = Path(__file__).parent / "baseline.json"
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A function to measure, and how many items it processes."""
+
+    name: str
+
+    # The number of items processed by each run.
+    items: int
+
+    # Prepares the data, and returns the function to measure.
+    setup: Callable[[], Callable[[], object]]
+
+
+@dataclass(frozen=True)
+class Result:
+    """The measurements of a benchmark."""
+
+    name: str
+    items_per_second: float
+    bytes_per_item: float
+
+
+def read_json(filename: str) -> Any:  # noqa: ANN401
+    return json.loads((DATA_DIR / filename).read_bytes())
+
+
+def make_page(items: int, *, page: int = 0, pages: int = 1) -> bytes:
+    enhet = read_json("enheter-details-response.json")
+    return json.dumps(
+        {
+            "_embedded": {"enheter": [enhet] * items},
+            "page": {
+                "size": items,
+                "totalElements": items * pages,
+                "totalPages": pages,
+                "number": page,
+            },
+        },
+    ).encode()
+
+
+def enhet_validate_json() -> Callable[[], object]:
+    content = (DATA_DIR / "enheter-details-response.json").read_bytes()
+    return lambda: Enhet.model_validate_json(content)
+
+
+def enhet_page(items: int) -> Callable[[], Callable[[], object]]:
+    def setup() -> Callable[[], object]:
+        content = make_page(items)
+        return lambda: EnhetPage.model_validate_json(content)
+
+    return setup
+
+
+BOARD_SIZE = 500
+
+
+def roller_large_board() -> Callable[[], object]:
+    response = read_json("enheter-roller-person-response.json")
+    (board,) = response["rollegrupper"]
+    (member,) = board["roller"]
+    board["roller"] = [{**member, "rekkefolge": i} for i in range(BOARD_SIZE)]
+    content = json.dumps(response).encode()
+    return lambda: RollerResponse.model_validate_json(content)
+
+
+def query_as_url_query() -> Callable[[], object]:
+    query = EnhetQuery(
+        navn="Sesam",
+        organisasjonsform=["AS", "ASA", "ENK"],
+        kommunenummer=["0301", "4601", "5001"],
+        konkurs=False,
+        fra_antall_ansatte=10,
+        size=100,
+    )
+    # Serialize each page, as the cursors do.
+    return lambda: query.model_copy(update={"page": 3}).as_url_query()
+
+
+CURSOR_PAGES = 10
+CURSOR_PAGE_SIZE = 100
+
+
+def cursor_items() -> Callable[[], object]:
+    pages = [
+        make_page(CURSOR_PAGE_SIZE, page=page, pages=CURSOR_PAGES)
+        for page in range(CURSOR_PAGES)
+    ]
+
+    def handler(request: httpx2.Request) -> httpx2.Response:
+        page = int(request.url.params.get("page", "0"))
+        return httpx2.Response(200, content=pages[page])
+
+    client = Client(transport=httpx2.MockTransport(handler))
+    query = EnhetQuery(navn="Sesam", size=CURSOR_PAGE_SIZE)
+    return lambda: sum(1 for _ in client.search_enhet(query).items)
+
+
+BENCHMARKS = [
+    Benchmark("Enhet.model_validate_json", 1, enhet_validate_json),
+    *(
+        Benchmark(f"EnhetPage[{items}]", items, enhet_page(items))
+        for items in (20, 100, 1000, 10_000)
+    ),
+    Benchmark(f"RollerResponse[{BOARD_SIZE} roller]", BOARD_SIZE, roller_large_board),
+    Benchmark("EnhetQuery.as_url_query", 1, query_as_url_query),
+    Benchmark(
+        f"Cursor.items[{CURSOR_PAGES}x{CURSOR_PAGE_SIZE}]",
+        CURSOR_PAGES * CURSOR_PAGE_SIZE,
+        cursor_items,
+    ),
+]
+
+
+def measure(benchmark: Benchmark, repeat: int) -> Result:
+    run = benchmark.setup()
+
+    # Run for at least 0.2 seconds per repetition, and keep the best time, as
+    # slower repetitions are slowed down by other processes.
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(
+        name=benchmark.name,
+        items_per_second=benchmark.items / seconds,
+        bytes_per_item=peak / benchmark.items,
+    )
+
+
+def regressions(
+    result: Result,
+    baseline: dict[str, float] | None,
+    *,
+    threshold: float,
+    alloc_threshold: float,
+) -> list[str]:
+    if baseline is None:
+        return []
+    problems = []
+    if result.items_per_second < baseline["items_per_second"] * (1 - threshold):
+        problems.append("slower")
+    if result.bytes_per_item > baseline["bytes_per_item"] * (1 + alloc_threshold):
+        problems.append("allocates more")
+    return problems
+
+
+def change(value: float, baseline: dict[str, float] | None, key: str) -> str:
+    if baseline is None:
+        return ""
+    return f"{value / baseline[key] - 1:+7.1%}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-k",
+        metavar="PATTERN",
+        help="only run the benchmarks with names matching this regex",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.4,
+        help="the largest allowed loss of throughput, as a fraction (default: 0.4)",
+    )
+    parser.add_argument(
+        "--alloc-threshold",
+        type=float,
+        default=0.05,
+        help="the largest allowed growth of allocations, as a fraction (default: 0.05)",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="store the results as the new baseline, instead of comparing",
+    )
+    args = parser.parse_args()
+
+    stored: dict[str, dict[str, float]] = {}
+    if args.baseline.exists():
+        stored = json.loads(args.baseline.read_text())
+
+    failed = False
+    results: dict[str, dict[str, float]] = {}
+    for benchmark in BENCHMARKS:
+        if args.k and not re.search(args.k, benchmark.name):
+            continue
+        result = measure(benchmark, args.repeat)
+        results[result.name] = {
+            "items_per_second": round(result.items_per_second),
+            "bytes_per_item": round(result.bytes_per_item, 1),
+        }
+        baseline = None if args.save else stored.get(result.name)
+        problems = regressions(
+            result,
+            baseline,
+            threshold=args.threshold,
+            alloc_threshold=args.alloc_threshold,
+        )
+        failed = failed or bool(problems)
+        print(
+            f"{result.name:>30}: "
+            f"{result.items_per_second:12,.0f} items/s "
+            f"{change(result.items_per_second, baseline, 'items_per_second')} "
+            f"{result.bytes_per_item:10,.0f} bytes/item "
+            f"{change(result.bytes_per_item, baseline, 'bytes_per_item')} "
+            f"{', '.join(problems).upper()}"
+        )
+
+    if args.save:
+        args.baseline.write_text(json.dumps({**stored, **results}, indent=2) + "\n")
+        print(f"Saved baseline to {args.baseline}")
+    elif failed:
+        print(f"Regressed beyond the thresholds from {args.baseline}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
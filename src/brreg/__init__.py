@@ -1,10 +1,5 @@
 """API client for Brønnøysundregistrene's open API."""
 
-from importlib.metadata import (  # pyright: ignore[reportMissingImports]
-    PackageNotFoundError,  # pyright: ignore[reportUnknownVariableType]
-    version,  # pyright: ignore[reportUnknownVariableType]
-)
-
 from brreg._exceptions import BrregError, BrregRestError
 
 __all__ = [
@@ -13,7 +8,21 @@ __all__ = [
     "BrregRestError",
 ]
 
-try:
-    __version__: str = version(__name__)  # pyright: ignore[reportUnknownVariableType]
-except PackageNotFoundError:  # pragma: no cover
-    __version__ = "unknown"
+
+def __getattr__(name: str) -> str:
+    # The version is looked up when first used, as importlib.metadata is slow
+    # to import.
+    if name == "__version__":
+        from importlib.metadata import (  # noqa: PLC0415  # pyright: ignore[reportMissingImports]
+            PackageNotFoundError,  # pyright: ignore[reportUnknownVariableType]
+            version,  # pyright: ignore[reportUnknownVariableType]
+        )
+
+        try:
+            value: str = version(__name__)  # pyright: ignore[reportUnknownVariableType]
+        except PackageNotFoundError:  # pragma: no cover
+            value = "unknown"
+        globals()["__version__"] = value
+        return value
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
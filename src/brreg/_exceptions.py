@@ -7,7 +7,11 @@ class BrregError(Exception):
 
 
 class BrregRestError(BrregError):
-    """REST API exception."""
+    """REST API exception.
+
+    If the client has a :class:`~brreg.enhetsregisteret.RetryPolicy`,
+    ``retries`` is the number of retries made before giving up.
+    """
 
     def __init__(
         self,
@@ -16,8 +20,10 @@ class BrregRestError(BrregError):
         method: str | None,
         url: str | None,
         status_code: int | None,
+        retries: int = 0,
     ) -> None:
         super().__init__(f"REST API exception: {msg}")
         self.method = method
         self.url = url
         self.status_code = status_code
+        self.retries = retries
@@ -3,46 +3,140 @@
 See https://data.brreg.no/enhetsregisteret/api/docs/index.html for API details.
 """
 
-from brreg.enhetsregisteret._client import Client
-from brreg.enhetsregisteret._pagination import Cursor, EnhetPage, Page, UnderenhetPage
-from brreg.enhetsregisteret._queries import EnhetQuery, Query, UnderenhetQuery
-from brreg.enhetsregisteret._responses import (
-    Adresse,
-    Enhet,
-    InstitusjonellSektor,
-    Naering,
-    Organisasjonsform,
-    Rolle,
-    RolleEnhet,
-    RolleGruppe,
-    RolleGruppeType,
-    RollePerson,
-    RollePersonNavn,
-    RollerResponse,
-    RolleType,
-    Underenhet,
-)
-from brreg.enhetsregisteret._types import (
-    Kommunenummer,
-    KommunenummerValidator,
-    Organisasjonsnummer,
-    OrganisasjonsnummerValidator,
-    Postnummer,
-    PostnummerValidator,
-    Sektorkode,
-    SektorkodeValidator,
-)
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from brreg.enhetsregisteret._bulk import read_enheter, read_underenheter
+    from brreg.enhetsregisteret._cache import (
+        Cache,
+        CacheEntry,
+        MemoryCache,
+        SqliteCache,
+    )
+    from brreg.enhetsregisteret._client import AsyncClient, Client
+    from brreg.enhetsregisteret._columnar import (
+        ColumnarTable,
+        EnhetTable,
+        UnderenhetTable,
+    )
+    from brreg.enhetsregisteret._downloads import DumpFile
+    from brreg.enhetsregisteret._feeds import (
+        ChangeEvent,
+        ChangeType,
+        Checkpoint,
+        FileCheckpoint,
+    )
+    from brreg.enhetsregisteret._instrumentation import (
+        EndpointStats,
+        Histogram,
+        RequestEvent,
+        RequestHook,
+        RequestStats,
+    )
+    from brreg.enhetsregisteret._interning import Interner
+    from brreg.enhetsregisteret._limiter import AdaptiveLimiter, LimitChange, Outcome
+    from brreg.enhetsregisteret._mirror import Mirror, MirrorStatus
+    from brreg.enhetsregisteret._pagination import (
+        AsyncCursor,
+        Cursor,
+        EnhetPage,
+        OppdateringPage,
+        Page,
+        UnderenhetPage,
+    )
+    from brreg.enhetsregisteret._parsing import ParseMode
+    from brreg.enhetsregisteret._queries import (
+        EnhetQuery,
+        OppdateringQuery,
+        Query,
+        UnderenhetQuery,
+    )
+    from brreg.enhetsregisteret._responses import (
+        Adresse,
+        Enhet,
+        InstitusjonellSektor,
+        Naering,
+        Oppdatering,
+        Organisasjonsform,
+        Rolle,
+        RolleEnhet,
+        RolleGruppe,
+        RolleGruppeType,
+        RollePerson,
+        RollePersonNavn,
+        RollerResponse,
+        RolleType,
+        Underenhet,
+    )
+    from brreg.enhetsregisteret._retry import RetryPolicy
+    from brreg.enhetsregisteret._types import (
+        CheckedOrganisasjonsnummer,
+        CheckedOrganisasjonsnummerValidator,
+        Kommunenummer,
+        KommunenummerValidator,
+        Organisasjonsnummer,
+        OrganisasjonsnummerValidator,
+        Postnummer,
+        PostnummerValidator,
+        Sektorkode,
+        SektorkodeValidator,
+    )
+    from brreg.enhetsregisteret._validation import (
+        ValidatedOrganisasjonsnumre,
+        validate_organisasjonsnumre,
+    )
 
 __all__ = [  # noqa: RUF022
+    # From _bulk module:
+    "read_enheter",
+    "read_underenheter",
+    # From _cache module:
+    "Cache",
+    "CacheEntry",
+    "MemoryCache",
+    "SqliteCache",
     # From _client module:
+    "AsyncClient",
     "Client",
+    # From _columnar module, which requires numpy:
+    "ColumnarTable",
+    "EnhetTable",
+    "UnderenhetTable",
+    # From _downloads module:
+    "DumpFile",
+    # From _feeds module:
+    "ChangeEvent",
+    "ChangeType",
+    "Checkpoint",
+    "FileCheckpoint",
+    # From _instrumentation module:
+    "EndpointStats",
+    "Histogram",
+    "RequestEvent",
+    "RequestHook",
+    "RequestStats",
+    # From _interning module:
+    "Interner",
+    # From _limiter module:
+    "AdaptiveLimiter",
+    "LimitChange",
+    "Outcome",
+    # From _mirror module:
+    "Mirror",
+    "MirrorStatus",
     # From _pagination module:
+    "AsyncCursor",
     "Cursor",
     "EnhetPage",
+    "OppdateringPage",
     "Page",
     "UnderenhetPage",
+    # From _parsing module:
+    "ParseMode",
     # From _queries module:
     "EnhetQuery",
+    "OppdateringQuery",
     "Query",
     "UnderenhetQuery",
     # From _responses module:
@@ -50,6 +144,7 @@ __all__ = [  # noqa: RUF022
     "Enhet",
     "InstitusjonellSektor",
     "Naering",
+    "Oppdatering",
     "Organisasjonsform",
     "Underenhet",
     "Rolle",
@@ -60,7 +155,11 @@ __all__ = [  # noqa: RUF022
     "RollePersonNavn",
     "RollerResponse",
     "RolleType",
+    # From _retry module:
+    "RetryPolicy",
     # From _types module:
+    "CheckedOrganisasjonsnummer",
+    "CheckedOrganisasjonsnummerValidator",
     "Kommunenummer",
     "KommunenummerValidator",
     "Organisasjonsnummer",
@@ -69,4 +168,93 @@ __all__ = [  # noqa: RUF022
     "PostnummerValidator",
     "Sektorkode",
     "SektorkodeValidator",
+    # From _validation module, which requires numpy:
+    "ValidatedOrganisasjonsnumre",
+    "validate_organisasjonsnumre",
 ]
+
+# Where each name is defined. The modules are imported when one of their
+# names is first used, so that importing the package is fast, and optional
+# dependencies are only needed by the names that use them.
+_EXPORTS = {
+    "read_enheter": "_bulk",
+    "read_underenheter": "_bulk",
+    "Cache": "_cache",
+    "CacheEntry": "_cache",
+    "MemoryCache": "_cache",
+    "SqliteCache": "_cache",
+    "AsyncClient": "_client",
+    "Client": "_client",
+    "ColumnarTable": "_columnar",
+    "EnhetTable": "_columnar",
+    "UnderenhetTable": "_columnar",
+    "DumpFile": "_downloads",
+    "ChangeEvent": "_feeds",
+    "ChangeType": "_feeds",
+    "Checkpoint": "_feeds",
+    "FileCheckpoint": "_feeds",
+    "EndpointStats": "_instrumentation",
+    "Histogram": "_instrumentation",
+    "RequestEvent": "_instrumentation",
+    "RequestHook": "_instrumentation",
+    "RequestStats": "_instrumentation",
+    "Interner": "_interning",
+    "AdaptiveLimiter": "_limiter",
+    "LimitChange": "_limiter",
+    "Outcome": "_limiter",
+    "Mirror": "_mirror",
+    "MirrorStatus": "_mirror",
+    "AsyncCursor": "_pagination",
+    "Cursor": "_pagination",
+    "EnhetPage": "_pagination",
+    "OppdateringPage": "_pagination",
+    "Page": "_pagination",
+    "UnderenhetPage": "_pagination",
+    "ParseMode": "_parsing",
+    "EnhetQuery": "_queries",
+    "OppdateringQuery": "_queries",
+    "Query": "_queries",
+    "UnderenhetQuery": "_queries",
+    "Adresse": "_responses",
+    "Enhet": "_responses",
+    "InstitusjonellSektor": "_responses",
+    "Naering": "_responses",
+    "Oppdatering": "_responses",
+    "Organisasjonsform": "_responses",
+    "Rolle": "_responses",
+    "RolleEnhet": "_responses",
+    "RolleGruppe": "_responses",
+    "RolleGruppeType": "_responses",
+    "RollePerson": "_responses",
+    "RollePersonNavn": "_responses",
+    "RollerResponse": "_responses",
+    "RolleType": "_responses",
+    "Underenhet": "_responses",
+    "RetryPolicy": "_retry",
+    "CheckedOrganisasjonsnummer": "_types",
+    "CheckedOrganisasjonsnummerValidator": "_types",
+    "Kommunenummer": "_types",
+    "KommunenummerValidator": "_types",
+    "Organisasjonsnummer": "_types",
+    "OrganisasjonsnummerValidator": "_types",
+    "Postnummer": "_types",
+    "PostnummerValidator": "_types",
+    "Sektorkode": "_types",
+    "SektorkodeValidator": "_types",
+    "ValidatedOrganisasjonsnumre": "_validation",
+    "validate_organisasjonsnumre": "_validation",
+}
+
+
+def __getattr__(name: str) -> object:
+    if name in _EXPORTS:
+        module = importlib.import_module(f"{__name__}.{_EXPORTS[name]}")
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
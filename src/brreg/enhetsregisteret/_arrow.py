@@ -0,0 +1,137 @@
+import datetime as dt
+import functools
+import json
+import types
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, get_args, get_origin
+
+try:
+    import pyarrow as pa
+except ImportError as exc:  # pragma: no cover
+    msg = "Arrow export requires pyarrow: pip install brreg[arrow]"
+    raise ImportError(msg) from exc
+
+from pydantic import BaseModel
+
+__all__: list[str] = []
+
+
+# Columns with few distinct values, which are stored once per table instead
+# of once per row.
+DICTIONARY_COLUMNS = frozenset({"organisasjonsform.kode"})
+
+ARROW_TYPES: dict[Any, pa.DataType] = {
+    str: pa.string(),
+    int: pa.int64(),
+    bool: pa.bool_(),
+    dt.date: pa.date32(),
+    dt.datetime: pa.timestamp("ms", tz="UTC"),
+    list: pa.list_(pa.string()),
+}
+
+
+@dataclass(frozen=True)
+class ArrowColumn:
+    """A column of a flattened model, and where to find it in the JSON."""
+
+    #: The column name, with nested fields joined by dots.
+    name: str
+
+    #: The keys to follow from a JSON record to the column's value.
+    path: tuple[str, ...]
+
+    #: The column type.
+    type: pa.DataType
+
+
+@functools.cache
+def arrow_columns(
+    model: type[BaseModel],
+    prefix: tuple[str, ...] = (),
+) -> tuple[ArrowColumn, ...]:
+    """Get the columns of a model, with nested models flattened."""
+    columns: list[ArrowColumn] = []
+    for name, field in model.model_fields.items():
+        path = (*prefix, field.alias or name)
+        annotation = without_none(field.annotation)
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            columns.extend(arrow_columns(annotation, path))
+            continue
+        column_name = ".".join(path)
+        if column_name in DICTIONARY_COLUMNS:
+            arrow_type = pa.dictionary(pa.int32(), pa.string())
+        else:
+            arrow_type = ARROW_TYPES[get_origin(annotation) or annotation]
+        columns.append(ArrowColumn(column_name, path, arrow_type))
+    return tuple(columns)
+
+
+def without_none(annotation: Any) -> Any:  # noqa: ANN401
+    if isinstance(annotation, types.UnionType):
+        (annotation,) = (arg for arg in get_args(annotation) if arg is not type(None))
+    return annotation
+
+
+def arrow_schema(model: type[BaseModel]) -> pa.Schema:
+    """Get the Arrow schema of a model, with nested models flattened."""
+    return pa.schema([(column.name, column.type) for column in arrow_columns(model)])
+
+
+def records_to_arrow(
+    records: Sequence[dict[str, Any]],
+    model: type[BaseModel],
+) -> pa.Table:
+    """Convert JSON records to an Arrow table, without validating them."""
+    arrays = [
+        column_array([dig(record, column.path) for record in records], column.type)
+        for column in arrow_columns(model)
+    ]
+    return pa.Table.from_arrays(arrays, schema=arrow_schema(model))
+
+
+def page_to_arrow(
+    content: bytes,
+    model: type[BaseModel],
+    keys: Sequence[str],
+) -> pa.Table:
+    """Convert the JSON of one page of search results to an Arrow table.
+
+    :param content: The response body.
+    :param model: The type of the items on the page.
+    :param keys: The possible keys of the items under ``_embedded``.
+    """
+    embedded: dict[str, list[dict[str, Any]]] = json.loads(content).get("_embedded", {})
+    records = next((embedded[key] for key in keys if key in embedded), [])
+    return records_to_arrow(records, model)
+
+
+def concat_tables(tables: Sequence[pa.Table]) -> pa.Table:
+    """Concatenate tables with the same schema, sharing their dictionaries."""
+    return pa.concat_tables(tables).unify_dictionaries()
+
+
+def dig(record: dict[str, Any], path: tuple[str, ...]) -> Any:  # noqa: ANN401
+    value: Any = record
+    for key in path:
+        if value is None:
+            return None
+        value = value.get(key)
+    return value
+
+
+def column_array(values: list[Any], arrow_type: pa.DataType) -> pa.Array:
+    if pa.types.is_temporal(arrow_type):
+        # The API sends dates as ISO 8601 strings, and missing dates as empty
+        # strings, which Arrow parses in bulk.
+        strings = pa.array([value or None for value in values], pa.string())
+        return strings.cast(arrow_type)
+    if pa.types.is_dictionary(arrow_type):
+        return pa.array(values, pa.string()).dictionary_encode()
+    try:
+        return pa.array(values, arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Like the models, accept numbers and booleans sent as strings, e.g.
+        # the year of the last annual accounts.
+        strings = pa.array([None if v is None else str(v) for v in values])
+        return strings.cast(arrow_type)
@@ -0,0 +1,291 @@
+import codecs
+import csv
+import io
+import itertools
+import json
+import os
+import zlib
+from collections.abc import Iterable, Iterator
+from typing import Any, Literal, TypeVar
+
+from pydantic import BaseModel
+
+from brreg import BrregError
+from brreg.enhetsregisteret._interning import Interner
+from brreg.enhetsregisteret._parsing import ParseMode, Parser
+from brreg.enhetsregisteret._responses import Enhet, Underenhet
+
+__all__ = [
+    "BulkDataset",
+    "BulkFormat",
+    "read_enheter",
+    "read_underenheter",
+]
+
+
+M = TypeVar("M", bound=BaseModel)
+
+#: The registers that are available as bulk dumps.
+BulkDataset = Literal["enheter", "underenheter"]
+
+#: The file formats the bulk dumps are available in.
+BulkFormat = Literal["json", "csv"]
+
+DUMP_MEDIA_TYPES: dict[tuple[BulkDataset, BulkFormat], str] = {
+    ("enheter", "json"): (
+        "application/vnd.brreg.enhetsregisteret.enhet.v2+gzip;charset=UTF-8"
+    ),
+    ("enheter", "csv"): "text/csv",
+    ("underenheter", "json"): (
+        "application/vnd.brreg.enhetsregisteret.underenhet.v2+gzip;charset=UTF-8"
+    ),
+    ("underenheter", "csv"): "text/csv",
+}
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Give up if a single JSON array element grows beyond this size, instead of
+# buffering the rest of a malformed file.
+MAX_ELEMENT_SIZE = 16 * 1024 * 1024
+
+# CSV columns that hold a single value, but are lists in the JSON format.
+CSV_LIST_COLUMNS = {
+    "adresse",
+    "aktivitet",
+    "frivilligMvaRegistrertBeskrivelser",
+    "vedtektsfestetFormaal",
+}
+
+JSON_WHITESPACE = " \t\n\r"
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def dump_request(dataset: BulkDataset, file_format: BulkFormat) -> tuple[str, str]:
+    """Get the URL path and media type of a bulk dump."""
+    path = f"/{dataset}/lastned" if file_format == "json" else f"/{dataset}/lastned/csv"
+    return path, DUMP_MEDIA_TYPES[(dataset, file_format)]
+
+
+def gunzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Decompress a stream of chunks, if it is gzipped.
+
+    Data that does not start with the gzip magic number is passed through
+    unchanged, so that the caller does not need to know whether the transport
+    already decompressed the data.
+    """
+    chunks = iter(chunks)
+    first = b""
+    for chunk in chunks:
+        first += chunk
+        if len(first) >= len(GZIP_MAGIC):
+            break
+
+    if not first.startswith(GZIP_MAGIC):
+        if first:
+            yield first
+        yield from chunks
+        return
+
+    decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in itertools.chain([first], chunks):
+        data = chunk
+        while data:
+            yield decompressor.decompress(data)
+            # A gzip file may consist of several concatenated members.
+            data = decompressor.unused_data
+            if data:
+                decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    yield decompressor.flush()
+    if not decompressor.eof:
+        msg = "Truncated gzip data"
+        raise BrregError(msg)
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Incrementally parse the elements of a JSON array.
+
+    Only the current element is buffered, so the whole array is never held in
+    memory at once.
+    """
+    parser = JsonArrayParser()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    for chunk in chunks:
+        yield from parser.feed(text_decoder.decode(chunk))
+    yield from parser.feed(text_decoder.decode(b"", final=True), final=True)
+
+
+class JsonArrayParser:
+    """Push parser for the elements of a JSON array."""
+
+    def __init__(self) -> None:
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        # One of "start", "value_or_end", "value", "separator", or "end".
+        self._state = "start"
+
+    def feed(self, text: str, *, final: bool = False) -> Iterator[Any]:
+        """Add more text, and yield the elements that are now complete."""
+        buffer = self._buffer + text
+        pos = 0
+        try:
+            while True:
+                while pos < len(buffer) and buffer[pos] in JSON_WHITESPACE:
+                    pos += 1
+                if pos == len(buffer):
+                    break
+                if self._state in ("value_or_end", "value") and buffer[pos] != "]":
+                    try:
+                        value, pos = self._decoder.raw_decode(buffer, pos)
+                    except json.JSONDecodeError as exc:
+                        if final or len(buffer) - pos > MAX_ELEMENT_SIZE:
+                            msg = f"Malformed JSON array: {exc}"
+                            raise BrregError(msg) from exc
+                        # The element continues in the next chunk.
+                        break
+                    self._state = "separator"
+                    yield value
+                else:
+                    self._advance(buffer[pos])
+                    pos += 1
+        finally:
+            self._buffer = buffer[pos:]
+
+        if final and self._state != "end":
+            msg = "Malformed JSON array: unexpected end of data"
+            raise BrregError(msg)
+
+    def _advance(self, char: str) -> None:
+        match (self._state, char):
+            case ("start", "["):
+                self._state = "value_or_end"
+            case ("value_or_end" | "separator", "]"):
+                self._state = "end"
+            case ("separator", ","):
+                self._state = "value"
+            case _:
+                msg = f"Malformed JSON array: unexpected {char!r}"
+                raise BrregError(msg)
+
+
+class ChunkReader(io.RawIOBase):
+    """Read-only file object on top of an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._rest = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:  # noqa: ANN401
+        while not self._rest:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._rest = chunk
+        size = min(len(buffer), len(self._rest))
+        buffer[:size] = self._rest[:size]
+        self._rest = self._rest[size:]
+        return size
+
+
+def iter_csv_records(chunks: Iterable[bytes]) -> Iterator[dict[str, Any]]:
+    """Incrementally parse CSV rows into nested dicts.
+
+    The column names are dotted JSON paths, like ``forretningsadresse.poststed``,
+    which are expanded to nested dicts, so that the records have the same
+    shape as the JSON format. Empty values are left out.
+    """
+    text = io.TextIOWrapper(
+        io.BufferedReader(ChunkReader(chunks)),
+        encoding="utf-8",
+        newline="",
+    )
+    for row in csv.DictReader(text):
+        record: dict[str, Any] = {}
+        for column, value in row.items():
+            if not value:
+                continue
+            *parents, name = column.split(".")
+            target = record
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[name] = [value] if name in CSV_LIST_COLUMNS else value
+        yield record
+
+
+def iter_bulk(
+    chunks: Iterable[bytes],
+    model: type[M],
+    file_format: BulkFormat,
+    *,
+    parser: Parser | None = None,
+) -> Iterator[M]:
+    """Parse a possibly gzipped bulk dump into models, one at a time."""
+    data = gunzip(chunks)
+    records = iter_json_array(data) if file_format == "json" else iter_csv_records(data)
+    parser = parser or Parser()
+    for record in records:
+        yield parser.record(model, record)
+
+
+def read_chunks(path: str | os.PathLike[str]) -> Iterator[bytes]:
+    """Read a file in chunks."""
+    with open(path, "rb") as f:  # noqa: PTH123
+        while chunk := f.read(READ_CHUNK_SIZE):
+            yield chunk
+
+
+def read_enheter(
+    path: str | os.PathLike[str],
+    *,
+    file_format: BulkFormat = "json",
+    parse_mode: ParseMode = "validate",
+    interner: Interner | None = None,
+) -> Iterator[Enhet]:
+    """Read all :class:`Enhet` from a local copy of the bulk dump.
+
+    The file is parsed incrementally, like :meth:`Client.download_enheter`
+    does with the network stream.
+
+    :param path: Path to the dump, e.g. :attr:`DumpFile.path`. The file may
+        be gzipped or not.
+    :param file_format: Whether the dump is in the ``"json"`` or ``"csv"``
+        format.
+    :param parse_mode: How to parse the entities. See :data:`ParseMode`.
+    :param interner: Optional :class:`Interner`, to share equal values
+        between the entities.
+    """
+    return iter_bulk(
+        read_chunks(path),
+        Enhet,
+        file_format,
+        parser=Parser(parse_mode, interner),
+    )
+
+
+def read_underenheter(
+    path: str | os.PathLike[str],
+    *,
+    file_format: BulkFormat = "json",
+    parse_mode: ParseMode = "validate",
+    interner: Interner | None = None,
+) -> Iterator[Underenhet]:
+    """Read all :class:`Underenhet` from a local copy of the bulk dump.
+
+    See :func:`read_enheter` for details.
+
+    :param path: Path to the dump. The file may be gzipped or not.
+    :param file_format: Whether the dump is in the ``"json"`` or ``"csv"``
+        format.
+    :param parse_mode: How to parse the entities. See :data:`ParseMode`.
+    :param interner: Optional :class:`Interner`, to share equal values
+        between the entities.
+    """
+    return iter_bulk(
+        read_chunks(path),
+        Underenhet,
+        file_format,
+        parser=Parser(parse_mode, interner),
+    )
@@ -0,0 +1,399 @@
+import abc
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Literal, cast
+
+from brreg.enhetsregisteret._sqlite import ThreadLocalConnections, incremental_vacuum
+
+__all__ = [
+    "Cache",
+    "CacheEntry",
+    "MemoryCache",
+    "SqliteCache",
+]
+
+
+#: The endpoints that responses are cached for.
+Endpoint = Literal["enhet", "underenhet", "roller"]
+
+# Responses with these status codes are cached as "not found".
+NOT_FOUND_STATUS_CODES = (404, 410)
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """A cached response."""
+
+    #: The HTTP status code of the response.
+    status_code: int
+
+    #: The raw response body. Empty for "not found" responses.
+    content: bytes
+
+    #: When the response was fetched, as a Unix timestamp.
+    fetched_at: float
+
+    #: The parsed response, if the cache stores parsed models.
+    parsed: object = None
+
+    @property
+    def not_found(self) -> bool:
+        """Whether the entry records that the organization was not found."""
+        return self.status_code in NOT_FOUND_STATUS_CODES
+
+
+class Cache(abc.ABC):
+    """Base class for response caches.
+
+    A cache stores the responses from :meth:`Client.get_enhet`,
+    :meth:`Client.get_underenhet` and :meth:`Client.get_roller`, keyed by
+    endpoint and organization number. "Not found" responses are cached too,
+    with their own TTL.
+
+    Subclasses implement the storage by overriding :meth:`_load` and
+    :meth:`_store`.
+
+    :param ttl: How long to keep responses, in seconds. Either one value for
+        all endpoints, or a mapping from endpoint name (``"enhet"``,
+        ``"underenhet"`` or ``"roller"``) to TTL. Endpoints missing from the
+        mapping are not cached, not even their "not found" responses.
+    :param negative_ttl: How long to keep "not found" responses, in seconds.
+        If zero, "not found" responses are not cached.
+    """
+
+    #: The number of lookups that were served from the cache.
+    hits: int
+
+    #: The number of lookups that were not found in the cache.
+    misses: int
+
+    def __init__(
+        self,
+        *,
+        ttl: float | Mapping[Endpoint, float] = 3600,
+        negative_ttl: float = 300,
+    ) -> None:
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def ttl_for(self, endpoint: Endpoint, entry: CacheEntry) -> float:
+        """Get the TTL, in seconds, for a response from the given endpoint."""
+        if isinstance(self._ttl, Mapping) and endpoint not in self._ttl:
+            return 0
+        if entry.not_found:
+            return self._negative_ttl
+        if isinstance(self._ttl, Mapping):
+            return self._ttl[endpoint]
+        return self._ttl
+
+    def get(self, endpoint: Endpoint, organisasjonsnummer: str) -> CacheEntry | None:
+        """Get a cached response, or ``None`` if missing or expired."""
+        entry = self._load(endpoint, organisasjonsnummer, now=time.time())
+        with self._stats_lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def set(
+        self,
+        endpoint: Endpoint,
+        organisasjonsnummer: str,
+        entry: CacheEntry,
+    ) -> None:
+        """Cache a response."""
+        ttl = self.ttl_for(endpoint, entry)
+        if ttl <= 0:
+            return
+        self._store(
+            endpoint,
+            organisasjonsnummer,
+            entry,
+            expires_at=entry.fetched_at + ttl,
+        )
+
+    @abc.abstractmethod
+    def _load(
+        self,
+        endpoint: Endpoint,
+        organisasjonsnummer: str,
+        *,
+        now: float,
+    ) -> CacheEntry | None:
+        """Load an entry that has not expired by ``now``."""
+
+    @abc.abstractmethod
+    def _store(
+        self,
+        endpoint: Endpoint,
+        organisasjonsnummer: str,
+        entry: CacheEntry,
+        *,
+        expires_at: float,
+    ) -> None:
+        """Store an entry until ``expires_at``."""
+
+
+class MemoryCache(Cache):
+    """In-process response cache with TTL and LRU eviction.
+
+    Example::
+
+        cache = MemoryCache(max_entries=10_000, ttl={"enhet": 3600})
+        client = Client(cache=cache)
+
+    :param max_entries: The maximum number of entries to keep. When full, the
+        least recently used entry is evicted.
+    :param store: Whether to store the ``"raw"`` response bodies, which are
+        parsed again on each hit, or the ``"parsed"`` models, which are shared
+        between all callers that hit the same entry. Parsed models should
+        then be treated as read-only. Only validated models are stored, so
+        responses to clients with other parse modes are stored raw.
+    :param ttl: See :class:`Cache`.
+    :param negative_ttl: See :class:`Cache`.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 10_000,
+        store: Literal["raw", "parsed"] = "raw",
+        ttl: float | Mapping[Endpoint, float] = 3600,
+        negative_ttl: float = 300,
+    ) -> None:
+        super().__init__(ttl=ttl, negative_ttl=negative_ttl)
+        self.max_entries = max_entries
+        self.store = store
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[Endpoint, str], tuple[CacheEntry, float]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def _load(
+        self,
+        endpoint: Endpoint,
+        organisasjonsnummer: str,
+        *,
+        now: float,
+    ) -> CacheEntry | None:
+        key = (endpoint, organisasjonsnummer)
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            entry, expires_at = item
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _store(
+        self,
+        endpoint: Endpoint,
+        organisasjonsnummer: str,
+        entry: CacheEntry,
+        *,
+        expires_at: float,
+    ) -> None:
+        if self.store == "parsed" and entry.parsed is not None:
+            # There is no need to keep the raw content around.
+            entry = CacheEntry(entry.status_code, b"", entry.fetched_at, entry.parsed)
+        else:
+            entry = CacheEntry(entry.status_code, entry.content, entry.fetched_at)
+        key = (endpoint, organisasjonsnummer)
+        with self._lock:
+            self._entries[key] = (entry, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SqliteCache(Cache):
+    """Response cache stored in a SQLite database file.
+
+    The cache can be shared by many threads and processes on the same host,
+    e.g. all workers of a web server, so that a response fetched by one
+    worker is reused by the others. The database uses write-ahead logging, so
+    that readers do not block writers.
+
+    Expired entries are only removed by :meth:`vacuum`, which also trims the
+    cache to ``max_entries``. It runs automatically every ``vacuum_interval``
+    writes from this process.
+
+    Example::
+
+        cache = SqliteCache("/var/cache/brreg.sqlite3", max_entries=1_000_000)
+        client = Client(cache=cache)
+
+    :param path: Path to the database file. It is created if it does not
+        exist.
+    :param max_entries: The maximum number of entries to keep after vacuuming.
+        The entries fetched longest ago are removed first. If ``None``, only
+        expired entries are removed.
+    :param vacuum_interval: The number of writes between automatic vacuums.
+    :param timeout: How long to wait for other processes' locks, in seconds.
+    :param ttl: See :class:`Cache`.
+    :param negative_ttl: See :class:`Cache`.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        path: str | os.PathLike[str],
+        *,
+        max_entries: int | None = None,
+        vacuum_interval: int = 1000,
+        timeout: float = 30.0,
+        ttl: float | Mapping[Endpoint, float] = 3600,
+        negative_ttl: float = 300,
+    ) -> None:
+        super().__init__(ttl=ttl, negative_ttl=negative_ttl)
+        self.path = os.fspath(path)
+        self.max_entries = max_entries
+        self.vacuum_interval = vacuum_interval
+        self._connections = ThreadLocalConnections(self.path, timeout=timeout)
+        self._writes_lock = threading.Lock()
+        self._writes = 0
+
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    endpoint TEXT NOT NULL,
+                    organisasjonsnummer TEXT NOT NULL,
+                    status_code INTEGER NOT NULL,
+                    content BLOB NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (endpoint, organisasjonsnummer)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_fetched_at "
+                "ON responses (fetched_at)"
+            )
+
+    def __len__(self) -> int:
+        row = self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()
+        return cast("int", row[0])
+
+    def _connection(self) -> sqlite3.Connection:
+        return self._connections.get()
+
+    def close(self) -> None:
+        """Close all database connections opened by this cache."""
+        self._connections.close()
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM responses")
+
+    def vacuum(self) -> int:
+        """Remove expired entries, and trim the cache to ``max_entries``.
+
+        :returns: The number of removed entries.
+        """
+        conn = self._connection()
+        with conn:
+            removed = conn.execute(
+                "DELETE FROM responses WHERE expires_at <= ?",
+                (time.time(),),
+            ).rowcount
+            if self.max_entries is not None:
+                removed += conn.execute(
+                    """
+                    DELETE FROM responses
+                    WHERE (endpoint, organisasjonsnummer) IN (
+                        SELECT endpoint, organisasjonsnummer
+                        FROM responses
+                        ORDER BY fetched_at DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,),
+                ).rowcount
+        # Return the freed pages to the file system.
+        incremental_vacuum(conn)
+        return removed
+
+    def _load(
+        self,
+        endpoint: Endpoint,
+        organisasjonsnummer: str,
+        *,
+        now: float,
+    ) -> CacheEntry | None:
+        row = (
+            self._connection()
+            .execute(
+                """
+                SELECT status_code, content, fetched_at
+                FROM responses
+                WHERE endpoint = ? AND organisasjonsnummer = ? AND expires_at > ?
+                """,
+                (endpoint, organisasjonsnummer, now),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        status_code, content, fetched_at = row
+        return CacheEntry(status_code, content, fetched_at)
+
+    def _store(
+        self,
+        endpoint: Endpoint,
+        organisasjonsnummer: str,
+        entry: CacheEntry,
+        *,
+        expires_at: float,
+    ) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO responses (
+                    endpoint,
+                    organisasjonsnummer,
+                    status_code,
+                    content,
+                    fetched_at,
+                    expires_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    endpoint,
+                    organisasjonsnummer,
+                    entry.status_code,
+                    entry.content,
+                    entry.fetched_at,
+                    expires_at,
+                ),
+            )
+        with self._writes_lock:
+            self._writes += 1
+            vacuum_due = self._writes % self.vacuum_interval == 0
+        if vacuum_due:
+            self.vacuum()
@@ -1,25 +1,184 @@
-from collections.abc import Generator
+import asyncio
+import dataclasses
+import datetime as dt
+import functools
+import os
+import time
+import urllib.request
+from collections.abc import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+)
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from dataclasses import dataclass
 from types import TracebackType
-from typing import Any
+from typing import Any, Generic, TypeVar, cast
 
 import httpx2
+import pydantic_core
+from pydantic import BaseModel
 
 import brreg
 from brreg import BrregError, BrregRestError
-from brreg.enhetsregisteret._pagination import Cursor, EnhetPage, UnderenhetPage
-from brreg.enhetsregisteret._queries import EnhetQuery, UnderenhetQuery
+from brreg.enhetsregisteret._bulk import (
+    BulkDataset,
+    BulkFormat,
+    dump_request,
+    iter_bulk,
+)
+from brreg.enhetsregisteret._cache import (
+    NOT_FOUND_STATUS_CODES,
+    Cache,
+    CacheEntry,
+    Endpoint,
+)
+from brreg.enhetsregisteret._coalescing import AsyncSingleFlight, SingleFlight
+from brreg.enhetsregisteret._downloads import DumpFile, DumpFiles
+from brreg.enhetsregisteret._feeds import ChangeEvent, Checkpoint, iter_changes
+from brreg.enhetsregisteret._instrumentation import (
+    RequestHook,
+    async_trace_extensions,
+    observe,
+    parsing,
+    record_cache,
+    record_response,
+    trace_extensions,
+)
+from brreg.enhetsregisteret._interning import Interner
+from brreg.enhetsregisteret._limiter import (
+    AdaptiveLimiter,
+    AsyncLimitedTransport,
+    LimitedTransport,
+)
+from brreg.enhetsregisteret._pagination import (
+    SEARCH_WINDOW,
+    AsyncCursor,
+    Count,
+    Cursor,
+    EnhetPage,
+    OppdateringPage,
+    RawSearch,
+    UnderenhetPage,
+)
+from brreg.enhetsregisteret._parsing import ParseMode, Parser
+from brreg.enhetsregisteret._partitioning import async_iter_all, iter_all
+from brreg.enhetsregisteret._queries import (
+    EnhetQuery,
+    OppdateringQuery,
+    Query,
+    UnderenhetQuery,
+)
 from brreg.enhetsregisteret._responses import (
     Enhet,
+    Oppdatering,
     RolleGruppe,
     RollerResponse,
     Underenhet,
 )
+from brreg.enhetsregisteret._retry import (
+    AsyncRetryTransport,
+    RetryPolicy,
+    RetryTransport,
+    retries_of,
+)
 from brreg.enhetsregisteret._types import (
     Organisasjonsnummer,
     OrganisasjonsnummerValidator,
 )
 
+A = TypeVar("A")
+E = TypeVar("E", Enhet, Underenhet)
+M = TypeVar("M", bound=BaseModel)
+Q = TypeVar("Q", bound=Query)
+R = TypeVar("R")
+T = TypeVar("T")
+
+BASE_URL = "https://data.brreg.no/enhetsregisteret/api"
+
+ENHET_MEDIA_TYPE = "application/vnd.brreg.enhetsregisteret.enhet.v2+json;charset=UTF-8"
+UNDERENHET_MEDIA_TYPE = (
+    "application/vnd.brreg.enhetsregisteret.underenhet.v2+json;charset=UTF-8"
+)
+OPPDATERING_ENHET_MEDIA_TYPE = (
+    "application/vnd.brreg.enhetsregisteret.oppdatering.enhet.v1+json;charset=UTF-8"
+)
+OPPDATERING_UNDERENHET_MEDIA_TYPE = (
+    "application/vnd.brreg.enhetsregisteret.oppdatering.underenhet.v1+json"
+    ";charset=UTF-8"
+)
+ROLLE_MEDIA_TYPE = "application/vnd.brreg.enhetsregisteret.rolle.v1+json;charset=UTF-8"
+
+# The connection pool limits and timeout used by httpx2 by default.
+DEFAULT_LIMITS = httpx2.Limits(max_connections=100, max_keepalive_connections=20)
+DEFAULT_TIMEOUT = httpx2.Timeout(5.0)
+
+# The maximum number of organization numbers to look up in one search request.
+# Each number takes up 12 characters of the URL ("123456789%2C"), so this keeps
+# the URL well below 2 kB, and the page size well below the API's limit.
+MAX_BATCH_SIZE = 100
+
+
+@dataclass(frozen=True)
+class Lookup(Generic[R]):
+    """How to get and parse a resource given an organization number."""
+
+    endpoint: Endpoint
+    path: str
+    media_type: str
+    parse: Callable[[Parser, bytes], R]
+    not_found: Callable[[], R]
+
+    def url(self, orgnr: str) -> str:
+        return self.path.format(orgnr=orgnr)
+
+    def to_entry(self, res: httpx2.Response) -> CacheEntry:
+        if res.status_code in NOT_FOUND_STATUS_CODES:
+            return CacheEntry(res.status_code, b"", time.time())
+        res.raise_for_status()
+        return CacheEntry(res.status_code, res.content, time.time())
+
+    def from_entry(self, entry: CacheEntry, parser: Parser) -> R:
+        if entry.not_found:
+            return self.not_found()
+        if entry.parsed is not None:
+            return cast("R", entry.parsed)
+        return self.parse(parser, entry.content)
+
+
+def parse_roller(parser: Parser, content: bytes) -> list[RolleGruppe]:
+    if parser.mode == "raw":
+        response = pydantic_core.from_json(content)
+        return cast("list[RolleGruppe]", response["rollegrupper"])
+    return parser.model(RollerResponse, content).rollegrupper
+
+
+ENHET = Lookup[Enhet | None](
+    endpoint="enhet",
+    path="/enheter/{orgnr}",
+    media_type=ENHET_MEDIA_TYPE,
+    parse=lambda parser, content: parser.model(Enhet, content),
+    not_found=lambda: None,
+)
+UNDERENHET = Lookup[Underenhet | None](
+    endpoint="underenhet",
+    path="/underenheter/{orgnr}",
+    media_type=UNDERENHET_MEDIA_TYPE,
+    parse=lambda parser, content: parser.model(Underenhet, content),
+    not_found=lambda: None,
+)
+ROLLER = Lookup[list[RolleGruppe]](
+    endpoint="roller",
+    path="/enheter/{orgnr}/roller",
+    media_type=ROLLE_MEDIA_TYPE,
+    parse=parse_roller,
+    not_found=list,
+)
+
 
 class Client:
     """Client for the Enhetregisteret API.
@@ -36,13 +195,108 @@ class Client:
         client = Client()
         enhet = client.get_enhet("915501680")
         client.close()
+
+    :param cache: Optional cache for :meth:`get_enhet`,
+        :meth:`get_underenhet` and :meth:`get_roller` responses, e.g. a
+        :class:`MemoryCache`.
+    :param parse_mode: How to parse responses. See :data:`ParseMode`. With
+        ``"raw"``, all methods return dicts in place of models, and
+        :meth:`iter_enhet_changes` and :meth:`iter_underenhet_changes` are
+        not available.
+    :param interner: Optional :class:`Interner`, to share equal values
+        between the parsed objects. Not available with ``"raw"`` parsing.
+    :param retry: Optional :class:`RetryPolicy`, to retry requests that fail
+        because of connection errors, server errors, or rate limiting.
+    :param limiter: Optional :class:`AdaptiveLimiter`, to limit the number of
+        concurrent requests, e.g. from :meth:`get_enheter` or prefetching
+        cursors, to what the server can take.
+    :param limits: The connection pool limits, including how long to keep
+        idle connections alive. Defaults to 100 connections, of which 20 are
+        kept alive for 5 seconds.
+    :param timeout: The request timeout in seconds, or an
+        :class:`httpx2.Timeout` with separate timeouts for connecting,
+        reading, writing, and waiting for a connection from the pool. If
+        ``None``, requests never time out.
+    :param http2: Whether to use HTTP/2, which multiplexes concurrent requests
+        over one connection. Requires the ``http2`` extra:
+        ``pip install brreg[http2]``.
+    :param transport: Optional custom :class:`httpx2.BaseTransport` to send
+        requests with. Can not be combined with ``limits`` or ``http2``,
+        which must be set on the transport instead. Without a custom
+        transport, the proxies set in the ``HTTP_PROXY``, ``HTTPS_PROXY``,
+        ``ALL_PROXY`` and ``NO_PROXY`` environment variables are used.
+    :param coalesce: Whether concurrent identical requests should share one
+        request to the API. If several threads look up the same organization
+        at once, only the first sends a request, and the others wait for and
+        get its result, or its error. Searches are coalesced too.
+    :param on_request: Optional callable that receives a
+        :class:`RequestEvent` after each lookup, search page, and count, with
+        its timings, size, and cache and retry outcome, e.g. a
+        :class:`RequestStats`.
     """
 
     _client: httpx2.Client
+    _parser: Parser
+    _flights: SingleFlight | None
 
-    def __init__(self) -> None:
+    #: The response cache, if any.
+    cache: Cache | None
+
+    #: The policy for retrying failed requests, if any.
+    retry: RetryPolicy | None
+
+    #: The limiter of concurrent requests, if any.
+    limiter: AdaptiveLimiter | None
+
+    #: The hook that receives a :class:`RequestEvent` per operation, if any.
+    on_request: RequestHook | None
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        cache: Cache | None = None,
+        parse_mode: ParseMode = "validate",
+        interner: Interner | None = None,
+        retry: RetryPolicy | None = None,
+        limiter: AdaptiveLimiter | None = None,
+        limits: httpx2.Limits | None = None,
+        timeout: httpx2.Timeout | float | None = DEFAULT_TIMEOUT,
+        http2: bool = False,
+        transport: httpx2.BaseTransport | None = None,
+        coalesce: bool = False,
+        on_request: RequestHook | None = None,
+    ) -> None:
+        check_transport_options(transport, limits=limits, http2=http2)
+        self._flights = SingleFlight() if coalesce else None
+        self.cache = cache
+        self.retry = retry
+        self.limiter = limiter
+        self.on_request = on_request
+        self._limits = limits or DEFAULT_LIMITS
+        self._timeout = timeout
+        self._http2 = http2
+        self._transport = transport
+        self._parser = Parser(parse_mode, interner)
         self.open()
 
+    @property
+    def parse_mode(self) -> ParseMode:
+        """How responses are parsed."""
+        return self._parser.mode
+
+    @property
+    def interner(self) -> Interner | None:
+        """The interner that shared values are kept in, if any."""
+        return self._parser.interner
+
+    @property
+    def coalesced_requests(self) -> int:
+        """The number of requests that shared another identical request.
+
+        Always zero if the client was not created with ``coalesce=True``.
+        """
+        return self._flights.coalesced if self._flights is not None else 0
+
     def __enter__(self) -> "Client":  # noqa: PYI034
         return self
 
@@ -59,16 +313,43 @@ class Client:
 
         This is called automatically when the client is created.
         """
+        transport = self._transport
+        mounts: dict[str, httpx2.BaseTransport] = {}
+        if transport is None and (self.limiter is not None or self.retry is not None):
+            # httpx2 only sets up the proxies from the environment for its own
+            # transports, so the wrapped proxy transports are mounted here.
+            transport = self._wrap(
+                httpx2.HTTPTransport(limits=self._limits, http2=self._http2)
+            )
+            mounts = proxy_mounts(
+                lambda proxy: self._wrap(
+                    httpx2.HTTPTransport(
+                        limits=self._limits,
+                        http2=self._http2,
+                        proxy=proxy,
+                    )
+                )
+            )
+        elif transport is not None:
+            transport = self._wrap(transport)
         self._client = httpx2.Client(
-            base_url="https://data.brreg.no/enhetsregisteret/api",
-            headers={
-                "user-agent": (
-                    f"python-brreg/{brreg.__version__} "
-                    f"python-httpx2/{httpx2.__version__}"
-                ),
-            },
+            base_url=BASE_URL,
+            headers=default_headers(),
+            timeout=self._timeout,
+            limits=self._limits,
+            http2=self._http2,
+            transport=transport,
+            mounts=mounts,
         )
 
+    def _wrap(self, transport: httpx2.BaseTransport) -> httpx2.BaseTransport:
+        if self.limiter is not None:
+            transport = LimitedTransport(transport, self.limiter)
+        if self.retry is not None:
+            # Each attempt is run within the limiter.
+            transport = RetryTransport(transport, self.retry)
+        return transport
+
     def close(self) -> None:
         """Close the client and any open HTTP connections.
 
@@ -76,69 +357,86 @@ class Client:
         """
         self._client.close()
 
+    def warm_up(self, connections: int = 1) -> None:
+        """Open connections to the API ahead of the first requests.
+
+        Opening a connection takes a few round trips for the TCP and TLS
+        handshakes, which would otherwise add to the latency of the first
+        requests. This sends ``connections`` concurrent requests for the
+        API's index, so that as many connections are left open in the pool.
+        The connections are closed again if they are idle for longer than
+        the keep-alive expiry of ``limits``.
+
+        :param connections: The number of connections to open. With HTTP/2,
+            one connection is enough for all requests.
+        """
+        check_connections(connections)
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            list(executor.map(lambda _: self._warm_up_request(), range(connections)))
+
+    def _warm_up_request(self) -> None:
+        with error_handler():
+            self._client.get("/").close()
+
     def get_enhet(
         self,
         organisasjonsnummer: Organisasjonsnummer,
     ) -> Enhet | None:
         """Get :class:`Enhet` given an organization number."""
-        orgnr = OrganisasjonsnummerValidator.validate_python(organisasjonsnummer)
-        with error_handler():
-            res = self._client.get(
-                f"/enheter/{orgnr}",
-                headers={
-                    "accept": (
-                        "application/vnd.brreg.enhetsregisteret.enhet.v2+json;"
-                        "charset=UTF-8"
-                    ),
-                },
-            )
-            if res.status_code in (404, 410):
-                return None
-            res.raise_for_status()
-            return Enhet.model_validate_json(res.content)
+        return self._lookup(ENHET, organisasjonsnummer)
 
     def get_underenhet(
         self,
         organisasjonsnummer: Organisasjonsnummer,
     ) -> Underenhet | None:
         """Get :class:`Underenhet` given an organization number."""
-        orgnr = OrganisasjonsnummerValidator.validate_python(organisasjonsnummer)
-        with error_handler():
-            res = self._client.get(
-                f"/underenheter/{orgnr}",
-                headers={
-                    "accept": (
-                        "application/vnd.brreg.enhetsregisteret.underenhet.v2+json;"
-                        "charset=UTF-8"
-                    ),
-                },
-            )
-            if res.status_code in (404, 410):
-                return None
-            res.raise_for_status()
-            return Underenhet.model_validate_json(res.content)
+        return self._lookup(UNDERENHET, organisasjonsnummer)
 
     def get_roller(
         self,
         organisasjonsnummer: Organisasjonsnummer,
     ) -> list[RolleGruppe]:
         """Get a list of :class:`RolleGruppe` given an organization number."""
+        return self._lookup(ROLLER, organisasjonsnummer)
+
+    def _lookup(
+        self,
+        lookup: Lookup[R],
+        organisasjonsnummer: Organisasjonsnummer,
+    ) -> R:
         orgnr = OrganisasjonsnummerValidator.validate_python(organisasjonsnummer)
+        with observe(self.on_request, lookup.endpoint, orgnr):
+            with error_handler():
+                if self.cache is not None:
+                    entry = self.cache.get(lookup.endpoint, orgnr)
+                    record_cache(hit=entry is not None)
+                    if entry is not None:
+                        with parsing():
+                            return lookup.from_entry(entry, self._parser)
+
+            return self._single_flight(
+                (lookup.url(orgnr), lookup.media_type),
+                functools.partial(self._fetch, lookup, orgnr),
+            )
+
+    def _fetch(self, lookup: Lookup[R], orgnr: str) -> R:
         with error_handler():
             res = self._client.get(
-                f"/enheter/{orgnr}/roller",
-                headers={
-                    "accept": (
-                        "application/vnd.brreg.enhetsregisteret.rolle.v1+json;"
-                        "charset=UTF-8"
-                    )
-                },
+                lookup.url(orgnr),
+                headers={"accept": lookup.media_type},
+                extensions=trace_extensions(),
             )
-            if res.status_code in (404, 410):
-                return []
-            res.raise_for_status()
-            roller_response = RollerResponse.model_validate_json(res.content)
-            return roller_response.rollegrupper
+            record_response(res)
+            entry = lookup.to_entry(res)
+            with parsing():
+                result = lookup.from_entry(entry, self._parser)
+            if self.cache is not None:
+                # Only keep validated objects, in case the cache is shared
+                # with clients using other parse modes.
+                if self.parse_mode == "validate":
+                    entry = dataclasses.replace(entry, parsed=result)
+                self.cache.set(lookup.endpoint, orgnr, entry)
+            return result
 
     def search_enhet(
         self,
@@ -148,41 +446,1228 @@ class Client:
 
         :param query: The search query.
         """
+        raw = RawSearch(
+            functools.partial(
+                self._search_raw, "search_enhet", "/enheter", ENHET_MEDIA_TYPE
+            ),
+            Enhet,
+            ("enheter",),
+        )
+        with observe(self.on_request, "search_enhet", query):
+            content = raw.fetch(query)
+            with error_handler():
+                with parsing():
+                    page = self._parser.page(EnhetPage, content)
+                return Cursor(
+                    self.search_enhet,
+                    query,
+                    page,
+                    raw=raw,
+                    content=content,
+                    window=SEARCH_WINDOW,
+                )
+
+    def search_underenhet(
+        self,
+        query: UnderenhetQuery,
+    ) -> Cursor[Underenhet, UnderenhetQuery]:
+        """Search for :class:`Underenhet` that matches the given query.
+
+        :param query: The search query.
+        """
+        raw = RawSearch(
+            functools.partial(
+                self._search_raw,
+                "search_underenhet",
+                "/underenheter",
+                UNDERENHET_MEDIA_TYPE,
+            ),
+            Underenhet,
+            ("underenheter",),
+        )
+        with observe(self.on_request, "search_underenhet", query):
+            content = raw.fetch(query)
+            with error_handler():
+                with parsing():
+                    page = self._parser.page(UnderenhetPage, content)
+                return Cursor(
+                    self.search_underenhet,
+                    query,
+                    page,
+                    raw=raw,
+                    content=content,
+                    window=SEARCH_WINDOW,
+                )
+
+    def search_enhet_oppdateringer(
+        self,
+        query: OppdateringQuery,
+    ) -> Cursor[Oppdatering, OppdateringQuery]:
+        """Search the feed of :class:`Oppdatering` to :class:`Enhet`.
+
+        :param query: The search query.
+        """
+        raw = RawSearch(
+            functools.partial(
+                self._search_raw,
+                "search_enhet_oppdateringer",
+                "/oppdateringer/enheter",
+                OPPDATERING_ENHET_MEDIA_TYPE,
+            ),
+            Oppdatering,
+            ("oppdaterteEnheter",),
+        )
+        with observe(self.on_request, "search_enhet_oppdateringer", query):
+            content = raw.fetch(query)
+            with error_handler():
+                with parsing():
+                    page = self._parser.page(OppdateringPage, content)
+                return Cursor(
+                    self.search_enhet_oppdateringer,
+                    query,
+                    page,
+                    raw=raw,
+                    content=content,
+                    window=SEARCH_WINDOW,
+                )
+
+    def search_underenhet_oppdateringer(
+        self,
+        query: OppdateringQuery,
+    ) -> Cursor[Oppdatering, OppdateringQuery]:
+        """Search the feed of :class:`Oppdatering` to :class:`Underenhet`.
+
+        :param query: The search query.
+        """
+        raw = RawSearch(
+            functools.partial(
+                self._search_raw,
+                "search_underenhet_oppdateringer",
+                "/oppdateringer/underenheter",
+                OPPDATERING_UNDERENHET_MEDIA_TYPE,
+            ),
+            Oppdatering,
+            ("oppdaterteUnderenheter",),
+        )
+        with observe(self.on_request, "search_underenhet_oppdateringer", query):
+            content = raw.fetch(query)
+            with error_handler():
+                with parsing():
+                    page = self._parser.page(OppdateringPage, content)
+                return Cursor(
+                    self.search_underenhet_oppdateringer,
+                    query,
+                    page,
+                    raw=raw,
+                    content=content,
+                    window=SEARCH_WINDOW,
+                )
+
+    def search_all_enheter(
+        self,
+        query: EnhetQuery,
+        *,
+        max_workers: int = 4,
+    ) -> Iterator[Enhet]:
+        """Iterate over all :class:`Enhet` that matches the given query.
+
+        The search API only serves the first 10 000 results of a search. If
+        the query matches more, it is split into smaller searches that each
+        match less than 10 000, first by splitting the lists of values in the
+        query, e.g. :attr:`EnhetQuery.kommunenummer`, and then by splitting
+        the range of registration dates. The smaller searches are fetched in
+        parallel, and each :class:`Enhet` is yielded once, in no particular
+        order.
+
+        :param query: The search query. Its ``page`` is ignored.
+        :param max_workers: The number of searches to run in parallel.
+        :raises BrregError: If the query can not be split into small enough
+            searches.
+        """
+        return iter_all(
+            self.search_enhet,
+            query,
+            key=organisasjonsnummer_of,
+            max_workers=max_workers,
+        )
+
+    def search_all_underenheter(
+        self,
+        query: UnderenhetQuery,
+        *,
+        max_workers: int = 4,
+    ) -> Iterator[Underenhet]:
+        """Iterate over all :class:`Underenhet` that matches the given query.
+
+        See :meth:`search_all_enheter`.
+
+        :param query: The search query. Its ``page`` is ignored.
+        :param max_workers: The number of searches to run in parallel.
+        :raises BrregError: If the query can not be split into small enough
+            searches.
+        """
+        return iter_all(
+            self.search_underenhet,
+            query,
+            key=organisasjonsnummer_of,
+            max_workers=max_workers,
+        )
+
+    def count_enheter(self, query: EnhetQuery) -> int:
+        """Count the :class:`Enhet` that matches the given query.
+
+        Only requests a single result, and does not parse it, so this is much
+        cheaper than :meth:`search_enhet` when only the number is needed.
+
+        :param query: The search query. Its ``page`` and ``size`` are ignored.
+        """
+        return self._count("count_enheter", "/enheter", ENHET_MEDIA_TYPE, query)
+
+    def count_underenheter(self, query: UnderenhetQuery) -> int:
+        """Count the :class:`Underenhet` that matches the given query.
+
+        See :meth:`count_enheter`.
+
+        :param query: The search query. Its ``page`` and ``size`` are ignored.
+        """
+        return self._count(
+            "count_underenheter", "/underenheter", UNDERENHET_MEDIA_TYPE, query
+        )
+
+    def count_enheter_by(
+        self,
+        field: str,
+        values: Iterable[str],
+        query: EnhetQuery | None = None,
+        *,
+        max_workers: int = 8,
+    ) -> dict[str, int]:
+        """Count the :class:`Enhet` that matches each value of a query field.
+
+        Runs one :meth:`count_enheter` per value, with up to ``max_workers``
+        counts in flight at once.
+
+        Example::
+
+            counts = client.count_enheter_by(
+                "kommunenummer",
+                ["0301", "4601", "5001"],
+                EnhetQuery(konkurs=True),
+            )
+
+        :param field: The name of the :class:`EnhetQuery` field, e.g.
+            ``"kommunenummer"`` or ``"organisasjonsform"``.
+        :param values: The values of the field to count.
+        :param query: The search query to count within, if any.
+        :param max_workers: The maximum number of concurrent requests.
+        :returns: A mapping from value to the number of matching enheter.
+        """
+        queries = facet_queries(query or EnhetQuery(), field, values)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            counts = executor.map(self.count_enheter, queries.values())
+            return dict(zip(queries, counts, strict=True))
+
+    def count_underenheter_by(
+        self,
+        field: str,
+        values: Iterable[str],
+        query: UnderenhetQuery | None = None,
+        *,
+        max_workers: int = 8,
+    ) -> dict[str, int]:
+        """Count the :class:`Underenhet` that matches each value of a query field.
+
+        See :meth:`count_enheter_by`.
+
+        :param field: The name of the :class:`UnderenhetQuery` field, e.g.
+            ``"kommunenummer"`` or ``"naeringskode"``.
+        :param values: The values of the field to count.
+        :param query: The search query to count within, if any.
+        :param max_workers: The maximum number of concurrent requests.
+        :returns: A mapping from value to the number of matching underenheter.
+        """
+        queries = facet_queries(query or UnderenhetQuery(), field, values)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            counts = executor.map(self.count_underenheter, queries.values())
+            return dict(zip(queries, counts, strict=True))
+
+    def _count(self, endpoint: str, path: str, media_type: str, query: Query) -> int:
+        query = count_query(query)
+        with observe(self.on_request, endpoint, query):
+            content = self._search_raw(endpoint, path, media_type, query)
+            with error_handler(), parsing():
+                return Count.model_validate_json(content).total_elements
+
+    def _search_raw(
+        self,
+        endpoint: str,
+        path: str,
+        media_type: str,
+        query: Query,
+    ) -> bytes:
+        url = f"{path}?{query.as_url_query()}"
+        with observe(self.on_request, endpoint, query):
+            return self._single_flight(
+                (url, media_type),
+                functools.partial(self._get_content, url, media_type),
+            )
+
+    def _get_content(self, url: str, media_type: str) -> bytes:
         with error_handler():
             res = self._client.get(
-                f"/enheter?{query.as_url_query()}",
-                headers={
-                    "accept": (
-                        "application/vnd.brreg.enhetsregisteret.enhet.v2+json;"
-                        "charset=UTF-8"
-                    ),
-                },
+                url,
+                headers={"accept": media_type},
+                extensions=trace_extensions(),
             )
+            record_response(res)
             res.raise_for_status()
-            page = EnhetPage.model_validate_json(res.content)
-            return Cursor(self.search_enhet, query, page)
+            return res.content
 
-    def search_underenhet(
+    def _single_flight(self, key: tuple[str, str], func: Callable[[], R]) -> R:
+        if self._flights is None:
+            return func()
+        return self._flights.do(key, func)
+
+    def iter_enhet_changes(
+        self,
+        checkpoint: Checkpoint,
+        *,
+        since: dt.datetime | None = None,
+        batch_size: int = MAX_BATCH_SIZE,
+    ) -> Iterator[ChangeEvent[Enhet]]:
+        """Consume the feed of changes to :class:`Enhet`.
+
+        Reads the update feed from the position in ``checkpoint``, fetches
+        the current state of the changed entities in bulk, and yields one
+        :class:`ChangeEvent` per update. The iteration stops when the feed has
+        no more updates.
+
+        The checkpoint is saved after all events of a batch have been
+        consumed, so that a restarted consumer resumes after the last
+        completed batch. If the consumer stops in the middle of a batch, the
+        events of that batch are delivered again.
+
+        Example::
+
+            checkpoint = FileCheckpoint("/var/lib/brreg/enheter.checkpoint")
+            for event in client.iter_enhet_changes(checkpoint, since=yesterday):
+                ...
+
+        :param checkpoint: Where to read and save the position in the feed.
+        :param since: Where to start if the checkpoint is empty.
+        :param batch_size: The number of updates to read per request.
+        :raises ValueError: If both ``since`` and the checkpoint are empty.
+        """
+        self._require_models("iter_enhet_changes")
+        return iter_changes(
+            self.search_enhet_oppdateringer,
+            self.get_enheter,
+            checkpoint,
+            since=since,
+            batch_size=batch_size,
+        )
+
+    def iter_underenhet_changes(
+        self,
+        checkpoint: Checkpoint,
+        *,
+        since: dt.datetime | None = None,
+        batch_size: int = MAX_BATCH_SIZE,
+    ) -> Iterator[ChangeEvent[Underenhet]]:
+        """Consume the feed of changes to :class:`Underenhet`.
+
+        See :meth:`iter_enhet_changes` for details.
+
+        :param checkpoint: Where to read and save the position in the feed.
+        :param since: Where to start if the checkpoint is empty.
+        :param batch_size: The number of updates to read per request.
+        """
+        self._require_models("iter_underenhet_changes")
+        return iter_changes(
+            self.search_underenhet_oppdateringer,
+            self.get_underenheter,
+            checkpoint,
+            since=since,
+            batch_size=batch_size,
+        )
+
+    def _require_models(self, method: str) -> None:
+        if self.parse_mode == "raw":
+            msg = f"{method}() does not support parse_mode 'raw'"
+            raise ValueError(msg)
+
+    def get_enheter(
+        self,
+        organisasjonsnumre: Iterable[Organisasjonsnummer],
+        *,
+        batch_size: int = MAX_BATCH_SIZE,
+        max_workers: int = 4,
+    ) -> dict[str, Enhet | None]:
+        """Get many :class:`Enhet` given their organization numbers.
+
+        The organization numbers are looked up in batches through the search
+        endpoint, with up to ``max_workers`` batches in flight at once. This
+        uses about ``batch_size`` times fewer requests than calling
+        :meth:`get_enhet` for each number.
+
+        Note that the search endpoint does not return deleted enheter.
+
+        :param organisasjonsnumre: The organization numbers to look up.
+        :param batch_size: The maximum number of organization numbers per
+            request, at most 100.
+        :param max_workers: The maximum number of concurrent requests.
+        :returns: A mapping from normalized organization number to
+            :class:`Enhet`, or to ``None`` if the number was not found.
+        """
+        return self._get_many(
+            lambda batch: self.search_enhet(
+                EnhetQuery(organisasjonsnummer=batch, size=len(batch)),
+            ),
+            organisasjonsnumre,
+            batch_size=batch_size,
+            max_workers=max_workers,
+        )
+
+    def get_underenheter(
+        self,
+        organisasjonsnumre: Iterable[Organisasjonsnummer],
+        *,
+        batch_size: int = MAX_BATCH_SIZE,
+        max_workers: int = 4,
+    ) -> dict[str, Underenhet | None]:
+        """Get many :class:`Underenhet` given their organization numbers.
+
+        Works like :meth:`get_enheter`, but for underenheter.
+
+        :param organisasjonsnumre: The organization numbers to look up.
+        :param batch_size: The maximum number of organization numbers per
+            request, at most 100.
+        :param max_workers: The maximum number of concurrent requests.
+        :returns: A mapping from normalized organization number to
+            :class:`Underenhet`, or to ``None`` if the number was not found.
+        """
+        return self._get_many(
+            lambda batch: self.search_underenhet(
+                UnderenhetQuery(organisasjonsnummer=batch, size=len(batch)),
+            ),
+            organisasjonsnumre,
+            batch_size=batch_size,
+            max_workers=max_workers,
+        )
+
+    def _get_many(
+        self,
+        search: Callable[[list[str]], Cursor[E, Any]],
+        organisasjonsnumre: Iterable[Organisasjonsnummer],
+        *,
+        batch_size: int,
+        max_workers: int,
+    ) -> dict[str, E | None]:
+        orgnrs = unique_orgnrs(organisasjonsnumre)
+        results: dict[str, E | None] = dict.fromkeys(orgnrs)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for cursor in executor.map(search, batched(orgnrs, batch_size)):
+                for item in cursor.items:
+                    results[organisasjonsnummer_of(item)] = item
+        return results
+
+    def download_enheter(
+        self,
+        *,
+        file_format: BulkFormat = "json",
+    ) -> Iterator[Enhet]:
+        """Download all :class:`Enhet` from the bulk dump.
+
+        The complete register is published as a gzipped file of several
+        hundred megabytes. The file is streamed and parsed incrementally, so
+        neither the compressed nor the decompressed file is ever held in memory
+        at once. The download starts when the iteration starts.
+
+        :param file_format: Whether to download the ``"json"`` or ``"csv"``
+            version of the dump.
+        """
+        return self._download("enheter", Enhet, file_format)
+
+    def download_underenheter(
+        self,
+        *,
+        file_format: BulkFormat = "json",
+    ) -> Iterator[Underenhet]:
+        """Download all :class:`Underenhet` from the bulk dump.
+
+        See :meth:`download_enheter` for details.
+
+        :param file_format: Whether to download the ``"json"`` or ``"csv"``
+            version of the dump.
+        """
+        return self._download("underenheter", Underenhet, file_format)
+
+    def _download(
+        self,
+        dataset: BulkDataset,
+        model: type[M],
+        file_format: BulkFormat,
+    ) -> Iterator[M]:
+        path, media_type = dump_request(dataset, file_format)
+        with (
+            error_handler(),
+            self._client.stream("GET", path, headers={"accept": media_type}) as res,
+        ):
+            res.raise_for_status()
+            yield from iter_bulk(
+                res.iter_bytes(),
+                model,
+                file_format,
+                parser=self._parser,
+            )
+
+    def save_dump(
+        self,
+        dataset: BulkDataset,
+        directory: str | os.PathLike[str],
+        *,
+        file_format: BulkFormat = "json",
+    ) -> DumpFile:
+        """Download a bulk dump to a local file, if it has changed.
+
+        The gzipped dump is saved as ``<dataset>.<format>.gz`` in the given
+        directory, together with the ``ETag`` and ``Last-Modified`` headers
+        from the server. The next call sends these back, and if the dump has
+        not changed since, the local copy is kept without downloading it
+        again.
+
+        An interrupted download is kept as a ``.part`` file, and is resumed
+        with a ``Range`` request on the next call. If the dump has changed in
+        the meantime, the download starts over. When the download is
+        complete, its size and gzip checksum are verified before it atomically
+        replaces the previous copy, so that readers never see a partial file.
+
+        Use :func:`read_enheter` or :func:`read_underenheter` to parse the
+        local copy.
+
+        Example::
+
+            dump = client.save_dump("enheter", "/var/lib/brreg")
+            if dump.changed:
+                for enhet in read_enheter(dump.path):
+                    ...
+
+        :param dataset: Whether to download ``"enheter"`` or
+            ``"underenheter"``.
+        :param directory: The directory to save the dump in. It is created if
+            it does not exist.
+        :param file_format: Whether to download the ``"json"`` or ``"csv"``
+            version of the dump.
+        """
+        files = DumpFiles(directory, dataset, file_format)
+        path, media_type = dump_request(dataset, file_format)
+        headers = {"accept": media_type, **files.request_headers()}
+        with (
+            error_handler(),
+            self._client.stream("GET", path, headers=headers) as res,
+        ):
+            if res.status_code == httpx2.codes.NOT_MODIFIED:
+                return files.unchanged()
+            res.raise_for_status()
+            # Save the bytes exactly as sent, so that ranges line up on resume.
+            return files.receive(res.status_code, res.headers, res.iter_raw())
+
+
+class AsyncClient:
+    """Asynchronous client for the Enhetregisteret API.
+
+    Has the same methods as :class:`Client`, but all requests are coroutines.
+    All requests share one connection pool, which makes it possible to run
+    many lookups concurrently.
+
+    It can be used as an async context manager::
+
+        async with AsyncClient() as client:
+            enhet = await client.get_enhet("915501680")
+
+    Or by manually opening and closing the client::
+
+        client = AsyncClient()
+        enhet = await client.get_enhet("915501680")
+        await client.close()
+
+    :param cache: Optional cache for :meth:`get_enhet`,
+        :meth:`get_underenhet` and :meth:`get_roller` responses, e.g. a
+        :class:`MemoryCache`.
+    :param parse_mode: How to parse responses. See :data:`ParseMode`.
+    :param interner: Optional :class:`Interner`, to share equal values
+        between the parsed objects.
+    :param retry: Optional :class:`RetryPolicy`, to retry failed requests.
+    :param limiter: Optional :class:`AdaptiveLimiter`, to limit the number of
+        concurrent requests.
+    :param limits: The connection pool limits.
+    :param timeout: The request timeout in seconds, or an
+        :class:`httpx2.Timeout`.
+    :param http2: Whether to use HTTP/2.
+    :param transport: Optional custom :class:`httpx2.AsyncBaseTransport` to
+        send requests with. Without one, proxies are taken from the
+        environment, like :class:`Client` does.
+    :param coalesce: Whether concurrent identical requests should share one
+        request to the API.
+    :param on_request: Optional callable that receives a
+        :class:`RequestEvent` after each operation.
+    """
+
+    _client: httpx2.AsyncClient
+    _parser: Parser
+    _flights: AsyncSingleFlight | None
+
+    #: The response cache, if any.
+    cache: Cache | None
+
+    #: The policy for retrying failed requests, if any.
+    retry: RetryPolicy | None
+
+    #: The limiter of concurrent requests, if any.
+    limiter: AdaptiveLimiter | None
+
+    #: The hook that receives a :class:`RequestEvent` per operation, if any.
+    on_request: RequestHook | None
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        cache: Cache | None = None,
+        parse_mode: ParseMode = "validate",
+        interner: Interner | None = None,
+        retry: RetryPolicy | None = None,
+        limiter: AdaptiveLimiter | None = None,
+        limits: httpx2.Limits | None = None,
+        timeout: httpx2.Timeout | float | None = DEFAULT_TIMEOUT,
+        http2: bool = False,
+        transport: httpx2.AsyncBaseTransport | None = None,
+        coalesce: bool = False,
+        on_request: RequestHook | None = None,
+    ) -> None:
+        check_transport_options(transport, limits=limits, http2=http2)
+        self._flights = AsyncSingleFlight() if coalesce else None
+        self.cache = cache
+        self.retry = retry
+        self.limiter = limiter
+        self.on_request = on_request
+        self._limits = limits or DEFAULT_LIMITS
+        self._timeout = timeout
+        self._http2 = http2
+        self._transport = transport
+        self._parser = Parser(parse_mode, interner)
+        self.open()
+
+    @property
+    def parse_mode(self) -> ParseMode:
+        """How responses are parsed."""
+        return self._parser.mode
+
+    @property
+    def interner(self) -> Interner | None:
+        """The interner that shared values are kept in, if any."""
+        return self._parser.interner
+
+    @property
+    def coalesced_requests(self) -> int:
+        """The number of requests that shared another identical request.
+
+        Always zero if the client was not created with ``coalesce=True``.
+        """
+        return self._flights.coalesced if self._flights is not None else 0
+
+    async def __aenter__(self) -> "AsyncClient":  # noqa: PYI034
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None = None,
+        exc_value: BaseException | None = None,
+        traceback: TracebackType | None = None,
+    ) -> None:
+        await self.close()
+
+    def open(self) -> None:
+        """Prepare the client for use.
+
+        This is called automatically when the client is created.
+        """
+        transport = self._transport
+        mounts: dict[str, httpx2.AsyncBaseTransport] = {}
+        if transport is None and (self.limiter is not None or self.retry is not None):
+            # See Client.open().
+            transport = self._wrap(
+                httpx2.AsyncHTTPTransport(limits=self._limits, http2=self._http2)
+            )
+            mounts = proxy_mounts(
+                lambda proxy: self._wrap(
+                    httpx2.AsyncHTTPTransport(
+                        limits=self._limits,
+                        http2=self._http2,
+                        proxy=proxy,
+                    )
+                )
+            )
+        elif transport is not None:
+            transport = self._wrap(transport)
+        self._client = httpx2.AsyncClient(
+            base_url=BASE_URL,
+            headers=default_headers(),
+            timeout=self._timeout,
+            limits=self._limits,
+            http2=self._http2,
+            transport=transport,
+            mounts=mounts,
+        )
+
+    def _wrap(self, transport: httpx2.AsyncBaseTransport) -> httpx2.AsyncBaseTransport:
+        if self.limiter is not None:
+            transport = AsyncLimitedTransport(transport, self.limiter)
+        if self.retry is not None:
+            transport = AsyncRetryTransport(transport, self.retry)
+        return transport
+
+    async def close(self) -> None:
+        """Close the client and any open HTTP connections.
+
+        This is called automatically if the client is used as an async context
+        manager.
+        """
+        await self._client.aclose()
+
+    async def warm_up(self, connections: int = 1) -> None:
+        """Open connections to the API ahead of the first requests.
+
+        See :meth:`Client.warm_up` for details.
+
+        :param connections: The number of connections to open.
+        """
+        check_connections(connections)
+        await asyncio.gather(
+            *(self._warm_up_request() for _ in range(connections)),
+        )
+
+    async def _warm_up_request(self) -> None:
+        with error_handler():
+            await (await self._client.get("/")).aclose()
+
+    async def get_enhet(
+        self,
+        organisasjonsnummer: Organisasjonsnummer,
+    ) -> Enhet | None:
+        """Get :class:`Enhet` given an organization number."""
+        return await self._lookup(ENHET, organisasjonsnummer)
+
+    async def get_underenhet(
+        self,
+        organisasjonsnummer: Organisasjonsnummer,
+    ) -> Underenhet | None:
+        """Get :class:`Underenhet` given an organization number."""
+        return await self._lookup(UNDERENHET, organisasjonsnummer)
+
+    async def get_roller(
+        self,
+        organisasjonsnummer: Organisasjonsnummer,
+    ) -> list[RolleGruppe]:
+        """Get a list of :class:`RolleGruppe` given an organization number."""
+        return await self._lookup(ROLLER, organisasjonsnummer)
+
+    async def _lookup(
+        self,
+        lookup: Lookup[R],
+        organisasjonsnummer: Organisasjonsnummer,
+    ) -> R:
+        orgnr = OrganisasjonsnummerValidator.validate_python(organisasjonsnummer)
+        with observe(self.on_request, lookup.endpoint, orgnr):
+            with error_handler():
+                if self.cache is not None:
+                    entry = self.cache.get(lookup.endpoint, orgnr)
+                    record_cache(hit=entry is not None)
+                    if entry is not None:
+                        with parsing():
+                            return lookup.from_entry(entry, self._parser)
+
+            return await self._single_flight(
+                (lookup.url(orgnr), lookup.media_type),
+                functools.partial(self._fetch, lookup, orgnr),
+            )
+
+    async def _fetch(self, lookup: Lookup[R], orgnr: str) -> R:
+        with error_handler():
+            res = await self._client.get(
+                lookup.url(orgnr),
+                headers={"accept": lookup.media_type},
+                extensions=async_trace_extensions(),
+            )
+            record_response(res)
+            entry = lookup.to_entry(res)
+            with parsing():
+                result = lookup.from_entry(entry, self._parser)
+            if self.cache is not None:
+                # Only keep validated objects, in case the cache is shared
+                # with clients using other parse modes.
+                if self.parse_mode == "validate":
+                    entry = dataclasses.replace(entry, parsed=result)
+                self.cache.set(lookup.endpoint, orgnr, entry)
+            return result
+
+    async def search_enhet(
+        self,
+        query: EnhetQuery,
+    ) -> AsyncCursor[Enhet, EnhetQuery]:
+        """Search for :class:`Enhet` that matches the given query.
+
+        :param query: The search query.
+        """
+        with observe(self.on_request, "search_enhet", query):
+            content = await self._search_raw(
+                "search_enhet",
+                "/enheter",
+                ENHET_MEDIA_TYPE,
+                query,
+            )
+            with error_handler():
+                with parsing():
+                    page = self._parser.page(EnhetPage, content)
+                return AsyncCursor(
+                    self.search_enhet,
+                    query,
+                    page,
+                    window=SEARCH_WINDOW,
+                )
+
+    async def search_underenhet(
         self,
         query: UnderenhetQuery,
-    ) -> Cursor[Underenhet, UnderenhetQuery]:
+    ) -> AsyncCursor[Underenhet, UnderenhetQuery]:
         """Search for :class:`Underenhet` that matches the given query.
 
         :param query: The search query.
         """
+        with observe(self.on_request, "search_underenhet", query):
+            content = await self._search_raw(
+                "search_underenhet",
+                "/underenheter",
+                UNDERENHET_MEDIA_TYPE,
+                query,
+            )
+            with error_handler():
+                with parsing():
+                    page = self._parser.page(UnderenhetPage, content)
+                return AsyncCursor(
+                    self.search_underenhet, query, page, window=SEARCH_WINDOW
+                )
+
+    async def search_enhet_oppdateringer(
+        self,
+        query: OppdateringQuery,
+    ) -> AsyncCursor[Oppdatering, OppdateringQuery]:
+        """Search the feed of :class:`Oppdatering` to :class:`Enhet`.
+
+        :param query: The search query.
+        """
+        with observe(self.on_request, "search_enhet_oppdateringer", query):
+            content = await self._search_raw(
+                "search_enhet_oppdateringer",
+                "/oppdateringer/enheter",
+                OPPDATERING_ENHET_MEDIA_TYPE,
+                query,
+            )
+            with error_handler():
+                with parsing():
+                    page = self._parser.page(OppdateringPage, content)
+                return AsyncCursor(
+                    self.search_enhet_oppdateringer, query, page, window=SEARCH_WINDOW
+                )
+
+    async def search_underenhet_oppdateringer(
+        self,
+        query: OppdateringQuery,
+    ) -> AsyncCursor[Oppdatering, OppdateringQuery]:
+        """Search the feed of :class:`Oppdatering` to :class:`Underenhet`.
+
+        :param query: The search query.
+        """
+        with observe(self.on_request, "search_underenhet_oppdateringer", query):
+            content = await self._search_raw(
+                "search_underenhet_oppdateringer",
+                "/oppdateringer/underenheter",
+                OPPDATERING_UNDERENHET_MEDIA_TYPE,
+                query,
+            )
+            with error_handler():
+                with parsing():
+                    page = self._parser.page(OppdateringPage, content)
+                return AsyncCursor(
+                    self.search_underenhet_oppdateringer,
+                    query,
+                    page,
+                    window=SEARCH_WINDOW,
+                )
+
+    def search_all_enheter(
+        self,
+        query: EnhetQuery,
+        *,
+        max_concurrency: int = 4,
+    ) -> AsyncIterator[Enhet]:
+        """Iterate over all :class:`Enhet` that matches the given query.
+
+        See :meth:`Client.search_all_enheter`.
+
+        :param query: The search query. Its ``page`` is ignored.
+        :param max_concurrency: The number of searches to run concurrently.
+        :raises BrregError: If the query can not be split into small enough
+            searches.
+        """
+        return async_iter_all(
+            self.search_enhet,
+            query,
+            key=organisasjonsnummer_of,
+            max_concurrency=max_concurrency,
+        )
+
+    def search_all_underenheter(
+        self,
+        query: UnderenhetQuery,
+        *,
+        max_concurrency: int = 4,
+    ) -> AsyncIterator[Underenhet]:
+        """Iterate over all :class:`Underenhet` that matches the given query.
+
+        See :meth:`Client.search_all_enheter`.
+
+        :param query: The search query. Its ``page`` is ignored.
+        :param max_concurrency: The number of searches to run concurrently.
+        :raises BrregError: If the query can not be split into small enough
+            searches.
+        """
+        return async_iter_all(
+            self.search_underenhet,
+            query,
+            key=organisasjonsnummer_of,
+            max_concurrency=max_concurrency,
+        )
+
+    async def count_enheter(self, query: EnhetQuery) -> int:
+        """Count the :class:`Enhet` that matches the given query.
+
+        See :meth:`Client.count_enheter`.
+
+        :param query: The search query. Its ``page`` and ``size`` are ignored.
+        """
+        return await self._count("count_enheter", "/enheter", ENHET_MEDIA_TYPE, query)
+
+    async def count_underenheter(self, query: UnderenhetQuery) -> int:
+        """Count the :class:`Underenhet` that matches the given query.
+
+        See :meth:`Client.count_enheter`.
+
+        :param query: The search query. Its ``page`` and ``size`` are ignored.
+        """
+        return await self._count(
+            "count_underenheter", "/underenheter", UNDERENHET_MEDIA_TYPE, query
+        )
+
+    async def count_enheter_by(
+        self,
+        field: str,
+        values: Iterable[str],
+        query: EnhetQuery | None = None,
+        *,
+        max_concurrency: int = 8,
+    ) -> dict[str, int]:
+        """Count the :class:`Enhet` that matches each value of a query field.
+
+        See :meth:`Client.count_enheter_by`.
+        """
+        queries = facet_queries(query or EnhetQuery(), field, values)
+        counts = await run_concurrently(
+            self.count_enheter,
+            list(queries.values()),
+            max_concurrency=max_concurrency,
+        )
+        return dict(zip(queries, counts, strict=True))
+
+    async def count_underenheter_by(
+        self,
+        field: str,
+        values: Iterable[str],
+        query: UnderenhetQuery | None = None,
+        *,
+        max_concurrency: int = 8,
+    ) -> dict[str, int]:
+        """Count the :class:`Underenhet` that matches each value of a query field.
+
+        See :meth:`Client.count_enheter_by`.
+        """
+        queries = facet_queries(query or UnderenhetQuery(), field, values)
+        counts = await run_concurrently(
+            self.count_underenheter,
+            list(queries.values()),
+            max_concurrency=max_concurrency,
+        )
+        return dict(zip(queries, counts, strict=True))
+
+    async def _count(
+        self,
+        endpoint: str,
+        path: str,
+        media_type: str,
+        query: Query,
+    ) -> int:
+        query = count_query(query)
+        with observe(self.on_request, endpoint, query):
+            content = await self._search_raw(endpoint, path, media_type, query)
+            with error_handler(), parsing():
+                return Count.model_validate_json(content).total_elements
+
+    async def _search_raw(
+        self,
+        endpoint: str,
+        path: str,
+        media_type: str,
+        query: Query,
+    ) -> bytes:
+        url = f"{path}?{query.as_url_query()}"
+        with observe(self.on_request, endpoint, query):
+            return await self._single_flight(
+                (url, media_type),
+                functools.partial(self._get_content, url, media_type),
+            )
+
+    async def _get_content(self, url: str, media_type: str) -> bytes:
         with error_handler():
-            res = self._client.get(
-                f"/underenheter?{query.as_url_query()}",
-                headers={
-                    "accept": (
-                        "application/vnd.brreg.enhetsregisteret.underenhet.v2+json;"
-                        "charset=UTF-8"
-                    ),
-                },
+            res = await self._client.get(
+                url,
+                headers={"accept": media_type},
+                extensions=async_trace_extensions(),
             )
+            record_response(res)
             res.raise_for_status()
-            page = UnderenhetPage.model_validate_json(res.content)
-            return Cursor(self.search_underenhet, query, page)
+            return res.content
+
+    async def _single_flight(
+        self,
+        key: tuple[str, str],
+        func: Callable[[], Awaitable[R]],
+    ) -> R:
+        if self._flights is None:
+            return await func()
+        return await self._flights.do(key, func)
+
+    async def gather(
+        self,
+        operation: Callable[[Organisasjonsnummer], Awaitable[R]],
+        organisasjonsnumre: Iterable[Organisasjonsnummer],
+        *,
+        max_concurrency: int = 20,
+    ) -> dict[str, R]:
+        """Run a lookup for many organization numbers concurrently.
+
+        The lookups share the client's connection pool, and at most
+        ``max_concurrency`` requests are in flight at any time. Duplicate
+        organization numbers are only looked up once.
+
+        Example::
+
+            enheter = await client.gather(client.get_enhet, orgnrs)
+
+        :param operation: The lookup method to run, e.g. :meth:`get_enhet`,
+            :meth:`get_underenhet`, or :meth:`get_roller`.
+        :param organisasjonsnumre: The organization numbers to look up.
+        :param max_concurrency: The maximum number of concurrent requests.
+        :returns: A mapping from normalized organization number to result.
+        """
+        orgnrs = unique_orgnrs(organisasjonsnumre)
+        results = await run_concurrently(
+            operation,
+            orgnrs,
+            max_concurrency=max_concurrency,
+        )
+        return dict(zip(orgnrs, results, strict=True))
+
+    async def get_enheter(
+        self,
+        organisasjonsnumre: Iterable[Organisasjonsnummer],
+        *,
+        batch_size: int = MAX_BATCH_SIZE,
+        max_concurrency: int = 4,
+    ) -> dict[str, Enhet | None]:
+        """Get many :class:`Enhet` given their organization numbers.
+
+        See :meth:`Client.get_enheter` for details.
+        """
+        return await self._get_many(
+            lambda batch: self.search_enhet(
+                EnhetQuery(organisasjonsnummer=batch, size=len(batch)),
+            ),
+            organisasjonsnumre,
+            batch_size=batch_size,
+            max_concurrency=max_concurrency,
+        )
+
+    async def get_underenheter(
+        self,
+        organisasjonsnumre: Iterable[Organisasjonsnummer],
+        *,
+        batch_size: int = MAX_BATCH_SIZE,
+        max_concurrency: int = 4,
+    ) -> dict[str, Underenhet | None]:
+        """Get many :class:`Underenhet` given their organization numbers.
+
+        See :meth:`Client.get_underenheter` for details.
+        """
+        return await self._get_many(
+            lambda batch: self.search_underenhet(
+                UnderenhetQuery(organisasjonsnummer=batch, size=len(batch)),
+            ),
+            organisasjonsnumre,
+            batch_size=batch_size,
+            max_concurrency=max_concurrency,
+        )
+
+    async def _get_many(
+        self,
+        search: Callable[[list[str]], Awaitable[AsyncCursor[E, Any]]],
+        organisasjonsnumre: Iterable[Organisasjonsnummer],
+        *,
+        batch_size: int,
+        max_concurrency: int,
+    ) -> dict[str, E | None]:
+        orgnrs = unique_orgnrs(organisasjonsnumre)
+        results: dict[str, E | None] = dict.fromkeys(orgnrs)
+        cursors = await run_concurrently(
+            search,
+            batched(orgnrs, batch_size),
+            max_concurrency=max_concurrency,
+        )
+        for cursor in cursors:
+            async for item in cursor.items:
+                results[organisasjonsnummer_of(item)] = item
+        return results
+
+
+def default_headers() -> dict[str, str]:
+    return {
+        "user-agent": (
+            f"python-brreg/{brreg.__version__} python-httpx2/{httpx2.__version__}"
+        ),
+    }
+
+
+def proxy_mounts(make_transport: Callable[[str], T]) -> dict[str, T]:
+    """Make a transport per proxy configured in the environment.
+
+    The proxies are read with :func:`urllib.request.getproxies`, from e.g.
+    ``HTTP_PROXY``, ``HTTPS_PROXY`` and ``ALL_PROXY``, as ``httpx2`` does. As
+    the client only talks to the API, no proxy is used if the API's host is
+    excluded by ``NO_PROXY``.
+    """
+    proxies = urllib.request.getproxies()
+    if urllib.request.proxy_bypass(httpx2.URL(BASE_URL).host):
+        return {}
+    mounts: dict[str, T] = {}
+    for scheme in ("http", "https"):
+        proxy = proxies.get(scheme) or proxies.get("all")
+        if proxy:
+            proxy = proxy if "://" in proxy else f"http://{proxy}"
+            mounts[f"{scheme}://"] = make_transport(proxy)
+    return mounts
+
+
+def check_transport_options(
+    transport: object,
+    *,
+    limits: httpx2.Limits | None,
+    http2: bool,
+) -> None:
+    if transport is not None and (limits is not None or http2):
+        msg = "limits and http2 can not be combined with a custom transport"
+        raise ValueError(msg)
+
+
+def check_connections(connections: int) -> None:
+    if connections < 1:
+        msg = f"connections must be at least 1, got {connections}"
+        raise ValueError(msg)
+
+
+def count_query(query: Q) -> Q:
+    # The API requires a page size of at least 1.
+    return query.model_copy(update={"page": None, "size": 1})
+
+
+def facet_queries(query: Q, field: str, values: Iterable[str]) -> dict[str, Q]:
+    """Make one query per value of ``field``, within the given query."""
+    if field not in type(query).model_fields or field in Query.model_fields:
+        msg = f"{type(query).__name__} has no field {field!r} to count by"
+        raise ValueError(msg)
+    params = query.model_dump(exclude_defaults=True)
+    is_list = isinstance(getattr(query, field), tuple)
+    return {
+        value: query.model_validate({**params, field: [value] if is_list else value})
+        for value in dict.fromkeys(values)
+    }
+
+
+def organisasjonsnummer_of(item: object) -> str:
+    """Get the organization number of a model, or of a dict in raw mode."""
+    if isinstance(item, dict):
+        return cast("str", item["organisasjonsnummer"])
+    return cast("str", getattr(item, "organisasjonsnummer"))  # noqa: B009
+
+
+def unique_orgnrs(organisasjonsnumre: Iterable[Organisasjonsnummer]) -> list[str]:
+    """Normalize organization numbers, dropping duplicates but keeping order."""
+    return list(
+        dict.fromkeys(
+            OrganisasjonsnummerValidator.validate_python(orgnr)
+            for orgnr in organisasjonsnumre
+        )
+    )
+
+
+def batched(values: list[A], batch_size: int) -> list[list[A]]:
+    if not 1 <= batch_size <= MAX_BATCH_SIZE:
+        msg = f"batch_size must be between 1 and {MAX_BATCH_SIZE}, got {batch_size}"
+        raise ValueError(msg)
+    return [values[i : i + batch_size] for i in range(0, len(values), batch_size)]
+
+
+async def run_concurrently(
+    operation: Callable[[A], Awaitable[R]],
+    args: list[A],
+    *,
+    max_concurrency: int,
+) -> list[R]:
+    """Run ``operation`` for each argument, with bounded concurrency.
+
+    The results are returned in the same order as the arguments.
+    """
+    if max_concurrency < 1:
+        msg = f"max_concurrency must be at least 1, got {max_concurrency}"
+        raise ValueError(msg)
+
+    pending = iter(enumerate(args))
+    results: dict[int, R] = {}
+
+    # A fixed set of workers pulls from the shared iterator, so that we
+    # don't create one task per argument.
+    async def worker() -> None:
+        for i, arg in pending:
+            results[i] = await operation(arg)
+
+    workers = [
+        asyncio.ensure_future(worker()) for _ in range(min(max_concurrency, len(args)))
+    ]
+    try:
+        await asyncio.gather(*workers)
+    except BaseException:
+        for task in workers:
+            task.cancel()
+        raise
+
+    return [results[i] for i in range(len(args))]
 
 
 @contextmanager
@@ -196,6 +1681,7 @@ def error_handler() -> Generator[None, Any, None]:
             method=(exc.request.method if exc.request else None),
             url=(str(exc.request.url) if exc.request else None),
             status_code=(response.status_code if response else None),
+            retries=(retries_of(exc) if exc.request else 0),
         ) from exc
     except Exception as exc:
         raise BrregError(exc) from exc
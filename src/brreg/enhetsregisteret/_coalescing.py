@@ -0,0 +1,95 @@
+import asyncio
+import functools
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, Generic, TypeVar, cast
+
+__all__: list[str] = []
+
+
+R = TypeVar("R")
+
+
+class Call(Generic[R]):
+    """A call in flight, that other callers can wait for."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: R | None = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one call.
+
+    While a call for a key is in flight, other threads calling with the same
+    key wait for it and get its result, or its exception, instead of making
+    their own call. Once the call is done, the next call for the key is made
+    anew.
+    """
+
+    #: The number of calls that were served by another call in flight.
+    coalesced: int
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Call[Any]] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], R]) -> R:
+        """Call ``func``, unless a call for ``key`` is already in flight."""
+        with self._lock:
+            call: Call[R] | None = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = Call()
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return cast("R", call.result)
+
+        try:
+            call.result = func()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """Coalesces concurrent coroutine calls with the same key into one call.
+
+    See :class:`SingleFlight`. The call runs in its own task, so that it
+    completes for the other waiters even if the caller that started it is
+    cancelled.
+    """
+
+    #: The number of calls that were served by another call in flight.
+    coalesced: int
+
+    def __init__(self) -> None:
+        self._tasks: dict[Hashable, asyncio.Future[Any]] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[R]]) -> R:
+        """Await ``func``, unless a call for ``key`` is already in flight."""
+        task: asyncio.Future[R] | None = self._tasks.get(key)
+        if task is None or task.done():
+            task = self._tasks[key] = asyncio.ensure_future(func())
+            task.add_done_callback(functools.partial(self._forget, key))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future[Any]) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
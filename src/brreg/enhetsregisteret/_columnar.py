@@ -0,0 +1,435 @@
+import datetime as dt
+import math
+import operator
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any, ClassVar, Generic, Literal, TypeVar
+
+try:
+    import numpy as np
+    import numpy.typing as npt
+except ImportError as exc:  # pragma: no cover
+    msg = "The columnar query engine requires numpy: pip install brreg[columnar]"
+    raise ImportError(msg) from exc
+
+from brreg.enhetsregisteret._pagination import Cursor, EnhetPage, Page, UnderenhetPage
+from brreg.enhetsregisteret._queries import EnhetQuery, Query, UnderenhetQuery
+from brreg.enhetsregisteret._responses import Adresse, Enhet, Underenhet
+
+__all__ = [
+    "ColumnarTable",
+    "EnhetTable",
+    "UnderenhetTable",
+]
+
+
+E = TypeVar("E", Enhet, Underenhet)
+Q = TypeVar("Q", bound=Query)
+
+# The page size the API uses if the query does not set one.
+DEFAULT_PAGE_SIZE = 20
+
+# Marks a missing value in integer columns, which only hold counts.
+MISSING_INT = -1
+
+#: How a column is stored:
+#:
+#: - ``"text"``: one casefolded string per row, empty if missing, stored as
+#:   codes into the sorted distinct values.
+#: - ``"bool"``: one of -1 (missing), 0 or 1 per row.
+#: - ``"int"``: one non-negative integer per row, or -1 if missing.
+#: - ``"date"``: one ``datetime64[D]`` per row, or ``NaT`` if missing.
+#: - ``"keys"``: any number of exact strings per row, stored as parallel
+#:   arrays of row indexes and codes into the sorted distinct values.
+ColumnKind = Literal["text", "bool", "int", "date", "keys"]
+
+#: How a query field is matched against a column:
+#:
+#: - ``"eq"``: the column equals the value.
+#: - ``"in"``: the column has any of the values in the list.
+#: - ``"contains"``: the column contains the value as a substring.
+#: - ``"min"``/``"max"``: the column is at least/at most the value.
+FilterOp = Literal["eq", "in", "contains", "min", "max"]
+
+
+@dataclass(frozen=True)
+class Column:
+    """How to extract a column from the entities."""
+
+    kind: ColumnKind
+    get: Callable[[Any], Any]
+
+
+def adresse_field(adresse: str, field: str) -> Callable[[Any], Any]:
+    def get(entity: Any) -> Any:  # noqa: ANN401
+        value: Adresse | None = getattr(entity, adresse)
+        if value is None:
+            return None
+        if field == "adresse":
+            return " ".join(line for line in value.adresse if line)
+        return getattr(value, field)
+
+    return get
+
+
+def as_keys(get: Callable[[Any], Any]) -> Callable[[Any], list[Any]]:
+    return lambda entity: [get(entity)]
+
+
+def adresse_columns(adresse: str) -> dict[str, Column]:
+    return {
+        f"{adresse}.adresse": Column("text", adresse_field(adresse, "adresse")),
+        f"{adresse}.poststed": Column("text", adresse_field(adresse, "poststed")),
+        **{
+            f"{adresse}.{field}": Column("keys", as_keys(adresse_field(adresse, field)))
+            for field in ("kommunenummer", "postnummer", "landkode")
+        },
+    }
+
+
+def adresse_filters(adresse: str) -> dict[str, tuple[FilterOp, str]]:
+    return {
+        f"{adresse}_adresse": ("contains", f"{adresse}.adresse"),
+        f"{adresse}_poststed": ("eq", f"{adresse}.poststed"),
+        f"{adresse}_postnummer": ("in", f"{adresse}.postnummer"),
+        f"{adresse}_landkode": ("in", f"{adresse}.landkode"),
+    }
+
+
+def range_filters(column: str) -> dict[str, tuple[FilterOp, str]]:
+    return {f"fra_{column}": ("min", column), f"til_{column}": ("max", column)}
+
+
+COMMON_COLUMNS: dict[str, Column] = {
+    "organisasjonsnummer": Column("keys", lambda e: [e.organisasjonsnummer]),
+    "navn": Column("text", lambda e: e.navn),
+    "organisasjonsform": Column("keys", lambda e: [e.organisasjonsform.kode]),
+    "hjemmeside": Column("text", lambda e: e.hjemmeside),
+    "overordnet_enhet": Column("text", lambda e: e.overordnet_enhet),
+    "antall_ansatte": Column("int", lambda e: e.antall_ansatte),
+    "registrert_i_mvaregisteret": Column(
+        "bool", lambda e: e.registrert_i_mvaregisteret
+    ),
+    "registreringsdato_enhetsregisteret": Column(
+        "date",
+        lambda e: e.registreringsdato_enhetsregisteret,
+    ),
+    "naeringskode": Column(
+        "keys",
+        lambda e: [
+            naering.kode
+            for naering in (e.naeringskode1, e.naeringskode2, e.naeringskode3)
+            if naering is not None
+        ],
+    ),
+    **adresse_columns("postadresse"),
+}
+
+COMMON_FILTERS: dict[str, tuple[FilterOp, str]] = {
+    "navn": ("contains", "navn"),
+    "organisasjonsnummer": ("in", "organisasjonsnummer"),
+    "overordnet_enhet": ("eq", "overordnet_enhet"),
+    "registrert_i_mvaregisteret": ("eq", "registrert_i_mvaregisteret"),
+    "organisasjonsform": ("in", "organisasjonsform"),
+    "hjemmeside": ("eq", "hjemmeside"),
+    "naeringskode": ("in", "naeringskode"),
+    **range_filters("antall_ansatte"),
+    **range_filters("registreringsdato_enhetsregisteret"),
+    **adresse_filters("postadresse"),
+    "postadresse_kommunenummer": ("in", "postadresse.kommunenummer"),
+}
+
+
+class ColumnarTable(Generic[E, Q]):
+    """In-memory columnar copy of a register, which can be searched locally.
+
+    Each searchable field is stored as a numpy array, and queries are
+    evaluated as vectorized operations over the arrays, so searching a
+    million entities takes milliseconds. Strings are stored once per distinct
+    value, and the entities themselves are kept as compact JSON, which is
+    only parsed for the entities on the requested page.
+
+    Use :class:`EnhetTable` or :class:`UnderenhetTable`.
+
+    Requires numpy, which is installed with the ``columnar`` extra.
+    """
+
+    #: The columns to build, by name.
+    columns: ClassVar[Mapping[str, Column]]
+
+    #: How to match each query field: the operation and the column name.
+    filters: ClassVar[Mapping[str, tuple[FilterOp, str]]]
+
+    #: The entity type, which the rows are parsed back into.
+    entity_type: ClassVar[type[Enhet | Underenhet]]
+
+    #: The page type to return search results in.
+    page_type: ClassVar[type[Page[Any]]]
+
+    _rows: bytes
+    _offsets: npt.NDArray[np.int64]
+    _arrays: dict[str, npt.NDArray[Any]]
+    _categories: dict[str, npt.NDArray[Any]]
+    _keys: dict[str, tuple[npt.NDArray[np.intp], npt.NDArray[np.int32]]]
+    _last_match: tuple[str, npt.NDArray[np.intp]] | None
+
+    def __init__(self, entities: Iterable[E]) -> None:
+        self._arrays = {}
+        self._categories = {}
+        self._keys = {}
+        self._last_match = None
+        by_column: dict[str, list[Any]] = {name: [] for name in self.columns}
+        rows: list[bytes] = []
+        for entity in entities:
+            rows.append(
+                entity.model_dump_json(by_alias=True, exclude_none=True).encode()
+            )
+            for name, column in self.columns.items():
+                by_column[name].append(column.get(entity))
+        self._rows = b"".join(rows)
+        self._offsets = np.cumsum([0, *map(len, rows)], dtype=np.int64)
+        del rows
+
+        for name, column in self.columns.items():
+            # Each column's values are dropped once encoded, to keep the peak
+            # memory use down.
+            values = by_column.pop(name)
+            match column.kind:
+                case "text":
+                    self._arrays[name] = self._encode(
+                        name, [(v or "").casefold() for v in values]
+                    )
+                case "bool":
+                    self._arrays[name] = np.array(
+                        [-1 if v is None else int(v) for v in values],
+                        dtype=np.int8,
+                    )
+                case "int":
+                    self._arrays[name] = np.array(
+                        [MISSING_INT if v is None else v for v in values],
+                        dtype=np.int64,
+                    )
+                case "date":
+                    self._arrays[name] = np.array(
+                        [np.datetime64("NaT") if v is None else v for v in values],
+                        dtype="datetime64[D]",
+                    )
+                case _:  # "keys"
+                    self._keys[name] = (
+                        np.array(
+                            [i for i, vs in enumerate(values) for v in vs if v],
+                            dtype=np.intp,
+                        ),
+                        self._encode(name, [v for vs in values for v in vs if v]),
+                    )
+
+    def _encode(self, name: str, strings: list[str]) -> npt.NDArray[np.int32]:
+        # Most strings repeat, like kommunenummer and poststed, so each
+        # distinct string is stored once, in a variable-width string array,
+        # and the column holds indexes into them.
+        categories, codes = np.unique(
+            np.array(strings, dtype=np.dtypes.StringDType()), return_inverse=True
+        )
+        self._categories[name] = categories
+        return codes.astype(np.int32)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def _entity(self, index: int) -> E:
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self.entity_type.model_validate_json(self._rows[start:end])  # type: ignore[return-value]
+
+    def match(self, query: Q) -> npt.NDArray[np.bool_]:
+        """Get a boolean array of which entities match the query's filters.
+
+        The ``sort``, ``size`` and ``page`` fields are ignored.
+        """
+        mask = np.ones(len(self), dtype=np.bool_)
+        for field, (op, column) in self.filters.items():
+            value = getattr(query, field)
+            if value is None or value == ():
+                continue
+            mask &= self._match_one(op, column, value)
+        return mask
+
+    def _match_one(
+        self,
+        op: FilterOp,
+        column: str,
+        value: Any,  # noqa: ANN401
+    ) -> npt.NDArray[np.bool_]:
+        if op == "in":
+            rows, codes = self._keys[column]
+            wanted = np.isin(self._categories[column], [str(v) for v in value])
+            mask = np.zeros(len(self), dtype=np.bool_)
+            mask[rows[wanted[codes]]] = True
+            return mask
+
+        array = self._arrays[column]
+        result: npt.NDArray[np.bool_]
+        if column in self._categories:
+            # Match the distinct strings in one vectorized operation, then
+            # look up each row's result.
+            value = value.casefold()
+            categories = self._categories[column]
+            hits: npt.NDArray[np.bool_]
+            if op == "eq":
+                hits = categories == value
+            else:  # "contains"
+                hits = np.strings.find(categories, value) >= 0
+            result = hits[array]
+            return result
+
+        if isinstance(value, bool):
+            value = int(value)
+        elif isinstance(value, dt.date):
+            value = np.datetime64(value, "D")
+
+        match op:
+            case "eq":
+                result = array == value
+            case "min":
+                # Missing integers (-1) and dates (NaT) never match.
+                result = array >= value
+            case "max" if array.dtype.kind == "i":
+                result = (array <= value) & (array != MISSING_INT)
+            case _:
+                result = array <= value
+        return result
+
+    def search(self, query: Q) -> Cursor[E, Q]:
+        """Search for entities that match the given query.
+
+        Returns the same kind of cursor as :meth:`Client.search_enhet`, but
+        without any API requests. Unlike the API, which does a fuzzy search
+        on ``navn``, names are matched by case-insensitive substring.
+
+        :param query: The search query.
+        """
+        indexes = self._matching_indexes(query)
+        size = query.size or DEFAULT_PAGE_SIZE
+        page_number = query.page or 0
+        start = page_number * size
+        page = self.page_type.model_construct(
+            items=[self._entity(i) for i in indexes[start : start + size]],
+            page_size=size,
+            page_number=page_number,
+            total_elements=len(indexes),
+            total_pages=math.ceil(len(indexes) / size),
+        )
+        return Cursor(self.search, query, page)
+
+    def _matching_indexes(self, query: Q) -> npt.NDArray[np.intp]:
+        # Paging through the results evaluates the same filters over and
+        # over, so the last result is kept.
+        key = query.model_copy(update={"page": None, "size": None}).as_url_query()
+        last_match = self._last_match
+        if last_match is not None and last_match[0] == key:
+            return last_match[1]
+        indexes = np.flatnonzero(self.match(query))
+        if query.sort == "DESC":
+            indexes = indexes[::-1]
+        self._last_match = (key, indexes)
+        return indexes
+
+
+class EnhetTable(ColumnarTable[Enhet, EnhetQuery]):
+    """Columnar copy of :class:`Enhet`, searchable with :class:`EnhetQuery`.
+
+    Example::
+
+        table = EnhetTable(read_enheter("enheter.json.gz"))
+        cursor = table.search(EnhetQuery(kommunenummer=["0301"], konkurs=True))
+    """
+
+    columns: ClassVar[Mapping[str, Column]] = {
+        **COMMON_COLUMNS,
+        **adresse_columns("forretningsadresse"),
+        "stiftelsesdato": Column("date", lambda e: e.stiftelsesdato),
+        "institusjonell_sektorkode": Column(
+            "keys",
+            lambda e: [
+                e.institusjonell_sektorkode and e.institusjonell_sektorkode.kode,
+            ],
+        ),
+        "frivillig_mva_registrert_beskrivelser": Column(
+            "keys",
+            lambda e: e.frivillig_mva_registrert_beskrivelser,
+        ),
+        "siste_innsendte_aarsregnskap": Column(
+            "keys",
+            lambda e: [
+                e.siste_innsendte_aarsregnskap and str(e.siste_innsendte_aarsregnskap)
+            ],
+        ),
+        **{
+            name: Column("bool", operator.attrgetter(name))
+            for name in (
+                "konkurs",
+                "registrert_i_foretaksregisteret",
+                "registrert_i_stiftelsesregisteret",
+                "registrert_i_frivillighetsregisteret",
+                "under_tvangsavvikling_eller_tvangsopplosning",
+                "under_avvikling",
+            )
+        },
+    }
+
+    filters: ClassVar[Mapping[str, tuple[FilterOp, str]]] = {
+        **COMMON_FILTERS,
+        **adresse_filters("forretningsadresse"),
+        "kommunenummer": ("in", "forretningsadresse.kommunenummer"),
+        **range_filters("stiftelsesdato"),
+        "institusjonell_sektorkode": ("in", "institusjonell_sektorkode"),
+        "frivillig_registrert_i_mvaregisteret": (
+            "in",
+            "frivillig_mva_registrert_beskrivelser",
+        ),
+        "siste_innsendte_aarsregnskap": ("in", "siste_innsendte_aarsregnskap"),
+        "konkurs": ("eq", "konkurs"),
+        "registrert_i_foretaksregisteret": ("eq", "registrert_i_foretaksregisteret"),
+        "registrert_i_stiftelsesregisteret": (
+            "eq",
+            "registrert_i_stiftelsesregisteret",
+        ),
+        "registrert_i_frivillighetsregisteret": (
+            "eq",
+            "registrert_i_frivillighetsregisteret",
+        ),
+        "under_tvangsavvikling_eller_tvangsopplosning": (
+            "eq",
+            "under_tvangsavvikling_eller_tvangsopplosning",
+        ),
+        "under_avvikling": ("eq", "under_avvikling"),
+    }
+
+    entity_type: ClassVar[type[Enhet | Underenhet]] = Enhet
+    page_type: ClassVar[type[Page[Any]]] = EnhetPage
+
+
+class UnderenhetTable(ColumnarTable[Underenhet, UnderenhetQuery]):
+    """Columnar copy of :class:`Underenhet`, searchable locally.
+
+    Searched with :class:`UnderenhetQuery`. See :class:`EnhetTable` for details.
+    """
+
+    columns: ClassVar[Mapping[str, Column]] = {
+        **COMMON_COLUMNS,
+        **adresse_columns("beliggenhetsadresse"),
+        "oppstartsdato": Column("date", lambda e: e.oppstartsdato),
+        "dato_eierskifte": Column("date", lambda e: e.dato_eierskifte),
+        "nedleggelsesdato": Column("date", lambda e: e.nedleggelsesdato),
+    }
+
+    filters: ClassVar[Mapping[str, tuple[FilterOp, str]]] = {
+        **COMMON_FILTERS,
+        **adresse_filters("beliggenhetsadresse"),
+        "kommunenummer": ("in", "beliggenhetsadresse.kommunenummer"),
+        **range_filters("oppstartsdato"),
+        **range_filters("dato_eierskifte"),
+        **range_filters("nedleggelsesdato"),
+    }
+
+    entity_type: ClassVar[type[Enhet | Underenhet]] = Underenhet
+    page_type: ClassVar[type[Page[Any]]] = UnderenhetPage
@@ -0,0 +1,233 @@
+import json
+import os
+import re
+import time
+import zlib
+from collections.abc import Iterable, Mapping
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from brreg import BrregError
+from brreg.enhetsregisteret._bulk import (
+    GZIP_MAGIC,
+    BulkDataset,
+    BulkFormat,
+    gunzip,
+    read_chunks,
+)
+
+__all__ = [
+    "DumpFile",
+]
+
+
+CONTENT_RANGE_PATTERN = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+
+
+@dataclass(frozen=True)
+class DumpFile:
+    """A bulk dump that has been downloaded to a local file."""
+
+    #: The register the dump contains.
+    dataset: BulkDataset
+
+    #: The file format of the dump.
+    file_format: BulkFormat
+
+    #: The path to the gzipped dump.
+    path: Path
+
+    #: The size of the gzipped dump, in bytes.
+    size: int
+
+    #: The entity tag the server gave the dump, if any.
+    etag: str | None
+
+    #: The last modified time the server gave the dump, if any.
+    last_modified: str | None
+
+    #: When the dump was downloaded, as a Unix timestamp.
+    downloaded_at: float
+
+    #: Whether the dump was changed by this download. ``False`` if the server
+    #: reported that the local copy was still up to date.
+    changed: bool
+
+
+@dataclass(frozen=True)
+class Validators:
+    """The HTTP cache validators of a downloaded file."""
+
+    etag: str | None = None
+    last_modified: str | None = None
+    size: int = 0
+    downloaded_at: float = 0.0
+
+    @classmethod
+    def from_headers(cls, headers: Mapping[str, str]) -> "Validators":
+        return cls(
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "Validators | None":
+        try:
+            return cls(**json.loads(path.read_text()))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def save(self, path: Path) -> None:
+        write_atomically(path, json.dumps(asdict(self)).encode())
+
+
+class DumpFiles:
+    """The local files of one bulk dump.
+
+    The dump is stored as ``<dataset>.<format>.gz``. While downloading, the
+    data is written to a ``.part`` file, which is kept if the download is
+    interrupted, so that the download can be resumed. When the download is
+    complete and verified, the ``.part`` file atomically replaces the dump.
+
+    Next to each file is a ``.meta.json`` file with the cache validators the
+    server returned.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        dataset: BulkDataset,
+        file_format: BulkFormat,
+    ) -> None:
+        self.dataset: BulkDataset = dataset
+        self.file_format: BulkFormat = file_format
+        self.path = Path(directory) / f"{dataset}.{file_format}.gz"
+        self.meta_path = self.path.with_name(f"{self.path.name}.meta.json")
+        self.part_path = self.path.with_name(f"{self.path.name}.part")
+        self.part_meta_path = self.path.with_name(f"{self.part_path.name}.meta.json")
+
+    def request_headers(self) -> dict[str, str]:
+        """Get the headers for a conditional or resumed download."""
+        part_meta = Validators.load(self.part_meta_path)
+        part_size = self.part_path.stat().st_size if self.part_path.exists() else 0
+        if part_meta is not None and part_size > 0:
+            validator = part_meta.etag or part_meta.last_modified
+            if validator is not None:
+                return {"range": f"bytes={part_size}-", "if-range": validator}
+
+        meta = Validators.load(self.meta_path) if self.path.exists() else None
+        headers: dict[str, str] = {}
+        if meta is not None and meta.etag is not None:
+            headers["if-none-match"] = meta.etag
+        if meta is not None and meta.last_modified is not None:
+            headers["if-modified-since"] = meta.last_modified
+        return headers
+
+    def unchanged(self) -> DumpFile:
+        """Get the local dump after the server reported it is up to date."""
+        meta = Validators.load(self.meta_path) or Validators()
+        return self._dump_file(meta, changed=False)
+
+    def receive(
+        self,
+        status_code: int,
+        headers: Mapping[str, str],
+        chunks: Iterable[bytes],
+    ) -> DumpFile:
+        """Write a downloaded dump to disk, verify it, and swap it in."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        validators = Validators.from_headers(headers)
+        expected_size: int | None = None
+
+        if status_code == 206:  # noqa: PLR2004
+            start, expected_size = self._parse_content_range(headers)
+            if start != self.part_path.stat().st_size:
+                self._discard_part()
+                msg = f"Server resumed {self.path.name} at the wrong offset: {start}"
+                raise BrregError(msg)
+            mode = "ab"
+        else:
+            if "content-length" in headers:
+                expected_size = int(headers["content-length"])
+            validators.save(self.part_meta_path)
+            mode = "wb"
+
+        with self.part_path.open(mode) as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+
+        try:
+            self._verify(expected_size)
+        except BrregError:
+            self._discard_part()
+            raise
+
+        meta = Validators(
+            etag=validators.etag,
+            last_modified=validators.last_modified,
+            size=self.part_path.stat().st_size,
+            downloaded_at=time.time(),
+        )
+        self.part_path.replace(self.path)
+        meta.save(self.meta_path)
+        self.part_meta_path.unlink(missing_ok=True)
+        return self._dump_file(meta, changed=True)
+
+    def _parse_content_range(
+        self, headers: Mapping[str, str]
+    ) -> tuple[int, int | None]:
+        match = CONTENT_RANGE_PATTERN.match(headers.get("content-range", ""))
+        if match is None:
+            self._discard_part()
+            msg = f"Invalid Content-Range for {self.path.name}"
+            raise BrregError(msg)
+        start, _, total = match.groups()
+        return int(start), (None if total == "*" else int(total))
+
+    def _verify(self, expected_size: int | None) -> None:
+        size = self.part_path.stat().st_size
+        if expected_size is not None and size != expected_size:
+            msg = f"Incomplete download of {self.path.name}: {size} of {expected_size}"
+            raise BrregError(msg)
+        # The dumps are always gzipped, but gunzip() passes anything else
+        # through unchanged, e.g. an HTML error page.
+        with self.part_path.open("rb") as f:
+            magic = f.read(len(GZIP_MAGIC))
+        if magic != GZIP_MAGIC:
+            msg = f"Corrupt download of {self.path.name}: not gzip data"
+            raise BrregError(msg)
+        # Decompress the whole file, which checks the gzip CRC and length.
+        try:
+            for _ in gunzip(read_chunks(self.part_path)):
+                pass
+        except zlib.error as exc:
+            msg = f"Corrupt download of {self.path.name}: {exc}"
+            raise BrregError(msg) from exc
+
+    def _discard_part(self) -> None:
+        self.part_path.unlink(missing_ok=True)
+        self.part_meta_path.unlink(missing_ok=True)
+
+    def _dump_file(self, meta: Validators, *, changed: bool) -> DumpFile:
+        return DumpFile(
+            dataset=self.dataset,
+            file_format=self.file_format,
+            path=self.path,
+            size=meta.size,
+            etag=meta.etag,
+            last_modified=meta.last_modified,
+            downloaded_at=meta.downloaded_at,
+            changed=changed,
+        )
+
+
+def write_atomically(path: Path, data: bytes) -> None:
+    """Write a file so that readers see either the old or the new content."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    tmp_path.replace(path)
@@ -0,0 +1,176 @@
+import datetime as dt
+import os
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Generic, Literal, TypeVar
+
+from brreg import BrregError
+from brreg.enhetsregisteret._downloads import write_atomically
+from brreg.enhetsregisteret._pagination import Cursor
+from brreg.enhetsregisteret._queries import OppdateringQuery
+from brreg.enhetsregisteret._responses import Enhet, Oppdatering, Underenhet
+from brreg.enhetsregisteret._types import Organisasjonsnummer
+
+__all__ = [
+    "ChangeEvent",
+    "ChangeType",
+    "Checkpoint",
+    "FileCheckpoint",
+]
+
+
+E = TypeVar("E", Enhet, Underenhet)
+
+#: The kinds of changes reported by :class:`ChangeEvent`.
+ChangeType = Literal["created", "updated", "deleted"]
+
+CHANGE_TYPES: dict[str, ChangeType] = {
+    "Ny": "created",
+    "Endring": "updated",
+    "Sletting": "deleted",
+    "Fjernet": "deleted",
+}
+
+
+@dataclass(frozen=True)
+class ChangeEvent(Generic[E]):
+    """A change to an :class:`Enhet` or :class:`Underenhet`."""
+
+    #: Whether the entity was ``"created"``, ``"updated"``, or ``"deleted"``.
+    #: Changes of unknown type are reported as ``"updated"``.
+    change_type: ChangeType
+
+    #: The update from the feed.
+    oppdatering: Oppdatering
+
+    #: The current state of the entity, or ``None`` if it is deleted or could
+    #: not be found.
+    entity: E | None
+
+    @property
+    def organisasjonsnummer(self) -> str:
+        """The organization number of the changed entity."""
+        return self.oppdatering.organisasjonsnummer
+
+    @property
+    def oppdateringsid(self) -> int:
+        """The ID of the update in the feed."""
+        return self.oppdatering.oppdateringsid
+
+
+class Checkpoint:
+    """Position in an update feed, kept in memory.
+
+    Subclass and override :meth:`load` and :meth:`save` to persist the
+    position somewhere else.
+    """
+
+    def __init__(self, oppdateringsid: int | None = None) -> None:
+        self._oppdateringsid = oppdateringsid
+
+    def load(self) -> int | None:
+        """Get the ID of the last consumed update, or ``None`` if none are."""
+        return self._oppdateringsid
+
+    def save(self, oppdateringsid: int) -> None:
+        """Record that all updates up to and including this ID are consumed."""
+        self._oppdateringsid = oppdateringsid
+
+
+class FileCheckpoint(Checkpoint):
+    """Position in an update feed, kept in a file.
+
+    The file is replaced atomically, so that it always holds either the old
+    or the new position, even if the process is killed while saving.
+
+    :param path: Path to the checkpoint file. It is created on the first save.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        super().__init__()
+        self.path = Path(path)
+
+    def load(self) -> int | None:
+        try:
+            text = self.path.read_text().strip()
+        except FileNotFoundError:
+            return None
+        if not text.isdigit():
+            msg = f"Invalid checkpoint in {self.path}: {text!r}"
+            raise BrregError(msg)
+        return int(text)
+
+    def save(self, oppdateringsid: int) -> None:
+        write_atomically(self.path, f"{oppdateringsid}\n".encode())
+
+
+def iter_changes(
+    search: Callable[[OppdateringQuery], Cursor[Oppdatering, OppdateringQuery]],
+    get_many: Callable[[Iterable[Organisasjonsnummer]], dict[str, E | None]],
+    checkpoint: Checkpoint,
+    *,
+    since: dt.datetime | None,
+    batch_size: int,
+) -> Iterator[ChangeEvent[E]]:
+    """Page through an update feed, and fetch the changed entities.
+
+    The feed is read with one request per batch, each starting right after
+    the last update of the previous batch, so that it is never necessary to
+    page deeper than the first page. The checkpoint is saved when all events
+    of a batch have been consumed.
+
+    The arguments are checked, and the checkpoint is loaded, when this is
+    called, not when the iteration starts.
+    """
+    last_id = checkpoint.load()
+    if last_id is None and since is None:
+        msg = "since is required when the checkpoint is empty"
+        raise ValueError(msg)
+    query = first_query(last_id, since, batch_size)
+    return consume_feed(search, get_many, checkpoint, query, batch_size)
+
+
+def first_query(
+    last_id: int | None,
+    since: dt.datetime | None,
+    batch_size: int,
+) -> OppdateringQuery:
+    if last_id is None:
+        return OppdateringQuery(dato=since, size=batch_size)
+    return OppdateringQuery(oppdateringsid=last_id + 1, size=batch_size)
+
+
+def consume_feed(
+    search: Callable[[OppdateringQuery], Cursor[Oppdatering, OppdateringQuery]],
+    get_many: Callable[[Iterable[Organisasjonsnummer]], dict[str, E | None]],
+    checkpoint: Checkpoint,
+    query: OppdateringQuery,
+    batch_size: int,
+) -> Iterator[ChangeEvent[E]]:
+    while True:
+        page = search(query).get_page(0)
+        if page is None or not page.items:
+            return
+
+        changes = [
+            (oppdatering, CHANGE_TYPES.get(oppdatering.endringstype, "updated"))
+            for oppdatering in page.items
+        ]
+        entities = get_many(
+            oppdatering.organisasjonsnummer
+            for oppdatering, change_type in changes
+            if change_type != "deleted"
+        )
+        for oppdatering, change_type in changes:
+            yield ChangeEvent(
+                change_type=change_type,
+                oppdatering=oppdatering,
+                entity=entities.get(oppdatering.organisasjonsnummer),
+            )
+
+        last_id = page.items[-1].oppdateringsid
+        checkpoint.save(last_id)
+        if page.total_pages <= 1:
+            return
+        query = first_query(last_id, None, batch_size)
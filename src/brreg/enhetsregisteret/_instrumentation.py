@@ -0,0 +1,369 @@
+import bisect
+import copy
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+import httpx2
+
+from brreg import BrregRestError
+from brreg.enhetsregisteret._queries import Query
+from brreg.enhetsregisteret._retry import RETRIES_EXTENSION
+
+__all__ = [
+    "EndpointStats",
+    "Histogram",
+    "RequestEvent",
+    "RequestHook",
+    "RequestStats",
+]
+
+
+@dataclass(frozen=True)
+class RequestEvent:
+    """What happened during one operation against the API.
+
+    An event is reported for each lookup, search page, and count, including
+    lookups served from the cache. All times are in seconds.
+    """
+
+    #: The operation, e.g. ``"enhet"``, ``"roller"``, ``"search_enhet"``, or
+    #: ``"count_underenheter"``.
+    endpoint: str
+
+    #: The organization number that was looked up, or the URL query of the
+    #: search.
+    target: str
+
+    #: The HTTP status code of the response, or ``None`` if no response was
+    #: received, e.g. because the connection failed, the result was served
+    #: from the cache, or it was shared with a concurrent identical request.
+    status_code: int | None
+
+    #: The number of bytes in the response body.
+    bytes_received: int
+
+    #: The time spent opening a new connection, including the TLS handshake,
+    #: or ``None`` if an existing connection was reused.
+    connect_time: float | None
+
+    #: The time from the start of the operation until the response headers
+    #: were received, or ``None`` if unknown, e.g. with a custom transport.
+    ttfb: float | None
+
+    #: The time from the start of the operation until the response body was
+    #: received, including connecting, waiting, and retrying. If no response
+    #: was received, the time until the operation ended.
+    total_time: float
+
+    #: The time spent decoding and validating the response, or ``None`` if
+    #: nothing was parsed.
+    parse_time: float | None
+
+    #: Whether the result was found in the cache, or ``None`` if the client
+    #: has no cache or the endpoint is not cached.
+    cache: Literal["hit", "miss"] | None
+
+    #: The number of retries made before the final response or error.
+    retries: int
+
+    #: The exception the operation failed with, if any.
+    error: BaseException | None
+
+
+#: A callable that receives a :class:`RequestEvent` after each operation.
+#: It is called in the thread or task that made the request, and should
+#: return quickly and not raise.
+RequestHook = Callable[[RequestEvent], None]
+
+
+class Observation:
+    """The measurements of an operation in progress."""
+
+    def __init__(self, endpoint: str, target: str) -> None:
+        self.endpoint = endpoint
+        self.target = target
+        self.started = time.perf_counter()
+        self.status_code: int | None = None
+        self.bytes_received = 0
+        self.connect_time: float | None = None
+        self.ttfb: float | None = None
+        self.total_time: float | None = None
+        self.parse_time: float | None = None
+        self.cache: Literal["hit", "miss"] | None = None
+        self.retries = 0
+        self._connect_started: float | None = None
+
+    def trace(self, name: str, info: Mapping[str, Any]) -> None:  # noqa: ARG002
+        """Record connection events, as an httpcore ``trace`` extension."""
+        now = time.perf_counter()
+        if name == "connection.connect_tcp.started":
+            self._connect_started = now
+        elif name in {
+            "connection.connect_tcp.complete",
+            "connection.start_tls.complete",
+        }:
+            assert self._connect_started is not None  # noqa: S101
+            self.connect_time = now - self._connect_started
+        elif name.endswith(".receive_response_headers.complete"):
+            self.ttfb = now - self.started
+
+    async def atrace(self, name: str, info: Mapping[str, Any]) -> None:
+        """Record connection events, as an async httpcore ``trace`` extension."""
+        self.trace(name, info)
+
+    def response(self, res: httpx2.Response) -> None:
+        self.status_code = res.status_code
+        self.bytes_received = len(res.content)
+        self.retries = int(res.request.extensions.get(RETRIES_EXTENSION, 0))
+        self.total_time = time.perf_counter() - self.started
+
+    def event(self, error: BaseException | None) -> RequestEvent:
+        status_code, retries = self.status_code, self.retries
+        if isinstance(error, BrregRestError):
+            status_code = status_code or error.status_code
+            retries = max(retries, error.retries)
+        return RequestEvent(
+            endpoint=self.endpoint,
+            target=self.target,
+            status_code=status_code,
+            bytes_received=self.bytes_received,
+            connect_time=self.connect_time,
+            ttfb=self.ttfb,
+            total_time=(
+                self.total_time
+                if self.total_time is not None
+                else time.perf_counter() - self.started
+            ),
+            parse_time=self.parse_time,
+            cache=self.cache,
+            retries=retries,
+            error=error,
+        )
+
+
+# The operation in progress in the current thread or task, if any.
+current: ContextVar[Observation | None] = ContextVar(
+    "brreg_observation",
+    default=None,
+)
+
+
+@contextmanager
+def observe(
+    hook: RequestHook | None,
+    endpoint: str,
+    target: str | Query,
+) -> Iterator[None]:
+    """Report a :class:`RequestEvent` to ``hook`` when the block exits.
+
+    Within an operation that is already observed, this does nothing, so that
+    each operation reports one event, even if it is built on another
+    observed operation.
+    """
+    if hook is None or current.get() is not None:
+        yield
+        return
+    if isinstance(target, Query):
+        target = target.as_url_query()
+    observation = Observation(endpoint, target)
+    token = current.set(observation)
+    error: BaseException | None = None
+    try:
+        yield
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        current.reset(token)
+        hook(observation.event(error))
+
+
+@contextmanager
+def parsing() -> Iterator[None]:
+    """Measure the time spent parsing in the current operation."""
+    observation = current.get()
+    if observation is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        observation.parse_time = (observation.parse_time or 0) + elapsed
+
+
+def record_cache(*, hit: bool) -> None:
+    observation = current.get()
+    if observation is not None:
+        observation.cache = "hit" if hit else "miss"
+
+
+def record_response(res: httpx2.Response) -> None:
+    observation = current.get()
+    if observation is not None:
+        observation.response(res)
+
+
+def trace_extensions() -> dict[str, Any]:
+    """Request extensions that record connection events, if observing."""
+    observation = current.get()
+    return {} if observation is None else {"trace": observation.trace}
+
+
+def async_trace_extensions() -> dict[str, Any]:
+    """Request extensions that record connection events, if observing."""
+    observation = current.get()
+    return {} if observation is None else {"trace": observation.atrace}
+
+
+#: The default upper bounds of the histogram buckets, in seconds.
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class Histogram:
+    """A histogram of durations, in fixed buckets."""
+
+    #: The upper bounds of the buckets, in seconds.
+    buckets: tuple[float, ...]
+
+    #: The number of observations per bucket. The last count is for
+    #: observations above the largest bound.
+    counts: list[int]
+
+    #: The number of observations.
+    count: int = 0
+
+    #: The sum of all observations.
+    total: float = 0.0
+
+    @classmethod
+    def empty(cls, buckets: tuple[float, ...]) -> "Histogram":
+        return cls(buckets=buckets, counts=[0] * (len(buckets) + 1))
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    @property
+    def mean(self) -> float | None:
+        """The mean of all observations, or ``None`` if there are none."""
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate a quantile, as the upper bound of the bucket it falls in.
+
+        Returns ``inf`` if the quantile is above the largest bound, and
+        ``None`` if there are no observations.
+
+        :param q: The quantile, between 0 and 1, e.g. 0.99.
+        """
+        if not 0 <= q <= 1:
+            msg = f"q must be between 0 and 1, got {q}"
+            raise ValueError(msg)
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts, strict=False):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+@dataclass
+class EndpointStats:
+    """Aggregated :class:`RequestEvent` for one endpoint."""
+
+    #: The number of operations.
+    requests: int = 0
+
+    #: The number of operations that failed.
+    errors: int = 0
+
+    #: The number of lookups served from the cache.
+    cache_hits: int = 0
+
+    #: The number of lookups not found in the cache.
+    cache_misses: int = 0
+
+    #: The total number of retries.
+    retries: int = 0
+
+    #: The total number of bytes received.
+    bytes_received: int = 0
+
+    #: The distribution of :attr:`RequestEvent.total_time`.
+    latency: Histogram = field(default_factory=lambda: Histogram.empty(()))
+
+    #: The distribution of :attr:`RequestEvent.parse_time`, for operations
+    #: that parsed a response.
+    parse_time: Histogram = field(default_factory=lambda: Histogram.empty(()))
+
+
+class RequestStats:
+    """Aggregates request events per endpoint, for metrics or logging.
+
+    Pass an instance as the ``on_request`` hook of :class:`Client` or
+    :class:`AsyncClient`, and read the numbers with :meth:`snapshot`, e.g.
+    from a metrics endpoint or a periodic log statement. It is safe to share
+    between threads and clients.
+
+    Example::
+
+        stats = RequestStats()
+        client = Client(on_request=stats)
+        ...
+        for endpoint, counts in stats.snapshot(reset=True).items():
+            p99 = counts.latency.quantile(0.99)
+            log.info("%s: %d requests, p99 %s s", endpoint, counts.requests, p99)
+    """
+
+    #: The upper bounds of the histogram buckets, in seconds.
+    buckets: tuple[float, ...]
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        if list(buckets) != sorted(set(buckets)):
+            msg = "buckets must be strictly increasing"
+            raise ValueError(msg)
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._stats: dict[str, EndpointStats] = {}
+
+    def __call__(self, event: RequestEvent) -> None:
+        with self._lock:
+            stats = self._stats.get(event.endpoint)
+            if stats is None:
+                stats = self._stats[event.endpoint] = EndpointStats(
+                    latency=Histogram.empty(self.buckets),
+                    parse_time=Histogram.empty(self.buckets),
+                )
+            stats.requests += 1
+            stats.errors += event.error is not None
+            stats.cache_hits += event.cache == "hit"
+            stats.cache_misses += event.cache == "miss"
+            stats.retries += event.retries
+            stats.bytes_received += event.bytes_received
+            stats.latency.observe(event.total_time)
+            if event.parse_time is not None:
+                stats.parse_time.observe(event.parse_time)
+
+    def snapshot(self, *, reset: bool = False) -> dict[str, EndpointStats]:
+        """Get a copy of the stats per endpoint.
+
+        :param reset: Whether to start counting from zero afterwards, e.g. to
+            log the stats of each interval.
+        """
+        with self._lock:
+            stats = copy.deepcopy(self._stats)
+            if reset:
+                self._stats.clear()
+        return stats
@@ -0,0 +1,91 @@
+from typing import Any, TypeVar, cast
+
+from pydantic import BaseModel
+
+from brreg.enhetsregisteret._responses import (
+    Adresse,
+    InstitusjonellSektor,
+    Naering,
+    Organisasjonsform,
+)
+
+__all__ = [
+    "Interner",
+]
+
+
+M = TypeVar("M", bound=BaseModel)
+
+# Code lists, of which there are only a few hundred distinct values in the
+# whole register.
+SHARED_MODELS = (Organisasjonsform, Naering, InstitusjonellSektor)
+
+# Address fields that repeat across many entities.
+SHARED_ADRESSE_FIELDS = (
+    "postnummer",
+    "poststed",
+    "kommunenummer",
+    "kommune",
+    "landkode",
+    "land",
+)
+
+
+class Interner:
+    """Shares equal values between parsed objects, to save memory.
+
+    A page or bulk dump of thousands of entities holds a few dozen distinct
+    :class:`Organisasjonsform`, and repeats the same :class:`Naering`,
+    :class:`InstitusjonellSektor`, and address strings over and over. When an
+    interner is given to the client, or to :func:`read_enheter` and
+    :func:`read_underenheter`, equal instances of these are replaced by one
+    shared instance, and the repeated address strings by one shared string.
+
+    The interner grows with the number of distinct values, and can be reused
+    across clients and threads. Keep it for as long as the parsed objects
+    are in use, and treat the shared objects as read-only: modifying one
+    modifies it for every entity that shares it.
+
+    Example::
+
+        interner = Interner()
+        table = EnhetTable(read_enheter(dump.path, interner=interner))
+    """
+
+    def __init__(self) -> None:
+        self._values: dict[Any, Any] = {}
+
+    def __len__(self) -> int:
+        """The number of distinct values held by the interner."""
+        return len(self._values)
+
+    def intern(self, obj: M) -> M:
+        """Replace the nested values of a parsed object with shared ones.
+
+        The object is updated in place, and returned.
+        """
+        values = obj.__dict__
+        for name, value in values.items():
+            if isinstance(value, BaseModel):
+                values[name] = self._intern_model(value)
+            elif isinstance(value, list) and value and isinstance(value[0], BaseModel):
+                values[name] = [self._intern_model(item) for item in value]
+        return obj
+
+    def _intern_model(self, obj: BaseModel) -> BaseModel:
+        if isinstance(obj, SHARED_MODELS):
+            return cast(
+                "BaseModel", self._shared((type(obj), *obj.__dict__.values()), obj)
+            )
+        if isinstance(obj, Adresse):
+            values = obj.__dict__
+            for name in SHARED_ADRESSE_FIELDS:
+                value = values[name]
+                if value is not None:
+                    values[name] = self._shared(value, value)
+            return obj
+        return self.intern(obj)
+
+    def _shared(self, key: object, value: Any) -> Any:  # noqa: ANN401
+        # setdefault() is atomic, so concurrent threads agree on one value.
+        return self._values.setdefault(key, value)
@@ -0,0 +1,423 @@
+import asyncio
+import math
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from dataclasses import dataclass
+from typing import Literal, cast
+
+import httpx2
+
+__all__ = [
+    "AdaptiveLimiter",
+    "LimitChange",
+    "Outcome",
+]
+
+
+#: The outcome of a request, as reported to :meth:`AdaptiveLimiter.release`.
+#:
+#: - ``"ok"``: The request succeeded, or failed for a reason that is not
+#:   caused by load, like ``404 Not Found``.
+#: - ``"rate_limited"``: The server responded with ``429 Too Many Requests``.
+#: - ``"server_error"``: The server responded with a 5xx status code.
+#: - ``"error"``: The connection failed or timed out.
+#: - ``"cancelled"``: The request was cancelled, or failed for a reason that
+#:   says nothing about the server's health. The slot is freed, but the
+#:   limit is left as it is.
+Outcome = Literal["ok", "rate_limited", "server_error", "error", "cancelled"]
+
+# Transport errors that are taken as a sign of overload.
+OVERLOAD_EXCEPTIONS = (httpx2.TimeoutException, httpx2.NetworkError)
+
+# The weight of a new sample in the smoothed latency.
+LATENCY_SMOOTHING = 0.1
+
+
+@dataclass(frozen=True)
+class LimitChange:
+    """A change of an :class:`AdaptiveLimiter`'s concurrency limit."""
+
+    #: The limit before the change.
+    old_limit: int
+
+    #: The limit after the change.
+    new_limit: int
+
+    #: Why the limit changed: ``"increase"`` after healthy responses, or
+    #: ``"rate_limited"``, ``"server_error"``, ``"error"``, or ``"latency"``
+    #: when it was cut.
+    reason: str
+
+    #: The number of requests in flight when the limit changed.
+    in_flight: int
+
+
+class AdaptiveLimiter:
+    """Limits the number of concurrent requests, adapting to the server.
+
+    The limit is adjusted with additive increase, multiplicative decrease
+    (AIMD): while responses are healthy, the limit grows by about one for
+    each round of ``limit`` requests. When the server responds with ``429
+    Too Many Requests`` or a 5xx status code, a request fails to connect or
+    times out, or the latency spikes above ``latency_tolerance`` times the
+    smoothed latency, the limit is multiplied by ``backoff_ratio``. The
+    limit is cut at most once per round, as the requests that were already
+    in flight when it was cut are likely to fail too.
+
+    Optionally, the request rate is capped with a token bucket of ``rate``
+    requests per second, with bursts of up to ``burst`` requests.
+
+    A limiter can be shared by several clients, both :class:`Client` and
+    :class:`AsyncClient`, which then share the limit. Since the limiter
+    bounds the number of requests in flight, bulk operations like
+    :meth:`Client.get_enheter` and :meth:`AsyncClient.gather` can be given a
+    high ``max_workers`` or ``max_concurrency``, leaving it to the limiter to
+    find how many requests the server can take.
+
+    Example::
+
+        limiter = AdaptiveLimiter(max_limit=32, rate=50)
+        client = Client(limiter=limiter)
+        enheter = client.get_enheter(orgnrs, max_workers=32)
+        print(limiter.limit, limiter.in_flight)
+
+    :param initial_limit: The concurrency limit to start with.
+    :param min_limit: The lowest the limit can be cut to.
+    :param max_limit: The highest the limit can grow to.
+    :param backoff_ratio: What to multiply the limit by when cutting it.
+    :param latency_tolerance: How many times the smoothed latency a response
+        can take before it counts as a latency spike. If ``None``, latency is
+        not considered.
+    :param rate: The maximum number of requests to start per second. If
+        ``None``, the rate is not limited.
+    :param burst: The number of requests that can be started at once when
+        the rate is limited. Defaults to ``rate``, rounded up.
+    :param on_change: Optional function to call with a :class:`LimitChange`
+        each time the limit changes.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float | None = 3.0,
+        rate: float | None = None,
+        burst: int | None = None,
+        on_change: Callable[[LimitChange], None] | None = None,
+    ) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            msg = (
+                "Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit, "
+                f"got {min_limit}, {initial_limit}, {max_limit}"
+            )
+            raise ValueError(msg)
+        if not 0 < backoff_ratio < 1:
+            msg = f"backoff_ratio must be between 0 and 1, got {backoff_ratio}"
+            raise ValueError(msg)
+        if rate is not None and rate <= 0:
+            msg = f"rate must be positive, got {rate}"
+            raise ValueError(msg)
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.rate = rate
+        self.burst = burst if burst is not None else math.ceil(rate or 1)
+        self.on_change = on_change
+
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._async_waiters: list[asyncio.Future[None]] = []
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._latency: float | None = None
+        self._last_cut = -math.inf
+        self._tokens = float(self.burst)
+        self._tokens_updated = time.monotonic()
+
+    @property
+    def limit(self) -> int:
+        """The current concurrency limit."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """The number of requests currently in flight."""
+        return self._in_flight
+
+    @property
+    def latency(self) -> float | None:
+        """The smoothed latency of healthy responses, in seconds."""
+        return self._latency
+
+    def acquire(self) -> float:
+        """Wait until a request can be started, and count it as in flight.
+
+        Every call must be followed by a call to :meth:`release`.
+
+        :returns: The start time of the request, to pass to :meth:`release`.
+        """
+        delay = self._reserve_token()
+        if delay > 0:
+            time.sleep(delay)
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+        return time.monotonic()
+
+    async def acquire_async(self) -> float:
+        """Wait until a request can be started, without blocking the event loop.
+
+        See :meth:`acquire`.
+        """
+        delay = self._reserve_token()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._in_flight < int(self._limit):
+                    self._in_flight += 1
+                    return time.monotonic()
+                waiter = loop.create_future()
+                self._async_waiters.append(waiter)
+            await waiter
+
+    def release(
+        self,
+        started: float,
+        outcome: Outcome,
+        *,
+        latency: float | None = None,
+    ) -> None:
+        """Count a request as finished, and adjust the limit by its outcome.
+
+        :param started: The start time returned by :meth:`acquire`.
+        :param outcome: How the request went.
+        :param latency: How long the request took, in seconds. Defaults to
+            the time since ``started``.
+        """
+        if latency is None:
+            latency = time.monotonic() - started
+        with self._condition:
+            self._in_flight -= 1
+            change = self._adjust(started, latency, outcome)
+            self._condition.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for waiter in waiters:
+            waiter.get_loop().call_soon_threadsafe(wake, waiter)
+        if change is not None and self.on_change is not None:
+            self.on_change(change)
+
+    def _adjust(
+        self,
+        started: float,
+        latency: float,
+        outcome: Outcome,
+    ) -> LimitChange | None:
+        if outcome == "cancelled":
+            return None
+        reason: str = outcome
+        if outcome == "ok":
+            if self._is_latency_spike(latency):
+                reason = "latency"
+            else:
+                self._latency = (
+                    latency
+                    if self._latency is None
+                    else self._latency + LATENCY_SMOOTHING * (latency - self._latency)
+                )
+                return self._set_limit(
+                    min(self.max_limit, self._limit + 1 / self._limit),
+                    "increase",
+                )
+
+        if started < self._last_cut:
+            # The request was in flight when the limit was last cut, and was
+            # likely hit by the same overload.
+            return None
+        self._last_cut = time.monotonic()
+        return self._set_limit(
+            max(self.min_limit, self._limit * self.backoff_ratio),
+            reason,
+        )
+
+    def _is_latency_spike(self, latency: float) -> bool:
+        return (
+            self.latency_tolerance is not None
+            and self._latency is not None
+            and latency > self._latency * self.latency_tolerance
+        )
+
+    def _set_limit(self, limit: float, reason: str) -> LimitChange | None:
+        old_limit = int(self._limit)
+        self._limit = limit
+        if int(limit) == old_limit:
+            return None
+        return LimitChange(old_limit, int(limit), reason, self._in_flight)
+
+    def _reserve_token(self) -> float:
+        """Take a token from the bucket, returning how long to wait for it."""
+        if self.rate is None:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._tokens_updated
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._tokens_updated = now
+            # The token may be borrowed from the future, making the next
+            # callers wait longer.
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+
+def wake(waiter: asyncio.Future[None]) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def outcome_of(response: httpx2.Response) -> Outcome:
+    if response.status_code == httpx2.codes.TOO_MANY_REQUESTS:
+        return "rate_limited"
+    if response.status_code >= httpx2.codes.INTERNAL_SERVER_ERROR:
+        return "server_error"
+    return "ok"
+
+
+class ReleasingStream(httpx2.SyncByteStream):
+    """Response stream that calls ``release`` once, when it is closed."""
+
+    def __init__(
+        self,
+        stream: httpx2.SyncByteStream,
+        release: Callable[[], None],
+    ) -> None:
+        self._stream = stream
+        self._release = once(release)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+
+
+class AsyncReleasingStream(httpx2.AsyncByteStream):
+    """Async response stream that calls ``release`` once, when it is closed."""
+
+    def __init__(
+        self,
+        stream: httpx2.AsyncByteStream,
+        release: Callable[[], None],
+    ) -> None:
+        self._stream = stream
+        self._release = once(release)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+def once(func: Callable[[], None]) -> Callable[[], None]:
+    called = False
+
+    def wrapper() -> None:
+        nonlocal called
+        if not called:
+            called = True
+            func()
+
+    return wrapper
+
+
+class LimitedTransport(httpx2.BaseTransport):
+    """Transport that runs requests within an :class:`AdaptiveLimiter`.
+
+    The request holds its slot until the response is closed, so that
+    streamed downloads count as in flight while the body is read. The
+    latency is measured until the response headers are received.
+    """
+
+    def __init__(
+        self,
+        transport: httpx2.BaseTransport,
+        limiter: AdaptiveLimiter,
+    ) -> None:
+        self._transport = transport
+        self._limiter = limiter
+
+    def handle_request(self, request: httpx2.Request) -> httpx2.Response:
+        limiter = self._limiter
+        started = limiter.acquire()
+        try:
+            response = self._transport.handle_request(request)
+        except OVERLOAD_EXCEPTIONS:
+            limiter.release(started, "error")
+            raise
+        except BaseException:
+            # E.g. a cancellation, or a bug. Neither is a healthy response.
+            limiter.release(started, "cancelled")
+            raise
+        outcome = outcome_of(response)
+        latency = time.monotonic() - started
+        response.stream = ReleasingStream(
+            cast("httpx2.SyncByteStream", response.stream),
+            lambda: limiter.release(started, outcome, latency=latency),
+        )
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncLimitedTransport(httpx2.AsyncBaseTransport):
+    """Async transport that runs requests within an :class:`AdaptiveLimiter`.
+
+    See :class:`LimitedTransport`.
+    """
+
+    def __init__(
+        self,
+        transport: httpx2.AsyncBaseTransport,
+        limiter: AdaptiveLimiter,
+    ) -> None:
+        self._transport = transport
+        self._limiter = limiter
+
+    async def handle_async_request(self, request: httpx2.Request) -> httpx2.Response:
+        limiter = self._limiter
+        started = await limiter.acquire_async()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except OVERLOAD_EXCEPTIONS:
+            limiter.release(started, "error")
+            raise
+        except BaseException:
+            # E.g. a cancellation, or a bug. Neither is a healthy response.
+            limiter.release(started, "cancelled")
+            raise
+        outcome = outcome_of(response)
+        latency = time.monotonic() - started
+        response.stream = AsyncReleasingStream(
+            cast("httpx2.AsyncByteStream", response.stream),
+            lambda: limiter.release(started, outcome, latency=latency),
+        )
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -0,0 +1,381 @@
+import datetime as dt
+import os
+import sqlite3
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from itertools import islice
+from types import TracebackType
+from typing import TypeVar, cast
+
+from brreg.enhetsregisteret._bulk import BulkDataset, read_enheter, read_underenheter
+from brreg.enhetsregisteret._client import MAX_BATCH_SIZE, Client
+from brreg.enhetsregisteret._downloads import DumpFile
+from brreg.enhetsregisteret._feeds import ChangeEvent, Checkpoint
+from brreg.enhetsregisteret._responses import Enhet, Underenhet
+from brreg.enhetsregisteret._sqlite import ThreadLocalConnections, incremental_vacuum
+from brreg.enhetsregisteret._types import (
+    Organisasjonsnummer,
+    OrganisasjonsnummerValidator,
+)
+
+__all__ = [
+    "Mirror",
+    "MirrorStatus",
+]
+
+
+E = TypeVar("E", Enhet, Underenhet)
+
+# The number of rows to insert per statement when loading a dump.
+LOAD_CHUNK_SIZE = 10_000
+
+
+@dataclass(frozen=True)
+class MirrorStatus:
+    """The freshness of one dataset in a :class:`Mirror`."""
+
+    #: The mirrored register.
+    dataset: BulkDataset
+
+    #: The number of entities in the mirror.
+    entities: int
+
+    #: The time of the bulk dump the mirror was loaded from, or ``None`` if
+    #: it has not been loaded.
+    snapshot_at: dt.datetime | None
+
+    #: The ID of the last update from the update feed that has been applied,
+    #: or ``None`` if none have.
+    oppdateringsid: int | None
+
+    #: The time of the last update from the update feed that has been
+    #: applied, or ``None`` if none have.
+    updated_at: dt.datetime | None
+
+    #: When the mirror was last synced with the update feed, as a Unix
+    #: timestamp, or ``None`` if it has never been synced.
+    synced_at: float | None
+
+    @property
+    def up_to(self) -> dt.datetime | None:
+        """The time the mirror is known to be up to date with."""
+        return self.updated_at or self.snapshot_at
+
+
+class MirrorCheckpoint(Checkpoint):
+    """Feed position that is committed together with the applied changes."""
+
+    def __init__(self, conn: sqlite3.Connection, dataset: BulkDataset) -> None:
+        super().__init__()
+        self._conn = conn
+        self._dataset: BulkDataset = dataset
+        self.updated_at: dt.datetime | None = None
+
+    def load(self) -> int | None:
+        (oppdateringsid,) = self._conn.execute(
+            "SELECT oppdateringsid FROM state WHERE dataset = ?",
+            (self._dataset,),
+        ).fetchone()
+        return cast("int | None", oppdateringsid)
+
+    def save(self, oppdateringsid: int) -> None:
+        self._conn.execute(
+            "UPDATE state SET oppdateringsid = ?, updated_at = ? WHERE dataset = ?",
+            (
+                oppdateringsid,
+                None if self.updated_at is None else self.updated_at.isoformat(),
+                self._dataset,
+            ),
+        )
+        self._conn.commit()
+
+
+class Mirror:
+    """Local replica of Enhetsregisteret, stored in a SQLite database file.
+
+    The mirror is loaded from the bulk dumps with :meth:`load_dump`, and kept
+    up to date with the update feeds with :meth:`sync`. Lookups use the
+    organization number as the table's primary key, so they never touch more
+    than a handful of database pages.
+
+    :meth:`get_enhet` and :meth:`get_underenhet` have the same signatures as
+    on :class:`Client`, so that the mirror can be used in place of the
+    client. Note that deleted entities are removed from the mirror, while the
+    API keeps returning them with their deletion date.
+
+    The mirror can be shared by many threads and processes on the same host.
+
+    Example::
+
+        with Mirror("/var/lib/brreg/mirror.sqlite3", fallback=True) as mirror:
+            mirror.load_dump(client.save_dump("enheter", "/var/lib/brreg"))
+            mirror.sync("enheter")
+            enhet = mirror.get_enhet("112233445")
+
+    :param path: Path to the database file. It is created if it does not
+        exist.
+    :param client: The client to sync with, and to fall back to. If ``None``,
+        a new client is created.
+    :param fallback: Whether to look up organizations that are missing from
+        the mirror with the client.
+    :param timeout: How long to wait for other processes' locks, in seconds.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        client: Client | None = None,
+        fallback: bool = False,
+        timeout: float = 30.0,
+    ) -> None:
+        self.path = os.fspath(path)
+        self.client = client if client is not None else Client()
+        self._owns_client = client is None
+        self.fallback = fallback
+        self._connections = ThreadLocalConnections(self.path, timeout=timeout)
+
+        conn = self._connections.get()
+        with conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS state (
+                    dataset TEXT PRIMARY KEY,
+                    snapshot_at TEXT,
+                    oppdateringsid INTEGER,
+                    updated_at TEXT,
+                    synced_at REAL
+                ) WITHOUT ROWID
+                """
+            )
+            for dataset in ("enheter", "underenheter"):
+                # An INTEGER PRIMARY KEY is the table's rowid, so lookups go
+                # straight to the row, without a separate index.
+                conn.execute(
+                    f"""
+                    CREATE TABLE IF NOT EXISTS {dataset} (
+                        organisasjonsnummer INTEGER PRIMARY KEY,
+                        data BLOB NOT NULL
+                    )
+                    """
+                )
+                conn.execute(
+                    "INSERT OR IGNORE INTO state (dataset) VALUES (?)",
+                    (dataset,),
+                )
+
+    def __enter__(self) -> "Mirror":  # noqa: PYI034
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None = None,
+        exc_value: BaseException | None = None,
+        traceback: TracebackType | None = None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close all database connections opened by this mirror.
+
+        If the mirror created its own client, that is closed too. A client
+        passed to the mirror is left open.
+
+        This is called automatically if the mirror is used as a context
+        manager.
+        """
+        self._connections.close()
+        if self._owns_client:
+            self.client.close()
+
+    def get_enhet(
+        self,
+        organisasjonsnummer: Organisasjonsnummer,
+    ) -> Enhet | None:
+        """Get :class:`Enhet` given an organization number."""
+        return self._get("enheter", Enhet, organisasjonsnummer, self.client.get_enhet)
+
+    def get_underenhet(
+        self,
+        organisasjonsnummer: Organisasjonsnummer,
+    ) -> Underenhet | None:
+        """Get :class:`Underenhet` given an organization number."""
+        return self._get(
+            "underenheter",
+            Underenhet,
+            organisasjonsnummer,
+            self.client.get_underenhet,
+        )
+
+    def _get(
+        self,
+        dataset: BulkDataset,
+        model: type[E],
+        organisasjonsnummer: Organisasjonsnummer,
+        fetch: Callable[[str], E | None],
+    ) -> E | None:
+        orgnr = OrganisasjonsnummerValidator.validate_python(organisasjonsnummer)
+        row = (
+            self._connections.get()
+            .execute(
+                f"SELECT data FROM {dataset} WHERE organisasjonsnummer = ?",  # noqa: S608
+                (int(orgnr),),
+            )
+            .fetchone()
+        )
+        if row is not None:
+            return model.model_validate_json(row[0])
+        if self.fallback:
+            return fetch(orgnr)
+        return None
+
+    def status(self, dataset: BulkDataset) -> MirrorStatus:
+        """Get the freshness of one of the mirrored registers."""
+        conn = self._connections.get()
+        (entities,) = conn.execute(f"SELECT COUNT(*) FROM {dataset}").fetchone()  # noqa: S608
+        snapshot_at, oppdateringsid, updated_at, synced_at = conn.execute(
+            """
+            SELECT snapshot_at, oppdateringsid, updated_at, synced_at
+            FROM state
+            WHERE dataset = ?
+            """,
+            (dataset,),
+        ).fetchone()
+        return MirrorStatus(
+            dataset=dataset,
+            entities=entities,
+            snapshot_at=parse_datetime(snapshot_at),
+            oppdateringsid=oppdateringsid,
+            updated_at=parse_datetime(updated_at),
+            synced_at=synced_at,
+        )
+
+    def load(
+        self,
+        dataset: BulkDataset,
+        entities: Iterable[Enhet] | Iterable[Underenhet],
+        *,
+        snapshot_at: dt.datetime,
+    ) -> int:
+        """Replace the contents of one register with the given entities.
+
+        The old contents stay visible to readers until the load is complete.
+        The position in the update feed is reset, so that the next
+        :meth:`sync` starts from ``snapshot_at``.
+
+        :param dataset: The register to replace.
+        :param entities: All the entities of the register.
+        :param snapshot_at: The time the entities are up to date with.
+        :returns: The number of loaded entities.
+        """
+        conn = self._connections.get()
+        count = 0
+        with conn:
+            conn.execute(f"DELETE FROM {dataset}")  # noqa: S608
+            rows = (
+                (int(entity.organisasjonsnummer), serialize(entity))
+                for entity in entities
+            )
+            while chunk := list(islice(rows, LOAD_CHUNK_SIZE)):
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {dataset} VALUES (?, ?)",  # noqa: S608
+                    chunk,
+                )
+                count += len(chunk)
+            conn.execute(
+                """
+                UPDATE state
+                SET snapshot_at = ?, oppdateringsid = NULL, updated_at = NULL
+                WHERE dataset = ?
+                """,
+                (snapshot_at.isoformat(), dataset),
+            )
+        incremental_vacuum(conn)
+        return count
+
+    def load_dump(self, dump: DumpFile) -> int:
+        """Replace the contents of one register with a downloaded bulk dump.
+
+        :param dump: The dump, as returned by :meth:`Client.save_dump`.
+        :returns: The number of loaded entities.
+        """
+        if dump.last_modified is not None:
+            snapshot_at = parsedate_to_datetime(dump.last_modified)
+        else:
+            snapshot_at = dt.datetime.fromtimestamp(dump.downloaded_at, dt.timezone.utc)
+        read = read_enheter if dump.dataset == "enheter" else read_underenheter
+        return self.load(
+            dump.dataset,
+            read(dump.path, file_format=dump.file_format),
+            snapshot_at=snapshot_at,
+        )
+
+    def sync(
+        self,
+        dataset: BulkDataset,
+        *,
+        batch_size: int = MAX_BATCH_SIZE,
+    ) -> int:
+        """Apply the changes from the update feed since the last sync.
+
+        Each batch of changes is committed together with the position in the
+        feed, so that an interrupted sync continues after the last committed
+        batch, without losing or repeating any changes.
+
+        :param dataset: The register to sync.
+        :param batch_size: The number of updates to read per request.
+        :returns: The number of applied changes.
+        """
+        status = self.status(dataset)
+        conn = self._connections.get()
+        checkpoint = MirrorCheckpoint(conn, dataset)
+        changes: Iterable[ChangeEvent[Enhet]] | Iterable[ChangeEvent[Underenhet]]
+        if dataset == "enheter":
+            changes = self.client.iter_enhet_changes(
+                checkpoint,
+                since=status.snapshot_at,
+                batch_size=batch_size,
+            )
+        else:
+            changes = self.client.iter_underenhet_changes(
+                checkpoint,
+                since=status.snapshot_at,
+                batch_size=batch_size,
+            )
+
+        count = 0
+        try:
+            for event in changes:
+                orgnr = int(event.organisasjonsnummer)
+                if event.entity is None:
+                    conn.execute(
+                        f"DELETE FROM {dataset} WHERE organisasjonsnummer = ?",  # noqa: S608
+                        (orgnr,),
+                    )
+                else:
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO {dataset} VALUES (?, ?)",  # noqa: S608
+                        (orgnr, serialize(event.entity)),
+                    )
+                checkpoint.updated_at = event.oppdatering.dato
+                count += 1
+        except BaseException:
+            conn.rollback()
+            raise
+
+        with conn:
+            conn.execute(
+                "UPDATE state SET synced_at = ? WHERE dataset = ?",
+                (time.time(), dataset),
+            )
+        return count
+
+
+def serialize(entity: Enhet | Underenhet) -> bytes:
+    return entity.model_dump_json(by_alias=True, exclude_none=True).encode()
+
+
+def parse_datetime(value: str | None) -> dt.datetime | None:
+    return None if value is None else dt.datetime.fromisoformat(value)
@@ -1,13 +1,22 @@
-from collections.abc import Callable, Iterator
-from typing import Generic, TypeVar
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Generator, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
 
-from pydantic import AliasPath, BaseModel, Field
+from pydantic import AliasChoices, AliasPath, BaseModel, ConfigDict, Field
 
 from brreg.enhetsregisteret._queries import Query
-from brreg.enhetsregisteret._responses import Enhet, Underenhet
+from brreg.enhetsregisteret._responses import Enhet, Oppdatering, Underenhet
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
 
 __all__ = [
     "EnhetPage",
+    "OppdateringPage",
     "UnderenhetPage",
 ]
 
@@ -15,10 +24,16 @@ __all__ = [
 T = TypeVar("T", bound=BaseModel)
 Q = TypeVar("Q", bound=Query)
 
+# The search API only serves the first 10 000 results of a search, i.e. pages
+# where (page + 1) * size <= 10 000.
+SEARCH_WINDOW = 10_000
+
 
 class Page(BaseModel, Generic[T]):
     """The fields here are available on all page objects."""
 
+    model_config = ConfigDict(defer_build=True)
+
     #: The items on this page.
     items: list[T]
 
@@ -43,58 +58,345 @@ class Page(BaseModel, Generic[T]):
     )
 
 
+class Count(BaseModel):
+    """The total number of results of a search, without its items."""
+
+    model_config = ConfigDict(defer_build=True)
+
+    #: The total number of elements available.
+    total_elements: int = Field(
+        validation_alias=AliasPath("page", "totalElements"),
+    )
+
+
+@dataclass(frozen=True)
+class RawSearch(Generic[Q]):
+    """How to fetch a page of search results without parsing it."""
+
+    #: Fetches the response body for a query.
+    fetch: Callable[[Q], bytes]
+
+    #: The type of the items on the page.
+    item_type: type[BaseModel]
+
+    #: The possible keys of the items under ``_embedded`` in the response.
+    keys: tuple[str, ...]
+
+
 class Cursor(Generic[T, Q]):
-    """Cursor for iterating over multiple pages of items."""
+    """Cursor for iterating over multiple pages of items.
+
+    By default, the cursor retains every page it has fetched, so that
+    iterating over the pages or items again does not trigger any new requests.
+    To bound the memory use when walking through many pages, either set
+    :attr:`max_retained_pages`, or iterate with ``retain=False``.
+    """
 
     _operation: Callable[[Q], "Cursor[T, Q]"]
     _query: Q
-    _pages: dict[int, Page[T]]
+    _pages: OrderedDict[int, Page[T]]
+    _raw: RawSearch[Q] | None
+    _raw_page: tuple[int, bytes] | None
     _current_page_number: int
 
     #: Iterate over all page numbers in this cursor.
     page_numbers: range
 
-    def __init__(
+    #: Whether the search has more results than can be fetched. The search
+    #: API only serves the first 10 000 results of a search, and
+    #: :attr:`page_numbers` only includes the pages that can be fetched. Use
+    #: :meth:`Client.search_all_enheter` or
+    #: :meth:`Client.search_all_underenheter` to get all results.
+    truncated: bool
+
+    #: The maximum number of pages to retain. When more pages are fetched, the
+    #: least recently used pages are evicted, and are fetched again if they
+    #: are needed later. If ``None``, all pages are retained.
+    max_retained_pages: int | None
+
+    def __init__(  # noqa: PLR0913
         self,
         operation: Callable[[Q], "Cursor[T, Q]"],
         query: Q,
         page: Page[T],
+        *,
+        max_retained_pages: int | None = None,
+        raw: RawSearch[Q] | None = None,
+        content: bytes | None = None,
+        window: int | None = None,
     ) -> None:
         self._operation = operation
         self._query = query
-        self._pages = {page.page_number: page}
-        # Expose the empty first page, even if it says the totalt number of pages is 0.
-        self.page_numbers = range(max(1, page.total_pages))
+        self._pages = OrderedDict({page.page_number: page})
+        self.page_numbers, self.truncated = fetchable_pages(page, window)
+        self.max_retained_pages = max_retained_pages
+        self._raw = raw
+        # The response body of the first page, so that it can be converted to
+        # Arrow without fetching it again.
+        self._raw_page = None if content is None else (page.page_number, content)
 
     def get_page(self, page_number: int) -> Page[T] | None:
         """Get a page by its 0-indexed page number."""
         if page_number not in self.page_numbers:
             return None
 
+        return self._load_page(page_number, retain=True)
+
+    def _load_page(self, page_number: int, *, retain: bool) -> Page[T]:
+        page = self._pages.get(page_number)
+        if page is not None:
+            self._pages.move_to_end(page_number)
+            return page
+
+        page = self._fetch_page(page_number)
+        if retain:
+            self._retain_page(page)
+        return page
+
+    def _fetch_page(self, page_number: int) -> Page[T]:
+        new_cursor = self._operation(
+            self._query.model_copy(update={"page": page_number}),
+        )
+        new_page = new_cursor.get_page(page_number)
+        assert new_page is not None  # noqa: S101
+        return new_page
+
+    def _retain_page(self, page: Page[T]) -> None:
+        self._pages[page.page_number] = page
+        self._pages.move_to_end(page.page_number)
+        if self.max_retained_pages is not None:
+            while len(self._pages) > self.max_retained_pages:
+                self._pages.popitem(last=False)
+
+    def get_page_arrow(self, page_number: int) -> "pa.Table | None":
+        """Get a page by its 0-indexed page number, as a :class:`pyarrow.Table`.
+
+        The columns are typed and filled directly from the response JSON,
+        without creating any model objects. Nested fields, like addresses,
+        are flattened to columns with dotted names, like
+        ``forretningsadresse.kommunenummer``.
+
+        The cursor keeps the response body of the page the search was made
+        with, but other pages are always fetched again, as the cursor only
+        retains the parsed pages. Requires pyarrow: ``pip install brreg[arrow]``.
+
+        Only cursors returned by :class:`Client` searches can be converted to
+        Arrow. Other cursors raise :exc:`TypeError`.
+        """
+        self._check_raw()
+        if page_number not in self.page_numbers:
+            return None
+
+        return self._fetch_page_arrow(page_number)
+
+    def to_arrow(self) -> "pa.Table":
+        """Get all items in this cursor as a :class:`pyarrow.Table`.
+
+        See :meth:`get_page_arrow` for how the table is built, and which pages
+        are fetched again.
+        """
+        from brreg.enhetsregisteret import _arrow  # noqa: PLC0415
+
+        self._check_raw()
+        return _arrow.concat_tables(
+            [self._fetch_page_arrow(page_number) for page_number in self.page_numbers]
+        )
+
+    def to_pandas(self) -> "pd.DataFrame":
+        """Get all items in this cursor as a :class:`pandas.DataFrame`.
+
+        The data frame is converted from :meth:`to_arrow`. Requires pandas:
+        ``pip install brreg[pandas]``.
+        """
+        return self.to_arrow().to_pandas()
+
+    def _check_raw(self) -> RawSearch[Q]:
+        if self._raw is None:
+            msg = (
+                "Only cursors from Client searches can be converted to Arrow, "
+                "as this cursor has no API response to convert"
+            )
+            raise TypeError(msg)
+        return self._raw
+
+    def _fetch_page_arrow(self, page_number: int) -> "pa.Table":
+        from brreg.enhetsregisteret import _arrow  # noqa: PLC0415
+
+        raw = self._check_raw()
+        if self._raw_page is not None and self._raw_page[0] == page_number:
+            content = self._raw_page[1]
+        else:
+            content = raw.fetch(self._query.model_copy(update={"page": page_number}))
+        return _arrow.page_to_arrow(content, raw.item_type, raw.keys)
+
+    @property
+    def pages(self) -> Iterator[Page[T]]:
+        """Iterator over all pages in this cursor."""
+        return self.iter_pages()
+
+    @property
+    def items(self) -> Iterator[T]:
+        """Iterator over all items in this cursor."""
+        return self.iter_items()
+
+    def iter_pages(
+        self,
+        *,
+        prefetch: int = 0,
+        retain: bool = True,
+    ) -> Generator[Page[T], None, None]:
+        """Iterate over all pages in this cursor.
+
+        :param prefetch: The number of pages to fetch in background threads
+            while the current page is being consumed. If zero, each page is
+            fetched when it is needed. Any outstanding fetches are cancelled
+            if the iteration stops early.
+        :param retain: Whether to retain newly fetched pages in the cursor. If
+            false, the iteration uses constant memory, no matter how many
+            pages it walks through, but the pages are fetched again if
+            iterated over a second time.
+        """
+        if prefetch < 0:
+            msg = f"prefetch must be zero or more, got {prefetch}"
+            raise ValueError(msg)
+
+        if prefetch == 0:
+            for page_number in self.page_numbers:
+                yield self._load_page(page_number, retain=retain)
+            return
+
+        executor = ThreadPoolExecutor(
+            max_workers=prefetch,
+            thread_name_prefix="brreg-prefetch",
+        )
+        page_numbers = iter(self.page_numbers)
+        pending: deque[tuple[int, Future[Page[T]] | None]] = deque()
+        try:
+            while True:
+                # Keep the next page plus `prefetch` pages in flight.
+                for page_number in islice(page_numbers, prefetch + 1 - len(pending)):
+                    if page_number in self._pages:
+                        pending.append((page_number, None))
+                    else:
+                        future = executor.submit(self._fetch_page, page_number)
+                        pending.append((page_number, future))
+
+                if not pending:
+                    return
+
+                next_page_number, next_future = pending.popleft()
+                if next_future is None:
+                    # The page was retained when scheduled, but may have been
+                    # evicted since.
+                    yield self._load_page(next_page_number, retain=retain)
+                    continue
+
+                page = next_future.result()
+                if retain:
+                    self._retain_page(page)
+                yield page
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_items(
+        self,
+        *,
+        prefetch: int = 0,
+        retain: bool = True,
+    ) -> Generator[T, None, None]:
+        """Iterate over all items in this cursor.
+
+        :param prefetch: The number of pages to fetch ahead in background
+            threads. See :meth:`iter_pages`.
+        :param retain: Whether to retain newly fetched pages in the cursor.
+            See :meth:`iter_pages`.
+        """
+        for page in self.iter_pages(prefetch=prefetch, retain=retain):
+            yield from page.items
+
+
+class AsyncCursor(Generic[T, Q]):
+    """Cursor for asynchronously iterating over multiple pages of items.
+
+    This is the :class:`~brreg.enhetsregisteret.AsyncClient` counterpart to
+    :class:`Cursor`::
+
+        cursor = await client.search_enhet(query)
+        async for enhet in cursor.items:
+            ...
+    """
+
+    _operation: Callable[[Q], Awaitable["AsyncCursor[T, Q]"]]
+    _query: Q
+    _pages: dict[int, Page[T]]
+
+    #: Iterate over all page numbers in this cursor.
+    page_numbers: range
+
+    #: Whether the search has more results than can be fetched. See
+    #: :attr:`Cursor.truncated`.
+    truncated: bool
+
+    def __init__(
+        self,
+        operation: Callable[[Q], Awaitable["AsyncCursor[T, Q]"]],
+        query: Q,
+        page: Page[T],
+        *,
+        window: int | None = None,
+    ) -> None:
+        self._operation = operation
+        self._query = query
+        self._pages = {page.page_number: page}
+        self.page_numbers, self.truncated = fetchable_pages(page, window)
+
+    async def get_page(self, page_number: int) -> Page[T] | None:
+        """Get a page by its 0-indexed page number."""
+        if page_number not in self.page_numbers:
+            return None
+
         if page_number not in self._pages:
             # We need to fetch the page.
-            new_cursor = self._operation(
+            new_cursor = await self._operation(
                 self._query.model_copy(update={"page": page_number}),
             )
-            new_page = new_cursor.get_page(page_number)
+            new_page = await new_cursor.get_page(page_number)
             assert new_page is not None  # noqa: S101
             self._pages[page_number] = new_page
 
         return self._pages[page_number]
 
     @property
-    def pages(self) -> Iterator[Page[T]]:
-        """Iterator over all pages in this cursor."""
+    async def pages(self) -> AsyncIterator[Page[T]]:
+        """Async iterator over all pages in this cursor."""
         for page_number in self.page_numbers:
-            page = self.get_page(page_number)
+            page = await self.get_page(page_number)
             assert page is not None  # noqa: S101
             yield page
 
     @property
-    def items(self) -> Iterator[T]:
-        """Iterator over all items in this cursor."""
-        for page in self.pages:
-            yield from page.items
+    async def items(self) -> AsyncIterator[T]:
+        """Async iterator over all items in this cursor."""
+        async for page in self.pages:
+            for item in page.items:
+                yield item
+
+
+def fetchable_pages(page: Page[Any], window: int | None) -> tuple[range, bool]:
+    """Get the page numbers that can be fetched, and whether results are cut off.
+
+    :param page: Any page of the search results.
+    :param window: The number of results the API serves, if limited.
+    """
+    # Expose the empty first page, even if it says the totalt number of pages is 0.
+    total_pages = max(1, page.total_pages)
+    if window is None:
+        return range(total_pages), False
+    window_pages = max(1, window // max(1, page.page_size))
+    return (
+        range(min(total_pages, window_pages)),
+        page.total_elements > window_pages * page.page_size,
+    )
 
 
 class EnhetPage(Page[Enhet]):
@@ -113,3 +415,15 @@ class UnderenhetPage(Page[Underenhet]):
         default_factory=list,
         validation_alias=AliasPath("_embedded", "underenheter"),
     )
+
+
+class OppdateringPage(Page[Oppdatering]):
+    """Response type for the enhet and underenhet update feeds."""
+
+    items: list[Oppdatering] = Field(
+        default_factory=list,
+        validation_alias=AliasChoices(
+            AliasPath("_embedded", "oppdaterteEnheter"),
+            AliasPath("_embedded", "oppdaterteUnderenheter"),
+        ),
+    )
@@ -0,0 +1,116 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Literal, TypeVar, cast, get_args
+
+import pydantic_core
+from pydantic import AliasChoices, AliasPath, BaseModel
+
+from brreg.enhetsregisteret._interning import Interner
+from brreg.enhetsregisteret._pagination import Page
+
+__all__ = [
+    "ParseMode",
+]
+
+
+M = TypeVar("M", bound=BaseModel)
+P = TypeVar("P", bound=Page[Any])
+
+#: How responses are turned into Python objects:
+#:
+#: - ``"validate"``: validate every field, and return models. This is the
+#:   default.
+#: - ``"raw"``: return the decoded JSON, with dicts in place of models,
+#:   without validating anything.
+#:
+#: Building models without validating them is not offered, as it is done in
+#: Python, and is slower than validation, which runs in compiled code.
+ParseMode = Literal["validate", "raw"]
+
+PARSE_MODES: tuple[ParseMode, ...] = get_args(ParseMode)
+
+
+@dataclass(frozen=True)
+class Parser:
+    """Parses response bodies, as configured on a client."""
+
+    #: How to parse the responses.
+    mode: ParseMode = "validate"
+
+    #: Shares equal values between the parsed objects, if set.
+    interner: Interner | None = None
+
+    def __post_init__(self) -> None:
+        if self.mode not in PARSE_MODES:
+            msg = f"parse_mode must be one of {PARSE_MODES}, got {self.mode!r}"
+            raise ValueError(msg)
+        if self.interner is not None and self.mode == "raw":
+            msg = "An interner can not be used with parse_mode 'raw'"
+            raise ValueError(msg)
+
+    def model(self, model: type[M], content: bytes) -> M:
+        """Parse a JSON response body into a model."""
+        if self.mode == "raw":
+            return cast("M", pydantic_core.from_json(content))
+        obj = model.model_validate_json(content)
+        if self.interner is not None:
+            self.interner.intern(obj)
+        return obj
+
+    def record(self, model: type[M], record: Any) -> M:  # noqa: ANN401
+        """Parse a decoded JSON object into a model."""
+        obj = parse_record(model, record, self.mode)
+        if self.interner is not None:
+            self.interner.intern(obj)
+        return obj
+
+    def page(self, page_type: type[P], content: bytes) -> P:
+        """Parse a JSON response body into a page of search results."""
+        page = parse_page(page_type, content, self.mode)
+        if self.interner is not None:
+            for item in page.items:
+                self.interner.intern(item)
+        return page
+
+
+def parse_record(model: type[M], record: Any, parse_mode: ParseMode) -> M:  # noqa: ANN401
+    if parse_mode == "validate":
+        return model.model_validate(record)
+    return cast("M", record)
+
+
+def parse_page(page_type: type[P], content: bytes, parse_mode: ParseMode) -> P:
+    if parse_mode == "validate":
+        return page_type.model_validate_json(content)
+
+    data = pydantic_core.from_json(content)
+    field = page_type.model_fields["items"]
+    items = embedded_items(
+        data,
+        cast("AliasPath | AliasChoices", field.validation_alias),
+    )
+    page = data["page"]
+    return page_type.model_construct(
+        items=items,
+        page_size=page["size"],
+        page_number=page["number"],
+        total_elements=page["totalElements"],
+        total_pages=page["totalPages"],
+    )
+
+
+def embedded_items(
+    data: Mapping[str, Any],
+    alias: AliasPath | AliasChoices,
+) -> list[Any]:
+    if isinstance(alias, AliasChoices):
+        paths = alias.convert_to_aliases()
+    else:
+        paths = [alias.convert_to_aliases()]
+    for path in paths:
+        value: Any = data
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        if value is not None:
+            return cast("list[Any]", value)
+    return []
@@ -0,0 +1,192 @@
+import asyncio
+import datetime as dt
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TypeVar
+
+from pydantic import BaseModel
+
+from brreg import BrregError
+from brreg.enhetsregisteret._pagination import AsyncCursor, Cursor
+from brreg.enhetsregisteret._queries import EnhetQuery, UnderenhetQuery
+
+__all__: list[str] = []
+
+
+T = TypeVar("T", bound=BaseModel)
+Q = TypeVar("Q", EnhetQuery, UnderenhetQuery)
+
+# The page size used for each part, unless the query sets one.
+PART_SIZE = 1000
+
+# The registration dates to split between, if the query does not limit them.
+# Every entity in the register has a registration date.
+EARLIEST_DATE = dt.date(1800, 1, 1)
+
+# A part is either split into more parts, or fetched as a list of items.
+Part = tuple[list[Q], list[T]]
+
+
+def split_query(query: Q) -> list[Q] | None:
+    """Split a query into two queries that together match the same entities.
+
+    If the query lists several values for a field, e.g. several
+    ``kommunenummer``, the longest list is split in two. Otherwise, the
+    registration date range is split in two. Returns ``None`` if the query
+    can not be split further.
+    """
+    name, values = max(
+        ((name, value) for name, value in query if isinstance(value, tuple)),
+        key=lambda field: len(field[1]),
+    )
+    if len(values) > 1:
+        half = len(values) // 2
+        return [
+            query.model_copy(update={name: values[:half]}),
+            query.model_copy(update={name: values[half:]}),
+        ]
+
+    first = query.fra_registreringsdato_enhetsregisteret or EARLIEST_DATE
+    # Include tomorrow, as the register's today may be ahead of ours.
+    last = query.til_registreringsdato_enhetsregisteret or (
+        dt.datetime.now(dt.timezone.utc).date() + dt.timedelta(days=1)
+    )
+    if first >= last:
+        return None
+    middle = first + (last - first) // 2
+    return [
+        query.model_copy(
+            update={
+                "fra_registreringsdato_enhetsregisteret": first,
+                "til_registreringsdato_enhetsregisteret": middle,
+            },
+        ),
+        query.model_copy(
+            update={
+                "fra_registreringsdato_enhetsregisteret": middle + dt.timedelta(days=1),
+                "til_registreringsdato_enhetsregisteret": last,
+            },
+        ),
+    ]
+
+
+def first_part(query: Q) -> Q:
+    return query.model_copy(update={"page": None, "size": query.size or PART_SIZE})
+
+
+def split_or_fail(query: Q, total_elements: int) -> list[Q]:
+    queries = split_query(query)
+    if queries is None:
+        msg = (
+            f"Can not get all {total_elements} results of the search "
+            f"{query.as_url_query()!r}, as it can not be split into parts of at "
+            "most 10 000 results. Narrow it down by listing the values to "
+            "search for, e.g. of kommunenummer or organisasjonsform."
+        )
+        raise BrregError(msg)
+    return queries
+
+
+def fetch_part(search: Callable[[Q], Cursor[T, Q]], query: Q) -> Part[Q, T]:
+    cursor = search(query)
+    if cursor.truncated:
+        page = cursor.get_page(0)
+        assert page is not None  # noqa: S101
+        return split_or_fail(query, page.total_elements), []
+    return [], list(cursor.iter_items(retain=False))
+
+
+def iter_all(
+    search: Callable[[Q], Cursor[T, Q]],
+    query: Q,
+    *,
+    key: Callable[[T], str],
+    max_workers: int,
+) -> Iterator[T]:
+    """Iterate over all results of a search, beyond the search window.
+
+    Searches with more results than the API serves are split into parts that
+    fit, which are fetched in parallel. Items are yielded as each part
+    completes, once per ``key``.
+    """
+    if max_workers < 1:
+        msg = f"max_workers must be at least 1, got {max_workers}"
+        raise ValueError(msg)
+
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="brreg-search-all",
+    )
+    parts: deque[Q] = deque([first_part(query)])
+    running: set[Future[Part[Q, T]]] = set()
+    # Entities can move between parts while we fetch them.
+    seen: set[str] = set()
+    try:
+        while parts or running:
+            while parts and len(running) < max_workers:
+                running.add(executor.submit(fetch_part, search, parts.popleft()))
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                queries, items = future.result()
+                parts.extend(queries)
+                for item in items:
+                    item_key = key(item)
+                    if item_key not in seen:
+                        seen.add(item_key)
+                        yield item
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def async_fetch_part(
+    search: Callable[[Q], Awaitable[AsyncCursor[T, Q]]],
+    query: Q,
+) -> Part[Q, T]:
+    cursor = await search(query)
+    if cursor.truncated:
+        page = await cursor.get_page(0)
+        assert page is not None  # noqa: S101
+        return split_or_fail(query, page.total_elements), []
+    return [], [item async for item in cursor.items]
+
+
+async def async_iter_all(
+    search: Callable[[Q], Awaitable[AsyncCursor[T, Q]]],
+    query: Q,
+    *,
+    key: Callable[[T], str],
+    max_concurrency: int,
+) -> AsyncIterator[T]:
+    """Iterate over all results of a search, beyond the search window.
+
+    See :func:`iter_all`.
+    """
+    if max_concurrency < 1:
+        msg = f"max_concurrency must be at least 1, got {max_concurrency}"
+        raise ValueError(msg)
+
+    parts: deque[Q] = deque([first_part(query)])
+    running: set[asyncio.Future[Part[Q, T]]] = set()
+    seen: set[str] = set()
+    try:
+        while parts or running:
+            while parts and len(running) < max_concurrency:
+                running.add(
+                    asyncio.ensure_future(async_fetch_part(search, parts.popleft()))
+                )
+            done, running = await asyncio.wait(
+                running,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                queries, items = task.result()
+                parts.extend(queries)
+                for item in items:
+                    item_key = key(item)
+                    if item_key not in seen:
+                        seen.add(item_key)
+                        yield item
+    finally:
+        for task in running:
+            task.cancel()
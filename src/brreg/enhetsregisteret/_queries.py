@@ -1,8 +1,10 @@
 import datetime as dt
-from typing import Literal
+from collections.abc import Mapping
+from functools import cached_property
+from typing import Any, Literal, TypeVar
 from urllib.parse import urlencode
 
-from pydantic import BaseModel, Field, NonNegativeInt, PositiveInt
+from pydantic import BaseModel, ConfigDict, Field, NonNegativeInt, PositiveInt
 
 from brreg.enhetsregisteret._types import (
     CommaList,
@@ -15,12 +17,25 @@ from brreg.enhetsregisteret._types import (
 
 __all__ = [
     "EnhetQuery",
+    "OppdateringQuery",
     "UnderenhetQuery",
 ]
 
 
+Q = TypeVar("Q", bound="Query")
+
+# The fields that differ between the pages of a search.
+PAGINATION_FIELDS = frozenset({"size", "page"})
+
+
 class Query(BaseModel):
-    """The fields here are available on all queries."""
+    """The fields here are available on all queries.
+
+    Queries are immutable and hashable. To change a field, make a copy, e.g.
+    ``query.model_copy(update={"page": 2})``.
+    """
+
+    model_config = ConfigDict(frozen=True, defer_build=True)
 
     #: Sortering av resultatsett
     sort: Literal["ASC", "DESC"] | None = None
@@ -32,15 +47,49 @@ class Query(BaseModel):
     page: NonNegativeInt | None = None
 
     def as_url_query(self) -> str:
+        sort, filters = self._url_params
+        params = [
+            sort,
+            "" if self.size is None else f"size={self.size}",
+            "" if self.page is None else f"page={self.page}",
+            filters,
+        ]
+        return "&".join(param for param in params if param)
+
+    @cached_property
+    def _url_params(self) -> tuple[str, str]:
+        # Everything except the page size and number is serialized once, and
+        # shared by the copies made for each page.
         params = self.model_dump(
             mode="json",
             by_alias=True,
             exclude_defaults=True,
+            exclude=set(PAGINATION_FIELDS),
         )
         for key, value in params.items():
             if isinstance(value, bool):
                 params[key] = str(value).lower()
-        return urlencode(params)
+        sort = urlencode({"sort": params.pop("sort")}) if "sort" in params else ""
+        return sort, urlencode(params)
+
+    def model_copy(  # noqa: PYI019
+        self: Q,
+        *,
+        update: Mapping[str, Any] | None = None,
+        deep: bool = False,
+    ) -> Q:
+        """Copy the query, with the fields in ``update`` changed.
+
+        As with all Pydantic models, the updated values are not validated.
+        """
+        if update is None or PAGINATION_FIELDS.issuperset(update):
+            # Serialize the shared parameters before copying, so that all the
+            # pages of a query share them.
+            _ = self._url_params
+            return super().model_copy(update=update, deep=deep)
+        copy = super().model_copy(update=update, deep=deep)
+        copy.__dict__.pop("_url_params", None)
+        return copy
 
 
 class EnhetQuery(Query):
@@ -51,7 +100,7 @@ class EnhetQuery(Query):
 
     #: Organisasjonsnummeret til enheten
     organisasjonsnummer: CommaList[Organisasjonsnummer] = Field(
-        default_factory=list,
+        default=(),
     )
 
     #: Organisasjonsnummeret til enhetens overordnede enhet
@@ -101,7 +150,7 @@ class EnhetQuery(Query):
 
     #: Frivillig registrert i Merverdiavgiftsregisteret
     frivillig_registrert_i_mvaregisteret: CommaList[str] = Field(
-        default_factory=list,
+        default=(),
         serialization_alias="frivilligRegistrertIMvaregisteret",
     )
 
@@ -144,7 +193,7 @@ class EnhetQuery(Query):
 
     #: Enhetens organisasjonsform
     organisasjonsform: CommaList[str] = Field(
-        default_factory=list,
+        default=(),
     )
 
     #: Enhetens hjemmeside
@@ -152,19 +201,19 @@ class EnhetQuery(Query):
 
     #: Enhetens institusjonelle sektorkode
     institusjonell_sektorkode: CommaList[Sektorkode] = Field(
-        default_factory=list,
+        default=(),
         serialization_alias="institusjonellSektorkode",
     )
 
     #: Kommunenummer til enhetens postadresse
     postadresse_kommunenummer: CommaList[Kommunenummer] = Field(
-        default_factory=list,
+        default=(),
         serialization_alias="postadresse.kommunenummer",
     )
 
     #: Postnummeret til enhetens postadresse
     postadresse_postnummer: CommaList[Postnummer] = Field(
-        default_factory=list,
+        default=(),
         serialization_alias="postadresse.postnummer",
     )
 
@@ -176,7 +225,7 @@ class EnhetQuery(Query):
 
     #: Landkode til enhetens postadresse
     postadresse_landkode: CommaList[str] = Field(
-        default_factory=list,
+        default=(),
         serialization_alias="postadresse.landkode",
     )
 
@@ -188,13 +237,13 @@ class EnhetQuery(Query):
 
     #: Kommunenummer til enhetens forretningsadresse
     kommunenummer: CommaList[Kommunenummer] = Field(
-        default_factory=list,
+        default=(),
         serialization_alias="kommunenummer",
     )
 
     #: Postnummeret til enhetens forretningsadresse
     forretningsadresse_postnummer: CommaList[Postnummer] = Field(
-        default_factory=list,
+        default=(),
         serialization_alias="forretningsadresse.postnummer",
     )
 
@@ -206,7 +255,7 @@ class EnhetQuery(Query):
 
     #: Landkode til enhetens forretningsadresse
     forretningsadresse_landkode: CommaList[str] = Field(
-        default_factory=list,
+        default=(),
         serialization_alias="forretningsadresse.landkode",
     )
 
@@ -218,12 +267,12 @@ class EnhetQuery(Query):
 
     #: Enhetens næringskode
     naeringskode: CommaList[Naeringskode] = Field(
-        default_factory=list,
+        default=(),
     )
 
     #: Årstall for siste innsendte årsregnskap for enheten
     siste_innsendte_aarsregnskap: CommaList[str] = Field(
-        default_factory=list,
+        default=(),
         serialization_alias="sisteInnsendteAarsregnskap",
     )
 
@@ -236,7 +285,7 @@ class UnderenhetQuery(Query):
 
     #: Organisasjonsnummeret til underenheten
     organisasjonsnummer: CommaList[Organisasjonsnummer] = Field(
-        default_factory=list,
+        default=(),
     )
 
     #: Organisasjonsnummeret til underenhetens overordnede enhet
@@ -313,7 +362,7 @@ class UnderenhetQuery(Query):
 
     #: Underenhetens organisasjonsform
     organisasjonsform: CommaList[str] = Field(
-        default_factory=list,
+        default=(),
     )
 
     #: Enhetens hjemmeside
@@ -321,13 +370,13 @@ class UnderenhetQuery(Query):
 
     #: Kommunenummer til underenhetens postadresse
     postadresse_kommunenummer: CommaList[Kommunenummer] = Field(
-        default_factory=list,
+        default=(),
         serialization_alias="postadresse.kommunenummer",
     )
 
     #: Postnummeret til underenhetens postadresse
     postadresse_postnummer: CommaList[Postnummer] = Field(
-        default_factory=list,
+        default=(),
         serialization_alias="postadresse.postnummer",
     )
 
@@ -339,7 +388,7 @@ class UnderenhetQuery(Query):
 
     #: Landkode til underenhetens postadresse
     postadresse_landkode: CommaList[str] = Field(
-        default_factory=list,
+        default=(),
         serialization_alias="postadresse.landkode",
     )
 
@@ -351,13 +400,13 @@ class UnderenhetQuery(Query):
 
     #: Kommunenummer til enhetens beliggenhetsadresse
     kommunenummer: CommaList[Kommunenummer] = Field(
-        default_factory=list,
+        default=(),
         serialization_alias="kommunenummer",
     )
 
     #: Postnummeret til enhetens beliggenhetsadresse
     beliggenhetsadresse_postnummer: CommaList[Postnummer] = Field(
-        default_factory=list,
+        default=(),
         serialization_alias="beliggenhetsadresse.postnummer",
     )
 
@@ -369,7 +418,7 @@ class UnderenhetQuery(Query):
 
     #: Landkode til enhetens beliggenhetsadresse
     beliggenhetsadresse_landkode: CommaList[str] = Field(
-        default_factory=list,
+        default=(),
         serialization_alias="beliggenhetsadresse.landkode",
     )
 
@@ -381,5 +430,20 @@ class UnderenhetQuery(Query):
 
     #: Underenhetens næringskode
     naeringskode: CommaList[Naeringskode] = Field(
-        default_factory=list,
+        default=(),
+    )
+
+
+class OppdateringQuery(Query):
+    """The query type for the enhet and underenhet update feeds."""
+
+    #: Tidspunkt for første oppdatering som skal returneres
+    dato: dt.datetime | None = None
+
+    #: Id for første oppdatering som skal returneres
+    oppdateringsid: NonNegativeInt | None = None
+
+    #: Organisasjonsnummeret til enhetene som oppdateringene skal gjelde
+    organisasjonsnummer: CommaList[Organisasjonsnummer] = Field(
+        default=(),
     )
@@ -10,12 +10,13 @@ __all__ = [
     "Enhet",
     "InstitusjonellSektor",
     "Naering",
+    "Oppdatering",
     "Organisasjonsform",
 ]
 
 
 class InstitusjonellSektor(BaseModel):
-    model_config = ConfigDict(alias_generator=to_camel)
+    model_config = ConfigDict(alias_generator=to_camel, defer_build=True)
 
     #: Sektorkoden
     kode: str | None = None
@@ -25,7 +26,7 @@ class InstitusjonellSektor(BaseModel):
 
 
 class Adresse(BaseModel):
-    model_config = ConfigDict(alias_generator=to_camel)
+    model_config = ConfigDict(alias_generator=to_camel, defer_build=True)
 
     #: Adresse
     adresse: list[str | None] = Field(default_factory=list)
@@ -56,7 +57,7 @@ class Naering(BaseModel):
     dekke statistiske behov for Statistisk sentralbyrå (SSB).
     """
 
-    model_config = ConfigDict(alias_generator=to_camel)
+    model_config = ConfigDict(alias_generator=to_camel, defer_build=True)
 
     #: Næringskoden
     kode: str | None = None
@@ -72,7 +73,7 @@ class Organisasjonsform(BaseModel):
     skatt, revisjonsplikt, rettigheter og plikter.
     """
 
-    model_config = ConfigDict(alias_generator=to_camel)
+    model_config = ConfigDict(alias_generator=to_camel, defer_build=True)
 
     #: Organisasjonsformen
     kode: str
@@ -91,7 +92,7 @@ class Enhet(BaseModel):
     er registrert i Enhetsregisteret. Identifiseres med organisasjonsnummer.
     """
 
-    model_config = ConfigDict(alias_generator=to_camel)
+    model_config = ConfigDict(alias_generator=to_camel, defer_build=True)
 
     #: Organisasjonsnummer
     organisasjonsnummer: str
@@ -195,7 +196,7 @@ class Underenhet(BaseModel):
     hovedenhet. Identifiseres med organisasjonsnummer.
     """
 
-    model_config = ConfigDict(alias_generator=to_camel)
+    model_config = ConfigDict(alias_generator=to_camel, defer_build=True)
 
     #: Underenhetens organisasjonsnummer
     organisasjonsnummer: str
@@ -260,7 +261,7 @@ class Underenhet(BaseModel):
 
 
 class RolleType(BaseModel):
-    model_config = ConfigDict(alias_generator=to_camel)
+    model_config = ConfigDict(alias_generator=to_camel, defer_build=True)
 
     #: Kode for rolletype
     kode: str
@@ -270,7 +271,7 @@ class RolleType(BaseModel):
 
 
 class RollePersonNavn(BaseModel):
-    model_config = ConfigDict(alias_generator=to_camel)
+    model_config = ConfigDict(alias_generator=to_camel, defer_build=True)
 
     #: Personens fornavn
     fornavn: str
@@ -283,7 +284,7 @@ class RollePersonNavn(BaseModel):
 
 
 class RollePerson(BaseModel):
-    model_config = ConfigDict(alias_generator=to_camel)
+    model_config = ConfigDict(alias_generator=to_camel, defer_build=True)
 
     #: Personens fødselsdato
     fodselsdato: dt.date
@@ -296,7 +297,7 @@ class RollePerson(BaseModel):
 
 
 class RolleEnhet(BaseModel):
-    model_config = ConfigDict(alias_generator=to_camel)
+    model_config = ConfigDict(alias_generator=to_camel, defer_build=True)
 
     #: Unik id-nummer tilhørende enheten
     organisasjonsnummer: str
@@ -312,7 +313,7 @@ class RolleEnhet(BaseModel):
 
 
 class Rolle(BaseModel):
-    model_config = ConfigDict(alias_generator=to_camel)
+    model_config = ConfigDict(alias_generator=to_camel, defer_build=True)
 
     #: Rolletype, og beskrivelse av typen
     type: RolleType
@@ -337,7 +338,7 @@ class Rolle(BaseModel):
 
 
 class RolleGruppeType(BaseModel):
-    model_config = ConfigDict(alias_generator=to_camel)
+    model_config = ConfigDict(alias_generator=to_camel, defer_build=True)
 
     #: Kode for rollegruppetype
     kode: str
@@ -347,7 +348,7 @@ class RolleGruppeType(BaseModel):
 
 
 class RolleGruppe(BaseModel):
-    model_config = ConfigDict(alias_generator=to_camel)
+    model_config = ConfigDict(alias_generator=to_camel, defer_build=True)
 
     #: Rollegruppetype, og beskrivelse av typen
     type: RolleGruppeType
@@ -360,7 +361,29 @@ class RolleGruppe(BaseModel):
 
 
 class RollerResponse(BaseModel):
-    model_config = ConfigDict(alias_generator=to_camel)
+    model_config = ConfigDict(alias_generator=to_camel, defer_build=True)
 
     #: Liste med rollegrupper knyttet til enheten
     rollegrupper: list[RolleGruppe]
+
+
+class Oppdatering(BaseModel):
+    """En oppdatering av en enhet eller underenhet i Enhetsregisteret.
+
+    Oppdateringene har en stigende ``oppdateringsid``, slik at man kan hente
+    alle oppdateringer etter en gitt oppdatering.
+    """
+
+    model_config = ConfigDict(alias_generator=to_camel, defer_build=True)
+
+    #: Unik, stigende id for oppdateringen
+    oppdateringsid: int
+
+    #: Tidspunkt for oppdateringen
+    dato: dt.datetime
+
+    #: Organisasjonsnummeret til den oppdaterte enheten
+    organisasjonsnummer: str
+
+    #: Type endring: "Ny", "Endring", "Sletting", "Fjernet" eller "Ukjent"
+    endringstype: str
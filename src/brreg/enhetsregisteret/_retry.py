@@ -0,0 +1,203 @@
+import asyncio
+import datetime as dt
+import email.utils
+import random
+import time
+from dataclasses import dataclass
+
+import httpx2
+
+__all__ = [
+    "RetryPolicy",
+]
+
+
+# The request extension that the number of retries is recorded in.
+RETRIES_EXTENSION = "brreg.retries"
+
+# Transport errors where the request may not have reached the server, or the
+# connection broke before a complete response was received.
+RETRY_EXCEPTIONS = (
+    httpx2.TimeoutException,
+    httpx2.NetworkError,
+    httpx2.RemoteProtocolError,
+)
+
+# Status codes where the server may tell us when to try again.
+RETRY_AFTER_STATUS_CODES = frozenset({429, 503})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How to retry requests that failed for transient reasons.
+
+    Idempotent requests are retried if the connection failed, or if the
+    server responded with one of :attr:`status_codes`. Between attempts, the
+    client waits for an exponentially growing, randomized delay. If the
+    server responds with ``429 Too Many Requests`` or ``503 Service
+    Unavailable`` and a ``Retry-After`` header, the client waits as long as
+    the server asks instead.
+
+    When the retries are exhausted, the last error is raised as a
+    :class:`~brreg.BrregRestError`, with the number of retries in its
+    ``retries`` attribute.
+
+    Example::
+
+        client = Client(retry=RetryPolicy(max_retries=5, total_timeout=120))
+    """
+
+    #: The maximum number of retries after the first attempt.
+    max_retries: int = 3
+
+    #: The base delay before retrying, in seconds. The delay before retry
+    #: ``n`` is random, between zero and ``backoff * 2**n``.
+    backoff: float = 0.5
+
+    #: The maximum delay between two attempts, in seconds.
+    max_backoff: float = 30.0
+
+    #: The maximum total time to spend on a request, including all attempts
+    #: and delays, in seconds. A retry that would wait past this is not made.
+    #: If ``None``, there is no limit.
+    total_timeout: float | None = 60.0
+
+    #: The response status codes to retry.
+    status_codes: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+
+    #: The request methods that are safe to retry.
+    methods: frozenset[str] = frozenset({"GET", "HEAD"})
+
+    def __post_init__(self) -> None:
+        if self.max_retries < 0:
+            msg = f"max_retries must be at least 0, got {self.max_retries}"
+            raise ValueError(msg)
+        if self.backoff < 0 or self.max_backoff < 0:
+            msg = "backoff and max_backoff must not be negative"
+            raise ValueError(msg)
+
+    def backoff_delay(self, retry: int) -> float:
+        """The randomized delay before the given retry, counting from zero."""
+        # "Full jitter": spreads out clients that failed at the same time.
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**retry))  # noqa: S311
+
+
+def retry_after(response: httpx2.Response) -> float | None:
+    """Parse the ``Retry-After`` header, as a delay in seconds."""
+    if response.status_code not in RETRY_AFTER_STATUS_CODES:
+        return None
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=dt.timezone.utc)
+    now = dt.datetime.now(tz=dt.timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+class Attempts:
+    """Tracks the attempts to make one request, and decides whether to retry."""
+
+    def __init__(self, policy: RetryPolicy, request: httpx2.Request) -> None:
+        self.policy = policy
+        self.request = request
+        self.retries = 0
+        self.started = time.monotonic()
+        request.extensions[RETRIES_EXTENSION] = 0
+
+    def next_delay(self, response: httpx2.Response | None) -> float | None:
+        """How long to wait before retrying, or ``None`` to not retry.
+
+        :param response: The response, or ``None`` if the attempt raised a
+            retryable transport error.
+        """
+        policy = self.policy
+        if self.request.method not in policy.methods:
+            return None
+        if response is not None and response.status_code not in policy.status_codes:
+            return None
+        if self.retries >= policy.max_retries:
+            return None
+
+        delay = retry_after(response) if response is not None else None
+        if delay is None:
+            delay = policy.backoff_delay(self.retries)
+        if policy.total_timeout is not None:
+            elapsed = time.monotonic() - self.started
+            if elapsed + delay > policy.total_timeout:
+                return None
+
+        self.retries += 1
+        self.request.extensions[RETRIES_EXTENSION] = self.retries
+        return delay
+
+
+class RetryTransport(httpx2.BaseTransport):
+    """Transport that retries requests according to a :class:`RetryPolicy`."""
+
+    def __init__(self, transport: httpx2.BaseTransport, policy: RetryPolicy) -> None:
+        self._transport = transport
+        self._policy = policy
+
+    def handle_request(self, request: httpx2.Request) -> httpx2.Response:
+        attempts = Attempts(self._policy, request)
+        while True:
+            try:
+                response = self._transport.handle_request(request)
+            except RETRY_EXCEPTIONS:
+                delay = attempts.next_delay(None)
+                if delay is None:
+                    raise
+            else:
+                delay = attempts.next_delay(response)
+                if delay is None:
+                    return response
+                response.close()
+            time.sleep(delay)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncRetryTransport(httpx2.AsyncBaseTransport):
+    """Async transport that retries requests according to a :class:`RetryPolicy`."""
+
+    def __init__(
+        self,
+        transport: httpx2.AsyncBaseTransport,
+        policy: RetryPolicy,
+    ) -> None:
+        self._transport = transport
+        self._policy = policy
+
+    async def handle_async_request(self, request: httpx2.Request) -> httpx2.Response:
+        attempts = Attempts(self._policy, request)
+        while True:
+            try:
+                response = await self._transport.handle_async_request(request)
+            except RETRY_EXCEPTIONS:
+                delay = attempts.next_delay(None)
+                if delay is None:
+                    raise
+            else:
+                delay = attempts.next_delay(response)
+                if delay is None:
+                    return response
+                await response.aclose()
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def retries_of(exc: httpx2.HTTPError) -> int:
+    """The number of retries made before the request failed."""
+    return int(exc.request.extensions.get(RETRIES_EXTENSION, 0))
@@ -0,0 +1,59 @@
+import os
+import sqlite3
+import threading
+
+__all__: list[str] = []
+
+
+class ThreadLocalConnections:
+    """One SQLite connection per thread, which are all closed together.
+
+    SQLite connections must not be used by several threads at once, so each
+    thread gets its own. The database uses write-ahead logging, so that
+    readers do not block writers, and incremental vacuuming, so that deleted
+    pages can be returned to the file system.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], *, timeout: float) -> None:
+        self.path = os.fspath(path)
+        self._timeout = timeout
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> sqlite3.Connection:
+        """Get the connection of the current thread, opening it if needed."""
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self._timeout,
+                check_same_thread=False,
+            )
+            # This only has an effect if the database is new, and must come
+            # before anything else writes to it.
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Close the connections of all threads."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def incremental_vacuum(conn: sqlite3.Connection) -> None:
+    """Return all free pages of the database to the file system.
+
+    ``PRAGMA incremental_vacuum`` frees one page each time it is stepped, and
+    ``execute()`` only steps it once, while ``executescript()`` runs it to
+    completion. Any open transaction is committed first.
+    """
+    conn.executescript("PRAGMA incremental_vacuum;")
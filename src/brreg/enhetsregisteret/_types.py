@@ -1,13 +1,26 @@
 import datetime as dt
+from collections.abc import Sequence
 from typing import Annotated, TypeVar
 
-from pydantic import BeforeValidator, Field, PlainSerializer, TypeAdapter
+from pydantic import (
+    AfterValidator,
+    BeforeValidator,
+    ConfigDict,
+    Field,
+    PlainSerializer,
+    TypeAdapter,
+)
 
 T = TypeVar("T")
 
-# A list that serializes to a comma-separated string.
+# Build the validators when they are first used, instead of on import.
+DEFERRED = ConfigDict(defer_build=True)
+
+# A sequence that serializes to a comma-separated string. It is stored as a
+# tuple, to keep the queries that use it hashable.
 CommaList = Annotated[
-    list[T],
+    Sequence[T],
+    AfterValidator(tuple),
     PlainSerializer(
         ",".join,
         return_type=str,
@@ -26,13 +39,17 @@ Kommunenummer = Annotated[
     str,
     Field(min_length=4, max_length=4, pattern=r"^\d{4}$"),
 ]
-KommunenummerValidator: TypeAdapter[Kommunenummer] = TypeAdapter(Kommunenummer)
+KommunenummerValidator: TypeAdapter[Kommunenummer] = TypeAdapter(
+    Kommunenummer, config=DEFERRED
+)
 
 Naeringskode = Annotated[
     str,
     Field(min_length=6, max_length=6, pattern=r"^\d{2}\.\d{3}$"),
 ]
-NaeringskodeValidator: TypeAdapter[Naeringskode] = TypeAdapter(Naeringskode)
+NaeringskodeValidator: TypeAdapter[Naeringskode] = TypeAdapter(
+    Naeringskode, config=DEFERRED
+)
 
 Organisasjonsnummer = Annotated[
     str,
@@ -41,16 +58,42 @@ Organisasjonsnummer = Annotated[
 ]
 OrganisasjonsnummerValidator: TypeAdapter[Organisasjonsnummer] = TypeAdapter(
     Organisasjonsnummer,
+    config=DEFERRED,
+)
+
+# The weights of the first eight digits in the MOD11 check digit of an
+# organization number. The ninth digit is the check digit.
+MOD11_WEIGHTS = (3, 2, 7, 6, 5, 4, 3, 2)
+
+
+def check_mod11(orgnr: str) -> str:
+    """Raise ``ValueError`` if the last digit is not the MOD11 check digit."""
+    weighted = zip(MOD11_WEIGHTS, map(int, orgnr[:8]), strict=True)
+    remainder = sum(weight * digit for weight, digit in weighted) % 11
+    if (11 - remainder) % 11 != int(orgnr[8]):
+        msg = "Organisasjonsnummer has an invalid check digit"
+        raise ValueError(msg)
+    return orgnr
+
+
+# Same as `Organisasjonsnummer`, except that this version also checks the
+# MOD11 check digit, and so rejects numbers that can not exist.
+CheckedOrganisasjonsnummer = Annotated[
+    Organisasjonsnummer,
+    AfterValidator(check_mod11),
+]
+CheckedOrganisasjonsnummerValidator: TypeAdapter[CheckedOrganisasjonsnummer] = (
+    TypeAdapter(CheckedOrganisasjonsnummer, config=DEFERRED)
 )
 
 Postnummer = Annotated[
     str,
     Field(min_length=4, max_length=4, pattern=r"^\d{4}$"),
 ]
-PostnummerValidator: TypeAdapter[Postnummer] = TypeAdapter(Postnummer)
+PostnummerValidator: TypeAdapter[Postnummer] = TypeAdapter(Postnummer, config=DEFERRED)
 
 Sektorkode = Annotated[
     str,
     Field(min_length=4, max_length=4, pattern=r"^\d{4}$"),
 ]
-SektorkodeValidator: TypeAdapter[Sektorkode] = TypeAdapter(Sektorkode)
+SektorkodeValidator: TypeAdapter[Sektorkode] = TypeAdapter(Sektorkode, config=DEFERRED)
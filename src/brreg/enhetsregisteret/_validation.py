@@ -0,0 +1,113 @@
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+try:
+    import numpy as np
+    import numpy.typing as npt
+except ImportError as exc:  # pragma: no cover
+    msg = "Batch validation requires numpy: pip install brreg[columnar]"
+    raise ImportError(msg) from exc
+
+from brreg.enhetsregisteret._types import MOD11_WEIGHTS
+
+__all__ = [
+    "ValidatedOrganisasjonsnumre",
+    "validate_organisasjonsnumre",
+]
+
+
+# The place value of each of the nine digits.
+POWERS = 10 ** np.arange(8, -1, -1, dtype=np.int64)
+
+WEIGHTS = np.array(MOD11_WEIGHTS, dtype=np.int64)
+
+
+@dataclass(frozen=True)
+class ValidatedOrganisasjonsnumre:
+    """The result of :func:`validate_organisasjonsnumre`."""
+
+    #: Whether each value is a valid organization number.
+    valid: npt.NDArray[np.bool_]
+
+    #: Each value as a nine-digit string, or an empty string if the value is
+    #: not valid.
+    normalized: npt.NDArray[np.str_]
+
+    def __iter__(self) -> Iterator[npt.NDArray[Any]]:
+        # Allow unpacking, as in `valid, normalized = validate_...(values)`.
+        return iter((self.valid, self.normalized))
+
+
+def validate_organisasjonsnumre(
+    values: Iterable[int | str | None] | npt.NDArray[Any],
+) -> ValidatedOrganisasjonsnumre:
+    """Validate and normalize many organization numbers at once.
+
+    Accepts the same values as
+    :data:`~brreg.enhetsregisteret.OrganisasjonsnummerValidator`, i.e.
+    integers, or strings with optional spaces and with or without leading
+    zeros, except that empty strings are not valid. It also checks the MOD11
+    check digit, like
+    :data:`~brreg.enhetsregisteret.CheckedOrganisasjonsnummerValidator`.
+    The work is done on numpy arrays, so millions of values are validated in
+    about a second, e.g. to clean an input file before looking up the
+    organizations::
+
+        valid, normalized = validate_organisasjonsnumre(df["orgnr"])
+        orgnrs = normalized[valid]
+
+    Requires numpy, which is installed with the ``columnar`` extra.
+
+    :param values: Integers or strings, e.g. in a list, a numpy array, or a
+        pandas series. Floats with integral values, like integer columns
+        with missing values in pandas, are accepted as integers. Other
+        values, like ``None`` and ``NaN``, are not valid.
+    """
+    if not isinstance(values, Sequence) and not hasattr(values, "__array__"):
+        values = list(values)
+    dtype = getattr(values, "dtype", None)
+    if (
+        dtype is not None
+        and not isinstance(dtype, np.dtype)
+        and getattr(dtype, "kind", None) in ("i", "u", "f")
+    ):
+        # Nullable pandas integers, e.g. Int64, would otherwise become an
+        # object array of integers and pd.NA.
+        array = values.to_numpy(dtype=float, na_value=np.nan)  # type: ignore[union-attr]
+    else:
+        array = np.asarray(values)
+    flat = array.reshape(-1)
+
+    if flat.dtype.kind in "iuf":
+        valid = (flat >= 0) & (flat < 10**9)
+        if flat.dtype.kind == "f":
+            # Integers with missing values, e.g. in a pandas series, are
+            # floats. NaN is never valid, as it compares false.
+            valid &= flat == np.trunc(flat)
+        numbers = np.where(valid, flat, 0).astype(np.int64)
+        digits = numbers[:, np.newaxis] // POWERS % 10
+    elif flat.size:
+        strings = np.char.replace(flat.astype(np.str_), " ", "")
+        lengths = np.char.str_len(strings)
+        valid = (lengths > 0) & (lengths <= 9)  # noqa: PLR2004
+        strings = np.char.zfill(strings, 9)
+        codes = strings.astype("<U9").view(np.uint32).reshape(-1, 9)
+        digits = codes.astype(np.int64) - ord("0")
+        valid &= ((digits >= 0) & (digits <= 9)).all(axis=1)  # noqa: PLR2004
+        digits[~valid] = 0
+    else:
+        valid = np.zeros(0, dtype=np.bool_)
+        digits = np.zeros((0, 9), dtype=np.int64)
+
+    remainder = digits[:, :8] @ WEIGHTS % 11
+    valid &= (11 - remainder) % 11 == digits[:, 8]
+
+    codes = (digits + ord("0")).astype(np.uint32)
+    normalized = np.ascontiguousarray(codes).view("<U9").reshape(-1)
+    normalized = np.where(valid, normalized, "")
+
+    return ValidatedOrganisasjonsnumre(
+        valid=valid.reshape(array.shape),
+        normalized=normalized.reshape(array.shape),
+    )
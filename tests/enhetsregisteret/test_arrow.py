@@ -0,0 +1,165 @@
+import datetime as dt
+from pathlib import Path
+
+import pytest
+from pytest_httpx2 import HTTPXMock
+
+from brreg.enhetsregisteret import (
+    Client,
+    Cursor,
+    Enhet,
+    EnhetPage,
+    EnhetQuery,
+    OppdateringQuery,
+    UnderenhetQuery,
+)
+
+pa = pytest.importorskip("pyarrow")
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+BASE_URL = "https://data.brreg.no/enhetsregisteret/api"
+
+
+def add_page(httpx_mock: HTTPXMock, url: str, filename: str) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=f"{BASE_URL}{url}",
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / filename).read_bytes(),
+    )
+
+
+def test_enhet_page_to_arrow(httpx_mock: HTTPXMock) -> None:
+    add_page(httpx_mock, "/enheter?navn=Sesam", "enheter-search-response.json")
+    cursor = Client().search_enhet(EnhetQuery(navn="Sesam"))
+
+    table = cursor.get_page_arrow(0)
+
+    assert table is not None
+    assert table.num_rows == 1
+    assert table.schema.field("organisasjonsnummer").type == pa.string()
+    assert table.schema.field("registreringsdatoEnhetsregisteret").type == pa.date32()
+    assert table.schema.field("antallAnsatte").type == pa.int64()
+    assert table.schema.field("konkurs").type == pa.bool_()
+    assert table.schema.field("organisasjonsform.kode").type == pa.dictionary(
+        pa.int32(),
+        pa.string(),
+    )
+    assert table.schema.field("postadresse.adresse").type == pa.list_(pa.string())
+
+    row = table.to_pylist()[0]
+    assert row["organisasjonsnummer"] == "112233445"
+    assert row["registreringsdatoEnhetsregisteret"] == dt.date(2017, 10, 20)
+    assert row["organisasjonsform.kode"] == "AS"
+    assert row["forretningsadresse.kommunenummer"] == "0301"
+    assert row["naeringskode1.kode"] == "52.292"
+    assert row["naeringskode2.kode"] is None
+    assert row["konkursdato"] is None
+
+    # The same columns as the models have, with nested fields flattened:
+    assert set(row) >= {
+        field.alias or name
+        for name, field in Enhet.model_fields.items()
+        if name not in {"organisasjonsform", "postadresse", "forretningsadresse"}
+        and not name.startswith(("naeringskode", "hjelpeenhetskode", "institusjon"))
+    }
+
+
+def test_page_to_arrow_out_of_range(httpx_mock: HTTPXMock) -> None:
+    add_page(httpx_mock, "/enheter?navn=Sesam", "enheter-search-response.json")
+    cursor = Client().search_enhet(EnhetQuery(navn="Sesam"))
+
+    assert cursor.get_page_arrow(1) is None
+
+
+def test_cursor_to_arrow(httpx_mock: HTTPXMock) -> None:
+    add_page(httpx_mock, "/enheter?size=2", "enheter-search-page1-response.json")
+    add_page(
+        httpx_mock,
+        "/enheter?size=2&page=1",
+        "enheter-search-page2-response.json",
+    )
+    cursor = Client().search_enhet(EnhetQuery(size=2))
+
+    table = cursor.to_arrow()
+
+    assert table.num_rows == 3
+    kode = table.column("organisasjonsform.kode")
+    assert kode.to_pylist() == ["AS", "FLI", "FLI"]
+    # The pages share one dictionary:
+    assert all(chunk.dictionary == kode.chunk(0).dictionary for chunk in kode.chunks)
+
+
+def test_cursor_to_arrow_when_empty(httpx_mock: HTTPXMock) -> None:
+    add_page(
+        httpx_mock,
+        "/underenheter?navn=x",
+        "underenheter-search-empty-response.json",
+    )
+    cursor = Client().search_underenhet(UnderenhetQuery(navn="x"))
+
+    table = cursor.to_arrow()
+
+    assert table.num_rows == 0
+    assert table.schema.field("beliggenhetsadresse.kommunenummer").type == pa.string()
+    assert table.schema.field("nedleggelsesdato").type == pa.date32()
+
+
+def test_oppdateringer_to_arrow(httpx_mock: HTTPXMock) -> None:
+    add_page(
+        httpx_mock,
+        "/oppdateringer/enheter?oppdateringsid=1",
+        "oppdateringer-enheter-response.json",
+    )
+    cursor = Client().search_enhet_oppdateringer(OppdateringQuery(oppdateringsid=1))
+
+    table = cursor.get_page_arrow(0)
+
+    assert table is not None
+    assert table.column("oppdateringsid").to_pylist() == [
+        21866451,
+        21866452,
+        21866460,
+    ]
+    assert table.column("dato")[0].as_py() == dt.datetime(
+        2024, 1, 2, 5, 1, 13, 431000, tzinfo=dt.timezone.utc
+    )
+
+
+def test_underenhet_oppdateringer_to_arrow(httpx_mock: HTTPXMock) -> None:
+    add_page(
+        httpx_mock,
+        "/oppdateringer/underenheter?oppdateringsid=1",
+        "oppdateringer-underenheter-response.json",
+    )
+    cursor = Client().search_underenhet_oppdateringer(
+        OppdateringQuery(oppdateringsid=1)
+    )
+
+    table = cursor.to_arrow()
+
+    assert table.column("organisasjonsnummer").to_pylist() == ["334455660"]
+
+
+def test_cursor_to_pandas(httpx_mock: HTTPXMock) -> None:
+    pytest.importorskip("pandas")
+    add_page(httpx_mock, "/enheter?navn=Sesam", "enheter-search-response.json")
+    cursor = Client().search_enhet(EnhetQuery(navn="Sesam"))
+
+    df = cursor.to_pandas()
+
+    assert list(df["organisasjonsnummer"]) == ["112233445"]
+    assert df["organisasjonsform.kode"].dtype == "category"
+
+
+def test_cursor_without_raw_search() -> None:
+    page = EnhetPage.model_validate(
+        {"page": {"size": 0, "totalElements": 0, "totalPages": 0, "number": 0}},
+    )
+    cursor = Cursor(lambda _: cursor, EnhetQuery(), page)
+
+    with pytest.raises(TypeError, match="Only cursors from Client searches"):
+        cursor.to_arrow()
+    with pytest.raises(TypeError, match="Only cursors from Client searches"):
+        cursor.get_page_arrow(0)
@@ -0,0 +1,322 @@
+import asyncio
+from pathlib import Path
+
+import httpx2
+import pytest
+from pytest_httpx2 import HTTPXMock
+
+from brreg import BrregRestError, enhetsregisteret
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+async def test_manual_open_close() -> None:
+    client = enhetsregisteret.AsyncClient()
+    assert not client._client.is_closed  # noqa: SLF001
+    await client.close()
+    assert client._client.is_closed  # noqa: SLF001
+
+
+async def test_context_manager() -> None:
+    async with enhetsregisteret.AsyncClient() as client:
+        assert not client._client.is_closed  # noqa: SLF001
+    assert client._client.is_closed  # noqa: SLF001
+
+
+async def test_get_enhet(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/enheter/112233445",
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "enheter-details-response.json").read_bytes(),
+    )
+
+    async with enhetsregisteret.AsyncClient() as client:
+        org = await client.get_enhet("112 233 445")
+
+    assert org is not None
+    assert org.organisasjonsnummer == "112233445"
+    assert org.navn == "SESAM STASJON"
+
+
+@pytest.mark.parametrize("status_code", [404, 410])
+async def test_get_enhet_when_4xx(httpx_mock: HTTPXMock, status_code: int) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/enheter/818511752",
+        status_code=status_code,
+    )
+
+    async with enhetsregisteret.AsyncClient() as client:
+        org = await client.get_enhet("818511752")
+
+    assert org is None
+
+
+async def test_get_enhet_when_bad_request(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/enheter/818511752",
+        status_code=400,
+    )
+
+    async with enhetsregisteret.AsyncClient() as client:
+        with pytest.raises(BrregRestError) as exc_info:
+            await client.get_enhet("818511752")
+
+    assert exc_info.value.method == "GET"
+    assert exc_info.value.status_code == 400
+
+
+async def test_get_enhet_when_http_timeout(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_exception(  # pyright: ignore[reportUnknownMemberType]
+        httpx2.ConnectTimeout("Connection refused"),
+    )
+
+    async with enhetsregisteret.AsyncClient() as client:
+        with pytest.raises(BrregRestError) as exc_info:
+            await client.get_enhet("818511752")
+
+    assert "Connection refused" in str(exc_info.value)
+    assert exc_info.value.status_code is None
+
+
+async def test_get_underenhet(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/underenheter/776655441",
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "underenheter-details-response.json").read_bytes(),
+    )
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/underenheter/818511752",
+        status_code=404,
+    )
+
+    async with enhetsregisteret.AsyncClient() as client:
+        org = await client.get_underenhet("776655441")
+        missing = await client.get_underenhet("818511752")
+
+    assert org is not None
+    assert org.organisasjonsnummer == "776655441"
+    assert missing is None
+
+
+async def test_get_roller(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/enheter/810305282/roller",
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "enheter-roller-person-response.json").read_bytes(),
+    )
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/enheter/818511752/roller",
+        status_code=410,
+    )
+
+    async with enhetsregisteret.AsyncClient() as client:
+        rollegrupper = await client.get_roller("810305282")
+        missing = await client.get_roller("818511752")
+
+    assert len(rollegrupper) > 0
+    assert missing == []
+
+
+async def test_search_enhet_with_pagination(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/enheter?navn=Sesam&size=2",
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "enheter-search-page1-response.json").read_bytes(),
+    )
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/enheter?navn=Sesam&page=1&size=2",
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "enheter-search-page2-response.json").read_bytes(),
+    )
+
+    async with enhetsregisteret.AsyncClient() as client:
+        cursor = await client.search_enhet(
+            enhetsregisteret.EnhetQuery(navn="Sesam", size=2),
+        )
+
+        assert list(cursor.page_numbers) == [0, 1]
+        assert await cursor.get_page(2) is None
+        assert [org.navn async for org in cursor.items] == [
+            "SESAM AS",
+            "SESAM FAMILIEBARNEHAGE",
+            "SESAM FILMKLUBB",
+        ]
+        # All pages are now retained by the cursor:
+        assert len([page async for page in cursor.pages]) == 2
+
+    assert len(httpx_mock.get_requests()) == 2  # pyright: ignore[reportUnknownMemberType]
+
+
+async def test_search_underenhet(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/underenheter?navn=Sesam",
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "underenheter-search-response.json").read_bytes(),
+    )
+
+    async with enhetsregisteret.AsyncClient() as client:
+        cursor = await client.search_underenhet(
+            enhetsregisteret.UnderenhetQuery(navn="Sesam"),
+        )
+        orgs = [org async for org in cursor.items]
+
+    assert len(orgs) > 0
+
+
+async def test_gather(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/enheter/112233445",
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "enheter-details-response.json").read_bytes(),
+    )
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/enheter/818511752",
+        status_code=404,
+    )
+
+    async with enhetsregisteret.AsyncClient() as client:
+        result = await client.gather(
+            client.get_enhet,
+            ["818511752", "112 233 445", "112233445"],
+            max_concurrency=2,
+        )
+
+    # Duplicates are looked up once, and the input order is kept:
+    assert list(result) == ["818511752", "112233445"]
+    assert result["818511752"] is None
+    enhet = result["112233445"]
+    assert enhet is not None
+    assert enhet.navn == "SESAM STASJON"
+    assert len(httpx_mock.get_requests()) == 2  # pyright: ignore[reportUnknownMemberType]
+
+
+async def test_gather_limits_concurrency() -> None:
+    in_flight = 0
+    max_in_flight = 0
+
+    async def operation(orgnr: str) -> str:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return orgnr
+
+    async with enhetsregisteret.AsyncClient() as client:
+        result = await client.gather(
+            operation,
+            [str(n).zfill(9) for n in range(50)],
+            max_concurrency=3,
+        )
+
+    assert len(result) == 50
+    assert max_in_flight == 3
+
+
+async def test_gather_stops_on_error() -> None:
+    async def operation(orgnr: str) -> str:
+        if orgnr == "000000003":
+            msg = "Lookup failed"
+            raise RuntimeError(msg)
+        await asyncio.sleep(0)
+        return orgnr
+
+    async with enhetsregisteret.AsyncClient() as client:
+        with pytest.raises(RuntimeError, match="Lookup failed"):
+            await client.gather(
+                operation,
+                [str(n).zfill(9) for n in range(10)],
+                max_concurrency=2,
+            )
+
+
+async def test_gather_with_invalid_max_concurrency() -> None:
+    async with enhetsregisteret.AsyncClient() as client:
+        with pytest.raises(ValueError, match="max_concurrency must be at least 1"):
+            await client.gather(client.get_enhet, ["112233445"], max_concurrency=0)
+
+
+async def test_get_enheter(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=(
+            "https://data.brreg.no/enhetsregisteret/api/enheter"
+            "?organisasjonsnummer=976030788%2C971497017"
+            "&size=2"
+        ),
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(
+            DATA_DIR / "enheter-search-organisasjonsnummer-response.json"
+        ).read_bytes(),
+    )
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=(
+            "https://data.brreg.no/enhetsregisteret/api/enheter"
+            "?organisasjonsnummer=818511752"
+            "&size=1"
+        ),
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "enheter-search-empty-response.json").read_bytes(),
+    )
+
+    async with enhetsregisteret.AsyncClient() as client:
+        result = await client.get_enheter(
+            ["976030788", "971497017", "818511752"],
+            batch_size=2,
+        )
+
+    assert {orgnr: enhet is not None for orgnr, enhet in result.items()} == {
+        "976030788": True,
+        "971497017": True,
+        "818511752": False,
+    }
+
+
+async def test_get_underenheter(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=(
+            "https://data.brreg.no/enhetsregisteret/api/underenheter"
+            "?organisasjonsnummer=334455660"
+            "&size=1"
+        ),
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "underenheter-search-response.json").read_bytes(),
+    )
+
+    async with enhetsregisteret.AsyncClient() as client:
+        result = await client.get_underenheter(["334455660"])
+
+    underenhet = result["334455660"]
+    assert underenhet is not None
+    assert underenhet.organisasjonsnummer == "334455660"
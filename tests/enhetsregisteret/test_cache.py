@@ -0,0 +1,326 @@
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from pytest_httpx2 import HTTPXMock
+
+from brreg import enhetsregisteret
+from brreg.enhetsregisteret import Cache, CacheEntry, MemoryCache, SqliteCache
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(time, "time", clock)
+    return clock
+
+
+def add_enhet_response(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/enheter/112233445",
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "enheter-details-response.json").read_bytes(),
+    )
+
+
+def test_get_enhet_is_cached(httpx_mock: HTTPXMock) -> None:
+    add_enhet_response(httpx_mock)
+    cache = MemoryCache()
+    client = enhetsregisteret.Client(cache=cache)
+
+    org1 = client.get_enhet("112233445")
+    org2 = client.get_enhet("112 233 445")
+
+    assert len(httpx_mock.get_requests()) == 1  # pyright: ignore[reportUnknownMemberType]
+    assert org1 is not None
+    assert org1 == org2
+    # Raw responses are parsed again on each hit:
+    assert org1 is not org2
+    assert cache.misses == 1
+    assert cache.hits == 1
+    assert len(cache) == 1
+
+
+def test_parsed_models_are_shared_between_hits(httpx_mock: HTTPXMock) -> None:
+    add_enhet_response(httpx_mock)
+    cache = MemoryCache(store="parsed")
+    client = enhetsregisteret.Client(cache=cache)
+
+    org1 = client.get_enhet("112233445")
+    org2 = client.get_enhet("112233445")
+
+    assert org1 is not None
+    assert org1 is org2
+
+
+@pytest.mark.parametrize("parse_mode", ["validate", "raw"])
+def test_parsed_store_hits_in_all_parse_modes(
+    httpx_mock: HTTPXMock,
+    parse_mode: enhetsregisteret.ParseMode,
+) -> None:
+    add_enhet_response(httpx_mock)
+    cache = MemoryCache(store="parsed")
+    client = enhetsregisteret.Client(cache=cache, parse_mode=parse_mode)
+
+    org1 = client.get_enhet("112233445")
+    org2 = client.get_enhet("112233445")
+
+    assert org1 is not None
+    assert org1 == org2
+    assert cache.hits == 1
+
+
+@pytest.mark.parametrize("status_code", [404, 410])
+def test_not_found_is_cached(httpx_mock: HTTPXMock, status_code: int) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/enheter/818511752/roller",
+        status_code=status_code,
+    )
+    cache = MemoryCache()
+    client = enhetsregisteret.Client(cache=cache)
+
+    assert client.get_roller("818511752") == []
+    assert client.get_roller("818511752") == []
+
+    assert len(httpx_mock.get_requests()) == 1  # pyright: ignore[reportUnknownMemberType]
+    assert cache.hits == 1
+
+
+def test_not_found_is_not_cached_without_negative_ttl(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/underenheter/818511752",
+        status_code=404,
+        is_reusable=True,
+    )
+    cache = MemoryCache(negative_ttl=0)
+    client = enhetsregisteret.Client(cache=cache)
+
+    assert client.get_underenhet("818511752") is None
+    assert client.get_underenhet("818511752") is None
+
+    assert len(httpx_mock.get_requests()) == 2  # pyright: ignore[reportUnknownMemberType]
+    assert cache.misses == 2
+
+
+def test_entries_expire_after_ttl(httpx_mock: HTTPXMock, clock: FakeClock) -> None:
+    add_enhet_response(httpx_mock)
+    add_enhet_response(httpx_mock)
+    cache = MemoryCache(ttl={"enhet": 60})
+    client = enhetsregisteret.Client(cache=cache)
+
+    client.get_enhet("112233445")
+    clock.now += 59
+    client.get_enhet("112233445")
+    assert len(httpx_mock.get_requests()) == 1  # pyright: ignore[reportUnknownMemberType]
+
+    clock.now += 1
+    client.get_enhet("112233445")
+    assert len(httpx_mock.get_requests()) == 2  # pyright: ignore[reportUnknownMemberType]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_endpoints_without_ttl_are_not_cached(httpx_mock: HTTPXMock) -> None:
+    add_enhet_response(httpx_mock)
+    add_enhet_response(httpx_mock)
+    cache = MemoryCache(ttl={"underenhet": 60})
+    client = enhetsregisteret.Client(cache=cache)
+
+    client.get_enhet("112233445")
+    client.get_enhet("112233445")
+
+    assert len(httpx_mock.get_requests()) == 2  # pyright: ignore[reportUnknownMemberType]
+    assert len(cache) == 0
+
+
+def test_not_found_is_not_cached_for_endpoints_without_ttl(
+    httpx_mock: HTTPXMock,
+) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/underenheter/818511752",
+        status_code=404,
+        is_reusable=True,
+    )
+    cache = MemoryCache(ttl={"enhet": 60})
+    client = enhetsregisteret.Client(cache=cache)
+
+    assert client.get_underenhet("818511752") is None
+    assert client.get_underenhet("818511752") is None
+
+    assert len(httpx_mock.get_requests()) == 2  # pyright: ignore[reportUnknownMemberType]
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entries_are_evicted() -> None:
+    cache = MemoryCache(max_entries=2)
+    entry = CacheEntry(200, b"{}", time.time())
+
+    cache.set("enhet", "000000001", entry)
+    cache.set("enhet", "000000002", entry)
+    assert cache.get("enhet", "000000001") is not None
+    cache.set("enhet", "000000003", entry)
+
+    assert cache.get("enhet", "000000002") is None
+    assert cache.get("enhet", "000000001") is not None
+    assert cache.get("enhet", "000000003") is not None
+    assert len(cache) == 2
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_cache_base_class_requires_storage() -> None:
+    class IncompleteCache(Cache):
+        pass
+
+    with pytest.raises(TypeError, match="abstract"):
+        IncompleteCache()  # type: ignore[abstract]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_client_uses_cache(httpx_mock: HTTPXMock) -> None:
+    add_enhet_response(httpx_mock)
+    cache = MemoryCache()
+
+    async with enhetsregisteret.AsyncClient(cache=cache) as client:
+        org1 = await client.get_enhet("112233445")
+        org2 = await client.get_enhet("112233445")
+
+    assert org1 == org2
+    assert len(httpx_mock.get_requests()) == 1  # pyright: ignore[reportUnknownMemberType]
+
+
+def test_sqlite_cache_is_shared_between_instances(
+    httpx_mock: HTTPXMock,
+    tmp_path: Path,
+) -> None:
+    add_enhet_response(httpx_mock)
+    path = tmp_path / "cache.sqlite3"
+    cache1 = SqliteCache(path)
+    cache2 = SqliteCache(path)
+
+    org1 = enhetsregisteret.Client(cache=cache1).get_enhet("112233445")
+    org2 = enhetsregisteret.Client(cache=cache2).get_enhet("112233445")
+
+    assert org1 is not None
+    assert org1 == org2
+    assert len(httpx_mock.get_requests()) == 1  # pyright: ignore[reportUnknownMemberType]
+    assert (cache2.hits, cache2.misses) == (1, 0)
+    assert len(cache2) == 1
+
+    cache1.close()
+    cache2.close()
+
+
+def test_sqlite_cache_uses_wal_and_incremental_vacuum(tmp_path: Path) -> None:
+    cache = SqliteCache(tmp_path / "cache.sqlite3")
+    conn = sqlite3.connect(cache.path)
+
+    assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert conn.execute("PRAGMA auto_vacuum").fetchone() == (2,)
+
+    conn.close()
+    cache.close()
+
+
+def test_sqlite_cache_negative_entries(tmp_path: Path) -> None:
+    cache = SqliteCache(tmp_path / "cache.sqlite3")
+
+    cache.set("enhet", "818511752", CacheEntry(404, b"", time.time()))
+
+    entry = cache.get("enhet", "818511752")
+    assert entry is not None
+    assert entry.not_found
+    assert cache.vacuum() == 0
+    cache.close()
+
+
+def test_sqlite_cache_expires_and_vacuums_entries(
+    tmp_path: Path,
+    clock: FakeClock,
+) -> None:
+    cache = SqliteCache(tmp_path / "cache.sqlite3", ttl=60, max_entries=2)
+
+    for i in range(4):
+        cache.set("enhet", f"{i:09}", CacheEntry(200, b"{}", time.time()))
+        clock.now += 10
+    cache.set("enhet", "000000000", CacheEntry(200, b"{}", time.time()))
+    assert len(cache) == 4
+
+    # Entry 1 is expired, and entry 2 is the oldest of the rest.
+    clock.now += 30
+    assert cache.get("enhet", "000000001") is None
+    assert cache.vacuum() == 2
+    assert len(cache) == 2
+    assert cache.get("enhet", "000000000") is not None
+    assert cache.get("enhet", "000000003") is not None
+
+    cache.clear()
+    assert len(cache) == 0
+    cache.close()
+
+
+def test_sqlite_cache_vacuum_frees_pages(tmp_path: Path) -> None:
+    cache = SqliteCache(
+        tmp_path / "cache.sqlite3", max_entries=10, vacuum_interval=10_000
+    )
+    conn = sqlite3.connect(cache.path)
+
+    def pages() -> tuple[int, int]:
+        (page_count,) = conn.execute("PRAGMA page_count").fetchone()
+        (freelist_count,) = conn.execute("PRAGMA freelist_count").fetchone()
+        return page_count, freelist_count
+
+    for i in range(1000):
+        cache.set("enhet", f"{i:09}", CacheEntry(200, b"x" * 1000, time.time() + i))
+    page_count, _ = pages()
+
+    assert cache.vacuum() == 990
+    assert pages()[0] < page_count / 10
+    assert pages()[1] == 0
+
+    conn.close()
+    cache.close()
+
+
+def test_sqlite_cache_vacuums_automatically(tmp_path: Path) -> None:
+    cache = SqliteCache(tmp_path / "cache.sqlite3", max_entries=2, vacuum_interval=3)
+
+    for i in range(5):
+        cache.set("enhet", f"{i:09}", CacheEntry(200, b"{}", time.time() + i))
+
+    # The vacuum after the third write trimmed the cache to two entries.
+    assert len(cache) == 4
+    cache.close()
+
+
+def test_sqlite_cache_with_many_threads(tmp_path: Path) -> None:
+    cache = SqliteCache(tmp_path / "cache.sqlite3")
+
+    def work(i: int) -> bool:
+        orgnr = f"{i % 10:09}"
+        cache.set("enhet", orgnr, CacheEntry(200, b"{}", time.time()))
+        return cache.get("enhet", orgnr) is not None
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert all(executor.map(work, range(200)))
+
+    assert len(cache) == 10
+    cache.close()
@@ -0,0 +1,217 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import httpx2
+import pytest
+
+from brreg import BrregRestError
+from brreg.enhetsregisteret import AsyncClient, Client, EnhetQuery
+from brreg.enhetsregisteret._coalescing import AsyncSingleFlight, SingleFlight
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+ENHET = (DATA_DIR / "enheter-details-response.json").read_bytes()
+SEARCH = (DATA_DIR / "enheter-search-response.json").read_bytes()
+
+
+class BlockingHandler:
+    """Mock API that holds all responses until released."""
+
+    def __init__(self, status_code: int = 200) -> None:
+        self.status_code = status_code
+        self.requests: list[httpx2.Request] = []
+        self.released = threading.Event()
+
+    def __call__(self, request: httpx2.Request) -> httpx2.Response:
+        self.requests.append(request)
+        self.released.wait(timeout=5)
+        content = SEARCH if request.url.path.endswith("/enheter") else ENHET
+        return httpx2.Response(self.status_code, content=content)
+
+
+def wait_for(condition: Callable[[], bool]) -> None:
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def run_concurrently(client: Client, func: Callable[[], object], n: int) -> list[Any]:
+    handler = client._transport  # noqa: SLF001
+    assert isinstance(handler, httpx2.MockTransport)
+    with ThreadPoolExecutor(max_workers=n) as executor:
+        futures = [executor.submit(func) for _ in range(n)]
+        wait_for(lambda: client.coalesced_requests == n - 1)
+        blocking = handler.handler
+        assert isinstance(blocking, BlockingHandler)
+        blocking.released.set()
+        return [future.exception() or future.result() for future in futures]
+
+
+def test_concurrent_lookups_share_one_request() -> None:
+    handler = BlockingHandler()
+    client = Client(transport=httpx2.MockTransport(handler), coalesce=True)
+
+    results = run_concurrently(client, lambda: client.get_enhet("112233445"), 5)
+
+    assert len(handler.requests) == 1
+    assert results[0] is not None
+    assert all(result is results[0] for result in results)
+    assert client.coalesced_requests == 4
+
+
+def test_concurrent_searches_share_one_request() -> None:
+    handler = BlockingHandler()
+    client = Client(transport=httpx2.MockTransport(handler), coalesce=True)
+
+    cursors = run_concurrently(
+        client,
+        lambda: client.search_enhet(EnhetQuery(navn="Sesam")),
+        3,
+    )
+
+    assert len(handler.requests) == 1
+    assert len({id(cursor) for cursor in cursors}) == 3
+    assert all(
+        [enhet.navn for enhet in cursor.items] == ["SESAM STASJON"]
+        for cursor in cursors
+    )
+
+
+def test_errors_are_raised_in_all_callers() -> None:
+    handler = BlockingHandler(status_code=500)
+    client = Client(transport=httpx2.MockTransport(handler), coalesce=True)
+
+    errors = run_concurrently(client, lambda: client.get_enhet("112233445"), 3)
+
+    assert len(handler.requests) == 1
+    assert all(isinstance(error, BrregRestError) for error in errors)
+    assert {error.status_code for error in errors} == {500}
+
+
+def test_sequential_lookups_are_not_coalesced() -> None:
+    handler = BlockingHandler()
+    handler.released.set()
+    client = Client(transport=httpx2.MockTransport(handler), coalesce=True)
+
+    client.get_enhet("112233445")
+    client.get_enhet("112233445")
+
+    assert len(handler.requests) == 2
+    assert client.coalesced_requests == 0
+
+
+def test_not_coalescing_by_default() -> None:
+    assert Client().coalesced_requests == 0
+
+
+def test_single_flight_errors() -> None:
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail() -> None:
+        started.set()
+        release.wait(timeout=5)
+        msg = "boom"
+        raise KeyError(msg)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, "key", fail)
+        started.wait(timeout=5)
+        follower = executor.submit(flight.do, "key", fail)
+        wait_for(lambda: flight.coalesced == 1)
+        release.set()
+
+    assert isinstance(leader.exception(), KeyError)
+    assert follower.exception() is leader.exception()
+
+
+class AsyncBlockingHandler:
+    def __init__(self, status_code: int = 200) -> None:
+        self.status_code = status_code
+        self.requests: list[httpx2.Request] = []
+        self.released = asyncio.Event()
+
+    async def __call__(self, request: httpx2.Request) -> httpx2.Response:
+        self.requests.append(request)
+        await self.released.wait()
+        content = SEARCH if request.url.path.endswith("/enheter") else ENHET
+        return httpx2.Response(self.status_code, content=content)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_concurrent_lookups_share_one_request() -> None:
+    handler = AsyncBlockingHandler()
+
+    async with AsyncClient(
+        transport=httpx2.MockTransport(handler),
+        coalesce=True,
+    ) as client:
+        tasks = [asyncio.ensure_future(client.get_enhet("112233445")) for _ in range(4)]
+        search = asyncio.ensure_future(client.search_enhet(EnhetQuery(navn="Sesam")))
+        await asyncio.sleep(0.01)
+        # The task that started the request is cancelled, but the request
+        # completes for the others.
+        tasks[0].cancel()
+        handler.released.set()
+        results = await asyncio.gather(*tasks[1:])
+        cursor = await search
+
+    assert len(handler.requests) == 2
+    assert all(result is results[0] for result in results)
+    assert client.coalesced_requests == 3
+    assert tasks[0].cancelled()
+    assert [enhet.navn async for enhet in cursor.items] == ["SESAM STASJON"]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_errors_are_raised_in_all_callers() -> None:
+    handler = AsyncBlockingHandler(status_code=503)
+
+    async with AsyncClient(
+        transport=httpx2.MockTransport(handler),
+        coalesce=True,
+    ) as client:
+        tasks = [asyncio.ensure_future(client.get_enhet("112233445")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        handler.released.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert len(handler.requests) == 1
+    assert all(isinstance(result, BrregRestError) for result in results)
+    assert client.coalesced_requests == 2
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_not_coalescing_by_default() -> None:
+    async with AsyncClient() as client:
+        assert client.coalesced_requests == 0
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_single_flight_starts_anew_when_done() -> None:
+    flight = AsyncSingleFlight()
+
+    async def value() -> int:
+        return 42
+
+    assert await flight.do("key", value) == 42
+    assert await flight.do("key", value) == 42
+
+    # A finished call that is forgotten late does not forget the next call.
+    old = asyncio.get_running_loop().create_future()
+    new = flight._tasks["key"] = asyncio.ensure_future(value())  # noqa: SLF001
+    flight._forget("key", old)  # noqa: SLF001
+    assert flight._tasks["key"] is new  # noqa: SLF001
+    await new
+    assert flight.coalesced == 0
@@ -0,0 +1,208 @@
+import datetime as dt
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from brreg import enhetsregisteret
+from brreg.enhetsregisteret import (
+    Enhet,
+    EnhetQuery,
+    Underenhet,
+    UnderenhetQuery,
+)
+
+pytest.importorskip("numpy")
+
+from brreg.enhetsregisteret import EnhetTable, UnderenhetTable
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+def make_enhet(orgnr: str, navn: str, **fields: Any) -> Enhet:  # noqa: ANN401
+    return Enhet.model_validate(
+        {
+            "organisasjonsnummer": orgnr,
+            "navn": navn,
+            "organisasjonsform": {"kode": "AS", "beskrivelse": "Aksjeselskap"},
+            **fields,
+        }
+    )
+
+
+@pytest.fixture
+def table() -> EnhetTable:
+    details = json.loads((DATA_DIR / "enheter-details-response.json").read_bytes())
+    return EnhetTable(
+        [
+            Enhet.model_validate(details),
+            make_enhet(
+                "976030788",
+                "Sesam AS",
+                antallAnsatte=5,
+                konkurs=True,
+                stiftelsesdato="1996-01-01",
+                forretningsadresse={"kommunenummer": "0301", "poststed": "OSLO"},
+                naeringskode2={"kode": "64.190", "beskrivelse": "Bankvirksomhet"},
+                sisteInnsendteAarsregnskap="2023",
+            ),
+            make_enhet(
+                "971497017",
+                "SESAM FAMILIEBARNEHAGE",
+                organisasjonsform={"kode": "ENK", "beskrivelse": "Enkeltperson"},
+                antallAnsatte=50,
+                konkurs=False,
+                stiftelsesdato="2001-05-17",
+                forretningsadresse={"kommunenummer": "4601", "poststed": "BERGEN"},
+                institusjonellSektorkode={"kode": "2100"},
+                frivilligMvaRegistrertBeskrivelser=["Utleier av bygg"],
+            ),
+            make_enhet("988879134", "BLÅBÆR AS"),
+        ]
+    )
+
+
+def orgnrs(table: EnhetTable, query: EnhetQuery) -> list[str]:
+    return [e.organisasjonsnummer for e in table.search(query).items]
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        (EnhetQuery(), ["112233445", "976030788", "971497017", "988879134"]),
+        (EnhetQuery(navn="sesam"), ["112233445", "976030788", "971497017"]),
+        (
+            EnhetQuery(organisasjonsnummer=["988879134", "976030788"]),
+            ["976030788", "988879134"],
+        ),
+        (EnhetQuery(konkurs=True), ["976030788"]),
+        (EnhetQuery(konkurs=False), ["112233445", "971497017"]),
+        (EnhetQuery(fra_antall_ansatte=10), ["112233445", "971497017"]),
+        (EnhetQuery(til_antall_ansatte=10), ["976030788"]),
+        (
+            EnhetQuery(
+                fra_stiftelsesdato=dt.date(2000, 1, 1),
+                til_stiftelsesdato=dt.date(2010, 1, 1),
+            ),
+            ["971497017"],
+        ),
+        (EnhetQuery(til_stiftelsesdato=dt.date(2000, 1, 1)), ["976030788"]),
+        (EnhetQuery(kommunenummer=["0301", "5001"]), ["112233445", "976030788"]),
+        (EnhetQuery(forretningsadresse_poststed="Bergen"), ["971497017"]),
+        (EnhetQuery(organisasjonsform=["ENK"]), ["971497017"]),
+        (EnhetQuery(naeringskode=["64.190"]), ["976030788"]),
+        (EnhetQuery(institusjonell_sektorkode=["2100"]), ["971497017"]),
+        (
+            EnhetQuery(frivillig_registrert_i_mvaregisteret=["Utleier av bygg"]),
+            ["971497017"],
+        ),
+        (EnhetQuery(siste_innsendte_aarsregnskap=["2023"]), ["976030788"]),
+        (EnhetQuery(navn="sesam familie", konkurs=False), ["971497017"]),
+        (EnhetQuery(navn="jibberish"), []),
+    ],
+)
+def test_search_enheter(
+    table: EnhetTable,
+    query: EnhetQuery,
+    expected: list[str],
+) -> None:
+    assert orgnrs(table, query) == expected
+
+
+def test_search_pages(table: EnhetTable) -> None:
+    cursor = table.search(EnhetQuery(size=3, sort="DESC"))
+
+    page = cursor.get_page(0)
+    assert page is not None
+    assert (page.page_size, page.total_elements, page.total_pages) == (3, 4, 2)
+    assert [e.organisasjonsnummer for e in page.items] == [
+        "988879134",
+        "971497017",
+        "976030788",
+    ]
+    page = cursor.get_page(1)
+    assert page is not None
+    assert [e.organisasjonsnummer for e in page.items] == ["112233445"]
+    assert len(table) == 4
+
+
+def test_search_returns_entities_as_given(table: EnhetTable) -> None:
+    details = json.loads((DATA_DIR / "enheter-details-response.json").read_bytes())
+
+    page = table.search(EnhetQuery(organisasjonsnummer=["112233445"])).get_page(0)
+
+    assert page is not None
+    assert page.items == [Enhet.model_validate(details)]
+
+
+def test_text_columns_store_distinct_values_once() -> None:
+    table = EnhetTable(
+        make_enhet(f"9{i:08}", "Sesam AS", postadresse={"poststed": "OSLO"})
+        for i in range(100)
+    )
+
+    assert table._categories["navn"].tolist() == ["sesam as"]  # noqa: SLF001
+    assert table._arrays["navn"].dtype.name == "int32"  # noqa: SLF001
+    assert len(table.match(EnhetQuery(postadresse_poststed="oslo")).nonzero()[0]) == 100
+
+
+def test_match_returns_mask(table: EnhetTable) -> None:
+    mask = table.match(EnhetQuery(navn="sesam", size=1))
+
+    assert mask.tolist() == [True, True, True, False]
+
+
+@pytest.mark.parametrize(
+    ("table_type", "query_type"),
+    [(EnhetTable, EnhetQuery), (UnderenhetTable, UnderenhetQuery)],
+)
+def test_all_query_fields_have_filters(
+    table_type: type[EnhetTable | UnderenhetTable],
+    query_type: type[EnhetQuery | UnderenhetQuery],
+) -> None:
+    fields = set(query_type.model_fields) - {"sort", "size", "page"}
+
+    assert set(table_type.filters) == fields
+    assert {column for _, column in table_type.filters.values()} <= set(
+        table_type.columns
+    )
+
+
+def test_search_underenheter() -> None:
+    data = json.loads((DATA_DIR / "underenheter-details-response.json").read_bytes())
+    table = UnderenhetTable(
+        [
+            Underenhet.model_validate(data),
+            Underenhet.model_validate(
+                {
+                    "organisasjonsnummer": "334455660",
+                    "navn": "SESAM FILIAL",
+                    "organisasjonsform": {"kode": "BEDR", "beskrivelse": "Bedrift"},
+                    "oppstartsdato": "2020-02-01",
+                    "beliggenhetsadresse": {
+                        "adresse": ["Storgata 1", None],
+                        "kommunenummer": "3301",
+                    },
+                }
+            ),
+        ]
+    )
+
+    def search(query: UnderenhetQuery) -> list[str]:
+        return [u.organisasjonsnummer for u in table.search(query).items]
+
+    assert search(UnderenhetQuery(fra_oppstartsdato=dt.date(2020, 1, 1))) == [
+        "334455660"
+    ]
+    assert search(UnderenhetQuery(kommunenummer=["3301"])) == ["334455660"]
+    assert search(UnderenhetQuery(beliggenhetsadresse_adresse="storgata")) == [
+        "334455660"
+    ]
+
+
+def test_tables_are_imported_lazily() -> None:
+    assert enhetsregisteret.EnhetTable is EnhetTable
+
+    with pytest.raises(AttributeError, match="no attribute 'Nothing'"):
+        enhetsregisteret.Nothing  # noqa: B018  # pyright: ignore[reportAttributeAccessIssue]
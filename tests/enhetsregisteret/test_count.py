@@ -0,0 +1,146 @@
+import httpx2
+import pytest
+from pytest_httpx2 import HTTPXMock
+
+from brreg import BrregError
+from brreg.enhetsregisteret import AsyncClient, Client, EnhetQuery, UnderenhetQuery
+
+BASE_URL = "https://data.brreg.no/enhetsregisteret/api"
+
+# The number of entities per kommunenummer in the mock register.
+COUNTS = {"0301": 120, "4601": 45, "5001": 0}
+
+
+def add_count(
+    httpx_mock: HTTPXMock,
+    url: str,
+    total_elements: int,
+) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=url,
+        status_code=200,
+        json={
+            "_embedded": {"enheter": [{"organisasjonsnummer": "not parsed"}]},
+            "page": {
+                "size": 1,
+                "totalElements": total_elements,
+                "totalPages": total_elements,
+                "number": 0,
+            },
+        },
+    )
+
+
+def count_handler(request: httpx2.Request) -> httpx2.Response:
+    assert request.url.params["size"] == "1"
+    assert request.url.params["navn"] == "Sesam"
+    total_elements = COUNTS[request.url.params["kommunenummer"]]
+    return httpx2.Response(
+        200,
+        json={
+            "page": {
+                "size": 1,
+                "totalElements": total_elements,
+                "totalPages": total_elements,
+                "number": 0,
+            },
+        },
+    )
+
+
+def test_count_enheter(httpx_mock: HTTPXMock) -> None:
+    add_count(httpx_mock, f"{BASE_URL}/enheter?size=1&konkurs=true", 1234)
+
+    count = Client().count_enheter(EnhetQuery(konkurs=True, page=3, size=100))
+
+    assert count == 1234
+
+
+def test_count_underenheter(httpx_mock: HTTPXMock) -> None:
+    add_count(httpx_mock, f"{BASE_URL}/underenheter?size=1&navn=Sesam", 7)
+
+    assert Client().count_underenheter(UnderenhetQuery(navn="Sesam")) == 7
+
+
+def test_count_errors(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=f"{BASE_URL}/enheter?size=1",
+        status_code=200,
+        json={"_embedded": {}},
+    )
+
+    with pytest.raises(BrregError, match="totalElements"):
+        Client().count_enheter(EnhetQuery())
+
+
+def test_count_enheter_by() -> None:
+    client = Client(transport=httpx2.MockTransport(count_handler))
+
+    counts = client.count_enheter_by(
+        "kommunenummer",
+        ["0301", "4601", "5001", "0301"],
+        EnhetQuery(navn="Sesam"),
+    )
+
+    assert counts == COUNTS
+
+
+def test_count_underenheter_by() -> None:
+    client = Client(transport=httpx2.MockTransport(count_handler))
+
+    counts = client.count_underenheter_by(
+        "kommunenummer",
+        ["0301", "4601"],
+        UnderenhetQuery(kommunenummer=["5001"], navn="Sesam"),
+        max_workers=1,
+    )
+
+    assert counts == {"0301": 120, "4601": 45}
+
+
+def test_count_by_scalar_field(httpx_mock: HTTPXMock) -> None:
+    add_count(httpx_mock, f"{BASE_URL}/enheter?size=1&navn=Sesam", 3)
+    add_count(httpx_mock, f"{BASE_URL}/enheter?size=1&navn=Rema", 5)
+
+    counts = Client().count_enheter_by("navn", ["Sesam", "Rema"])
+
+    assert counts == {"Sesam": 3, "Rema": 5}
+
+
+@pytest.mark.parametrize("field", ["foo", "size"])
+def test_count_by_unknown_field(field: str) -> None:
+    with pytest.raises(ValueError, match=f"EnhetQuery has no field '{field}'"):
+        Client().count_enheter_by(field, ["0301"])
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_count(httpx_mock: HTTPXMock) -> None:
+    add_count(httpx_mock, f"{BASE_URL}/enheter?size=1&navn=Sesam", 3)
+    add_count(httpx_mock, f"{BASE_URL}/underenheter?size=1&navn=Sesam", 4)
+
+    async with AsyncClient() as client:
+        assert await client.count_enheter(EnhetQuery(navn="Sesam")) == 3
+        assert await client.count_underenheter(UnderenhetQuery(navn="Sesam")) == 4
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_count_by() -> None:
+    async with AsyncClient(transport=httpx2.MockTransport(count_handler)) as client:
+        enheter = await client.count_enheter_by(
+            "kommunenummer",
+            COUNTS,
+            EnhetQuery(navn="Sesam"),
+            max_concurrency=2,
+        )
+        underenheter = await client.count_underenheter_by(
+            "kommunenummer",
+            ["4601"],
+            UnderenhetQuery(navn="Sesam"),
+        )
+
+    assert enheter == COUNTS
+    assert underenheter == {"4601": 45}
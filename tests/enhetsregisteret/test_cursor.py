@@ -0,0 +1,160 @@
+import threading
+
+import pytest
+
+from brreg import BrregError
+from brreg.enhetsregisteret import Cursor, Enhet, EnhetPage, EnhetQuery
+
+TOTAL_PAGES = 6
+
+
+def make_page(page_number: int) -> EnhetPage:
+    return EnhetPage.model_validate(
+        {
+            "_embedded": {
+                "enheter": [
+                    {
+                        "organisasjonsnummer": f"{page_number:09}",
+                        "navn": f"ENHET {page_number}",
+                        "organisasjonsform": {
+                            "kode": "AS",
+                            "beskrivelse": "Aksjeselskap",
+                        },
+                    },
+                ],
+            },
+            "page": {
+                "size": 1,
+                "totalElements": TOTAL_PAGES,
+                "totalPages": TOTAL_PAGES,
+                "number": page_number,
+            },
+        },
+    )
+
+
+class FakeSearch:
+    def __init__(self) -> None:
+        self.fetched: list[int] = []
+        self.lock = threading.Lock()
+
+    def __call__(self, query: EnhetQuery) -> Cursor[Enhet, EnhetQuery]:
+        page_number = query.page or 0
+        with self.lock:
+            self.fetched.append(page_number)
+        return Cursor(self, query, make_page(page_number))
+
+    def cursor(self) -> Cursor[Enhet, EnhetQuery]:
+        return self(EnhetQuery(navn="Enhet", size=1))
+
+
+def test_iter_pages_with_prefetch() -> None:
+    search = FakeSearch()
+    cursor = search.cursor()
+
+    pages = list(cursor.iter_pages(prefetch=2))
+
+    assert [page.page_number for page in pages] == list(range(TOTAL_PAGES))
+    assert sorted(search.fetched) == list(range(TOTAL_PAGES))
+
+    # The prefetched pages are retained by the cursor:
+    assert [item.navn for item in cursor.iter_items(prefetch=2)] == [
+        f"ENHET {n}" for n in range(TOTAL_PAGES)
+    ]
+    assert len(search.fetched) == TOTAL_PAGES
+
+
+def test_iter_pages_with_prefetch_is_bounded() -> None:
+    search = FakeSearch()
+    cursor = search.cursor()
+
+    pages = cursor.iter_pages(prefetch=2)
+    page = next(pages)
+    assert page.page_number == 0
+
+    # While page 0 is being consumed, at most pages 1 and 2 are fetched.
+    pages.close()
+    assert max(search.fetched) <= 2
+
+
+def test_iter_pages_with_prefetch_propagates_errors() -> None:
+    search = FakeSearch()
+    cursor = search.cursor()
+
+    def failing_search(query: EnhetQuery) -> Cursor[Enhet, EnhetQuery]:
+        if query.page == 3:
+            msg = "Fetching page failed"
+            raise BrregError(msg)
+        return search(query)
+
+    cursor._operation = failing_search  # noqa: SLF001
+
+    items = cursor.iter_items(prefetch=2)
+    assert [next(items).navn for _ in range(3)] == ["ENHET 0", "ENHET 1", "ENHET 2"]
+    with pytest.raises(BrregError, match="Fetching page failed"):
+        next(items)
+
+
+def test_iter_pages_with_negative_prefetch() -> None:
+    cursor = FakeSearch().cursor()
+
+    with pytest.raises(ValueError, match="prefetch must be zero or more"):
+        next(cursor.iter_pages(prefetch=-1))
+
+
+def test_iter_pages_without_retaining_pages() -> None:
+    search = FakeSearch()
+    cursor = search.cursor()
+
+    assert [item.navn for item in cursor.iter_items(retain=False)] == [
+        f"ENHET {n}" for n in range(TOTAL_PAGES)
+    ]
+    assert list(cursor._pages) == [0]  # noqa: SLF001
+
+    # Iterating again fetches the pages again, except the retained first page:
+    assert len(list(cursor.iter_pages(retain=False))) == TOTAL_PAGES
+    assert search.fetched.count(0) == 1
+    assert search.fetched.count(5) == 2
+
+
+def test_iter_pages_with_prefetch_without_retaining_pages() -> None:
+    search = FakeSearch()
+    cursor = search.cursor()
+
+    pages = list(cursor.iter_pages(prefetch=2, retain=False))
+
+    assert [page.page_number for page in pages] == list(range(TOTAL_PAGES))
+    assert list(cursor._pages) == [0]  # noqa: SLF001
+
+
+def test_max_retained_pages_evicts_least_recently_used_page() -> None:
+    search = FakeSearch()
+    cursor = search.cursor()
+    cursor.max_retained_pages = 2
+
+    assert cursor.get_page(1) is not None
+    assert cursor.get_page(0) is not None
+    assert cursor.get_page(2) is not None
+    assert list(cursor._pages) == [0, 2]  # noqa: SLF001
+
+    # The evicted page is fetched again on demand:
+    page = cursor.get_page(1)
+    assert page is not None
+    assert page.page_number == 1
+    assert search.fetched.count(1) == 2
+    assert list(cursor._pages) == [2, 1]  # noqa: SLF001
+
+
+def test_max_retained_pages_with_prefetch() -> None:
+    search = FakeSearch()
+    cursor = search.cursor()
+    assert cursor.get_page(3) is not None
+    cursor.max_retained_pages = 2
+
+    # Page 3 is retained when the prefetching starts, but is evicted by the
+    # pages before it by the time it is consumed.
+    pages = list(cursor.iter_pages(prefetch=3))
+
+    assert [page.page_number for page in pages] == list(range(TOTAL_PAGES))
+    assert search.fetched.count(3) == 2
+    assert len(cursor._pages) == 2  # noqa: SLF001
@@ -0,0 +1,448 @@
+import gzip
+import json
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import pytest
+from pytest_httpx2 import HTTPXMock, IteratorStream
+
+from brreg import BrregError, BrregRestError, enhetsregisteret
+from brreg.enhetsregisteret._bulk import gunzip, iter_csv_records, iter_json_array
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+def enheter_dump() -> bytes:
+    page = json.loads((DATA_DIR / "enheter-search-page1-response.json").read_bytes())
+    return json.dumps(page["_embedded"]["enheter"], indent=2).encode()
+
+
+ENHETER_CSV = (
+    "organisasjonsnummer,navn,organisasjonsform.kode,organisasjonsform.beskrivelse,"
+    "registreringsdatoEnhetsregisteret,registrertIMvaregisteret,"
+    "forretningsadresse.adresse,forretningsadresse.postnummer,"
+    "forretningsadresse.poststed,konkurs\r\n"
+    '112233445,SESAM STASJON,AS,Aksjeselskap,2017-10-20,true,"Tyvholmen 1",0101,'
+    "OSLO,false\r\n"
+    '123456789,"SESAM, SVERIGE",NUF,Norskregistrert utenlandsk foretak,,false,,,,'
+    "\r\n"
+)
+
+
+def chunked(data: bytes, size: int) -> list[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def test_download_enheter(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/enheter/lastned",
+        match_headers={
+            "accept": (
+                "application/vnd.brreg.enhetsregisteret.enhet.v2+gzip;charset=UTF-8"
+            ),
+        },
+        status_code=200,
+        headers={"content-type": "application/octet-stream"},
+        content=gzip.compress(enheter_dump()),
+    )
+
+    enheter = enhetsregisteret.Client().download_enheter()
+
+    # The download starts when the iteration starts:
+    assert httpx_mock.get_requests() == []  # pyright: ignore[reportUnknownMemberType]
+    assert [(e.organisasjonsnummer, e.navn) for e in enheter] == [
+        ("976030788", "SESAM AS"),
+        ("971497017", "SESAM FAMILIEBARNEHAGE"),
+    ]
+
+
+def test_download_enheter_as_csv(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/enheter/lastned/csv",
+        status_code=200,
+        content=gzip.compress(ENHETER_CSV.encode()),
+    )
+
+    enheter = list(enhetsregisteret.Client().download_enheter(file_format="csv"))
+
+    assert len(enheter) == 2
+    assert enheter[0].organisasjonsnummer == "112233445"
+    assert enheter[0].organisasjonsform.kode == "AS"
+    assert enheter[0].registreringsdato_enhetsregisteret == date(2017, 10, 20)
+    assert enheter[0].registrert_i_mvaregisteret is True
+    assert enheter[0].konkurs is False
+    assert enheter[0].forretningsadresse == enhetsregisteret.Adresse(
+        adresse=["Tyvholmen 1"],
+        postnummer="0101",
+        poststed="OSLO",
+    )
+    assert enheter[1].navn == "SESAM, SVERIGE"
+    assert enheter[1].registreringsdato_enhetsregisteret is None
+    assert enheter[1].forretningsadresse is None
+
+
+def test_download_underenheter(httpx_mock: HTTPXMock) -> None:
+    page = json.loads((DATA_DIR / "underenheter-search-response.json").read_bytes())
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/underenheter/lastned",
+        status_code=200,
+        content=gzip.compress(json.dumps(page["_embedded"]["underenheter"]).encode()),
+    )
+
+    underenheter = list(enhetsregisteret.Client().download_underenheter())
+
+    assert [u.organisasjonsnummer for u in underenheter] == ["334455660"]
+
+
+def test_download_enheter_when_server_error(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/enheter/lastned",
+        status_code=503,
+    )
+
+    with pytest.raises(BrregRestError) as exc_info:
+        list(enhetsregisteret.Client().download_enheter())
+
+    assert exc_info.value.status_code == 503
+
+
+def test_download_enheter_with_truncated_data(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/enheter/lastned",
+        status_code=200,
+        content=gzip.compress(enheter_dump())[:-100],
+    )
+
+    with pytest.raises(BrregError):
+        list(enhetsregisteret.Client().download_enheter())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_iter_json_array_across_chunks(chunk_size: int) -> None:
+    data = '[{"navn": "BLÅBÆR AS", "tall": [1, 2]}, {"tekst": "\\"[{"} ]'.encode()
+
+    values = list(iter_json_array(chunked(data, chunk_size)))
+
+    assert values == [{"navn": "BLÅBÆR AS", "tall": [1, 2]}, {"tekst": '"[{'}]
+
+
+@pytest.mark.parametrize(
+    ("data", "expected"),
+    [
+        (b"[]", []),
+        (b" [ ] \n", []),
+        (b"[1,2]", [1, 2]),
+    ],
+)
+def test_iter_json_array_with_simple_arrays(data: bytes, expected: list[Any]) -> None:
+    assert list(iter_json_array([data])) == expected
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"{}",
+        b"[1,]",
+        b"[1 2]",
+        b'[{"a": 1}',
+        b'[{"a": }]',
+        b"[] []",
+    ],
+)
+def test_iter_json_array_with_malformed_data(data: bytes) -> None:
+    with pytest.raises(BrregError, match="Malformed JSON array"):
+        list(iter_json_array(chunked(data, 3)))
+
+
+def test_gunzip_passes_through_uncompressed_data() -> None:
+    assert b"".join(gunzip([b"[", b"]"])) == b"[]"
+    assert b"".join(gunzip([])) == b""
+
+
+def test_gunzip_with_concatenated_members() -> None:
+    data = gzip.compress(b"hello ") + gzip.compress(b"world")
+
+    assert b"".join(gunzip(chunked(data, 5))) == b"hello world"
+
+
+def test_iter_csv_records_across_chunks() -> None:
+    records = list(iter_csv_records(chunked(ENHETER_CSV.encode(), 5)))
+
+    assert records[1] == {
+        "organisasjonsnummer": "123456789",
+        "navn": "SESAM, SVERIGE",
+        "organisasjonsform": {
+            "kode": "NUF",
+            "beskrivelse": "Norskregistrert utenlandsk foretak",
+        },
+        "registrertIMvaregisteret": "false",
+    }
+
+
+DUMP_URL = "https://data.brreg.no/enhetsregisteret/api/enheter/lastned"
+ETAG = '"dump-2024-01-02"'
+LAST_MODIFIED = "Tue, 02 Jan 2024 05:00:00 GMT"
+
+
+def test_save_dump(httpx_mock: HTTPXMock, tmp_path: Path) -> None:
+    data = gzip.compress(enheter_dump())
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=DUMP_URL,
+        status_code=200,
+        headers={"etag": ETAG, "last-modified": LAST_MODIFIED},
+        content=data,
+    )
+
+    dump = enhetsregisteret.Client().save_dump("enheter", tmp_path / "dumps")
+
+    assert dump.changed
+    assert dump.path == tmp_path / "dumps" / "enheter.json.gz"
+    assert dump.path.read_bytes() == data
+    assert dump.size == len(data)
+    assert (dump.etag, dump.last_modified) == (ETAG, LAST_MODIFIED)
+    assert sorted(p.name for p in (tmp_path / "dumps").iterdir()) == [
+        "enheter.json.gz",
+        "enheter.json.gz.meta.json",
+    ]
+    assert [
+        e.organisasjonsnummer for e in enhetsregisteret.read_enheter(dump.path)
+    ] == [
+        "976030788",
+        "971497017",
+    ]
+
+
+def test_save_dump_when_not_modified(httpx_mock: HTTPXMock, tmp_path: Path) -> None:
+    data = gzip.compress(enheter_dump())
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=DUMP_URL,
+        status_code=200,
+        headers={"etag": ETAG, "last-modified": LAST_MODIFIED},
+        content=data,
+    )
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=DUMP_URL,
+        match_headers={"if-none-match": ETAG, "if-modified-since": LAST_MODIFIED},
+        status_code=304,
+    )
+    client = enhetsregisteret.Client()
+    first = client.save_dump("enheter", tmp_path)
+
+    second = client.save_dump("enheter", tmp_path)
+
+    assert not second.changed
+    assert second.path.read_bytes() == data
+    assert (second.size, second.etag) == (len(data), ETAG)
+    assert second.downloaded_at == first.downloaded_at
+
+
+def write_partial_dump(tmp_path: Path, data: bytes) -> None:
+    (tmp_path / "enheter.json.gz.part").write_bytes(data)
+    (tmp_path / "enheter.json.gz.part.meta.json").write_text(json.dumps({"etag": ETAG}))
+
+
+def test_save_dump_resumes_partial_download(
+    httpx_mock: HTTPXMock,
+    tmp_path: Path,
+) -> None:
+    data = gzip.compress(enheter_dump())
+    write_partial_dump(tmp_path, data[:100])
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=DUMP_URL,
+        match_headers={"range": "bytes=100-", "if-range": ETAG},
+        status_code=206,
+        headers={
+            "etag": ETAG,
+            "content-range": f"bytes 100-{len(data) - 1}/{len(data)}",
+        },
+        content=data[100:],
+    )
+
+    dump = enhetsregisteret.Client().save_dump("enheter", tmp_path)
+
+    assert dump.changed
+    assert dump.path.read_bytes() == data
+    assert not (tmp_path / "enheter.json.gz.part").exists()
+    assert not (tmp_path / "enheter.json.gz.part.meta.json").exists()
+
+
+def test_save_dump_restarts_when_dump_changed_during_download(
+    httpx_mock: HTTPXMock,
+    tmp_path: Path,
+) -> None:
+    data = gzip.compress(enheter_dump())
+    write_partial_dump(tmp_path, b"stale data")
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=DUMP_URL,
+        match_headers={"range": "bytes=10-"},
+        status_code=200,
+        headers={"etag": '"dump-2024-01-03"'},
+        content=data,
+    )
+
+    dump = enhetsregisteret.Client().save_dump("enheter", tmp_path)
+
+    assert dump.path.read_bytes() == data
+    assert dump.etag == '"dump-2024-01-03"'
+
+
+@pytest.mark.parametrize(
+    ("content_range", "match"),
+    [
+        ("bytes 5-9/10", "wrong offset"),
+        ("bytes */10", "Invalid Content-Range"),
+    ],
+)
+def test_save_dump_with_bad_partial_response(
+    httpx_mock: HTTPXMock,
+    tmp_path: Path,
+    content_range: str,
+    match: str,
+) -> None:
+    write_partial_dump(tmp_path, b"12345678")
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=DUMP_URL,
+        status_code=206,
+        headers={"content-range": content_range},
+        content=b"67890",
+    )
+
+    with pytest.raises(BrregError, match=match):
+        enhetsregisteret.Client().save_dump("enheter", tmp_path)
+
+    # The partial download is discarded, so the next attempt starts over.
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_save_dump_keeps_previous_copy_if_download_is_corrupt(
+    httpx_mock: HTTPXMock,
+    tmp_path: Path,
+) -> None:
+    data = gzip.compress(enheter_dump())
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=DUMP_URL,
+        status_code=200,
+        content=data,
+    )
+    corrupt = bytearray(data)
+    corrupt[-8] ^= 0xFF  # Break the CRC
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=DUMP_URL,
+        status_code=200,
+        content=bytes(corrupt),
+    )
+    client = enhetsregisteret.Client()
+    client.save_dump("enheter", tmp_path)
+
+    with pytest.raises(BrregError, match="Corrupt download"):
+        client.save_dump("enheter", tmp_path)
+
+    assert (tmp_path / "enheter.json.gz").read_bytes() == data
+    assert not (tmp_path / "enheter.json.gz.part").exists()
+
+
+@pytest.mark.parametrize("content", [b"<html>Bad gateway</html>", b""])
+def test_save_dump_keeps_previous_copy_if_download_is_not_gzip(
+    httpx_mock: HTTPXMock,
+    tmp_path: Path,
+    content: bytes,
+) -> None:
+    data = gzip.compress(enheter_dump())
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=DUMP_URL,
+        status_code=200,
+        content=data,
+    )
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=DUMP_URL,
+        status_code=200,
+        content=content,
+    )
+    client = enhetsregisteret.Client()
+    client.save_dump("enheter", tmp_path)
+
+    with pytest.raises(BrregError, match="not gzip data"):
+        client.save_dump("enheter", tmp_path)
+
+    assert (tmp_path / "enheter.json.gz").read_bytes() == data
+    assert not (tmp_path / "enheter.json.gz.part").exists()
+
+
+def test_save_dump_with_incomplete_download(
+    httpx_mock: HTTPXMock,
+    tmp_path: Path,
+) -> None:
+    data = gzip.compress(enheter_dump())
+    write_partial_dump(tmp_path, data[:100])
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=DUMP_URL,
+        status_code=206,
+        headers={"content-range": f"bytes 100-{len(data) - 1}/{len(data) + 10}"},
+        content=data[100:],
+    )
+
+    with pytest.raises(BrregError, match="Incomplete download"):
+        enhetsregisteret.Client().save_dump("enheter", tmp_path)
+
+
+def test_save_dump_when_server_error(httpx_mock: HTTPXMock, tmp_path: Path) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/underenheter/lastned/csv",
+        status_code=500,
+    )
+
+    with pytest.raises(BrregRestError):
+        enhetsregisteret.Client().save_dump("underenheter", tmp_path, file_format="csv")
+
+
+def test_save_dump_without_validators_or_content_length(
+    httpx_mock: HTTPXMock,
+    tmp_path: Path,
+) -> None:
+    data = gzip.compress(enheter_dump())
+    # Without a validator, the partial download cannot be resumed safely.
+    (tmp_path / "enheter.json.gz.part").write_bytes(data[:100])
+    (tmp_path / "enheter.json.gz.part.meta.json").write_text("{}")
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=DUMP_URL,
+        status_code=200,
+        stream=IteratorStream(chunked(data, 100)),
+    )
+
+    dump = enhetsregisteret.Client().save_dump("enheter", tmp_path)
+
+    request = httpx_mock.get_request()  # pyright: ignore[reportUnknownMemberType]
+    assert request is not None
+    assert "range" not in request.headers
+    assert dump.path.read_bytes() == data
+    assert (dump.etag, dump.last_modified) == (None, None)
+
+
+def test_read_underenheter(tmp_path: Path) -> None:
+    page = json.loads((DATA_DIR / "underenheter-search-response.json").read_bytes())
+    path = tmp_path / "underenheter.json"
+    path.write_text(json.dumps(page["_embedded"]["underenheter"]))
+
+    underenheter = list(enhetsregisteret.read_underenheter(path))
+
+    assert [u.organisasjonsnummer for u in underenheter] == ["334455660"]
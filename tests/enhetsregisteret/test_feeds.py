@@ -0,0 +1,222 @@
+import datetime as dt
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+from pytest_httpx2 import HTTPXMock
+
+from brreg import BrregError, enhetsregisteret
+from brreg.enhetsregisteret import (
+    Checkpoint,
+    FileCheckpoint,
+    OppdateringQuery,
+)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+SINCE = dt.datetime(2024, 1, 2, tzinfo=dt.timezone.utc)
+OPPDATERINGER_URL = "https://data.brreg.no/enhetsregisteret/api/oppdateringer/enheter"
+
+
+def add_feed_responses(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=f"{OPPDATERINGER_URL}?size=3&dato=2024-01-02T00%3A00%3A00Z",
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "oppdateringer-enheter-response.json").read_bytes(),
+    )
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=(
+            "https://data.brreg.no/enhetsregisteret/api/enheter"
+            "?organisasjonsnummer=976030788%2C971497017&size=2"
+        ),
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(
+            DATA_DIR / "enheter-search-organisasjonsnummer-response.json"
+        ).read_bytes(),
+    )
+    # The feed has no updates after the first batch:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=f"{OPPDATERINGER_URL}?size=3&oppdateringsid=21866461",
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "enheter-search-empty-response.json").read_bytes(),
+    )
+
+
+def test_search_enhet_oppdateringer(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=f"{OPPDATERINGER_URL}?size=3&dato=2024-01-02T00%3A00%3A00Z",
+        match_headers={
+            "accept": (
+                "application/vnd.brreg.enhetsregisteret.oppdatering.enhet.v1+json"
+                ";charset=UTF-8"
+            ),
+        },
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "oppdateringer-enheter-response.json").read_bytes(),
+    )
+
+    cursor = enhetsregisteret.Client().search_enhet_oppdateringer(
+        OppdateringQuery(dato=SINCE, size=3),
+    )
+
+    page = cursor.get_page(0)
+    assert page is not None
+    assert page.total_elements == 4
+    oppdatering = page.items[0]
+    assert oppdatering.oppdateringsid == 21866451
+    assert oppdatering.organisasjonsnummer == "976030788"
+    assert oppdatering.endringstype == "Ny"
+    assert oppdatering.dato == dt.datetime(
+        2024, 1, 2, 5, 1, 13, 431000, dt.timezone.utc
+    )
+
+
+def test_iter_enhet_changes(httpx_mock: HTTPXMock, tmp_path: Path) -> None:
+    add_feed_responses(httpx_mock)
+    checkpoint = FileCheckpoint(tmp_path / "enheter.checkpoint")
+
+    events = list(
+        enhetsregisteret.Client().iter_enhet_changes(
+            checkpoint,
+            since=SINCE,
+            batch_size=3,
+        )
+    )
+
+    assert [(e.change_type, e.organisasjonsnummer) for e in events] == [
+        ("created", "976030788"),
+        ("updated", "971497017"),
+        ("deleted", "123456789"),
+    ]
+    assert events[0].entity is not None
+    assert events[0].entity.navn == "SESAM AS"
+    assert events[1].entity is not None
+    assert events[1].entity.navn == "SESAM FAMILIEBARNEHAGE"
+    # Deleted entities are not fetched:
+    assert events[2].entity is None
+    assert events[2].oppdateringsid == 21866460
+    assert checkpoint.load() == 21866460
+    assert checkpoint.path.read_text() == "21866460\n"
+
+
+def test_checkpoint_is_saved_when_batch_is_consumed(
+    httpx_mock: HTTPXMock,
+    tmp_path: Path,
+) -> None:
+    add_feed_responses(httpx_mock)
+    checkpoint = FileCheckpoint(tmp_path / "enheter.checkpoint")
+    changes = enhetsregisteret.Client().iter_enhet_changes(
+        checkpoint,
+        since=SINCE,
+        batch_size=3,
+    )
+
+    for _ in range(3):
+        next(changes)
+    # A restart would deliver the whole batch again:
+    assert checkpoint.load() is None
+
+    assert next(changes, None) is None
+    assert checkpoint.load() == 21866460
+
+
+def test_iter_underenhet_changes_resumes_from_checkpoint(
+    httpx_mock: HTTPXMock,
+) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=(
+            "https://data.brreg.no/enhetsregisteret/api/oppdateringer/underenheter"
+            "?size=100&oppdateringsid=19076321"
+        ),
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "oppdateringer-underenheter-response.json").read_bytes(),
+    )
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=(
+            "https://data.brreg.no/enhetsregisteret/api/underenheter"
+            "?organisasjonsnummer=334455660&size=1"
+        ),
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "underenheter-search-response.json").read_bytes(),
+    )
+    checkpoint = Checkpoint(19076320)
+
+    events = list(enhetsregisteret.Client().iter_underenhet_changes(checkpoint))
+
+    # Updates of unknown type are reported as updates:
+    assert [(e.change_type, e.organisasjonsnummer) for e in events] == [
+        ("updated", "334455660"),
+    ]
+    assert events[0].entity is not None
+    assert checkpoint.load() == 19076321
+
+
+def test_iter_changes_requires_a_starting_point() -> None:
+    client = enhetsregisteret.Client()
+
+    # Raised when called, not when the iteration starts:
+    with pytest.raises(ValueError, match="since is required"):
+        client.iter_enhet_changes(Checkpoint())
+    with pytest.raises(ValueError, match="since is required"):
+        client.iter_underenhet_changes(Checkpoint())
+
+
+def test_iter_changes_checks_batch_size() -> None:
+    with pytest.raises(ValidationError):
+        enhetsregisteret.Client().iter_enhet_changes(Checkpoint(1), batch_size=0)
+
+
+def test_file_checkpoint_with_invalid_content(tmp_path: Path) -> None:
+    path = tmp_path / "enheter.checkpoint"
+    path.write_text("garbage")
+
+    with pytest.raises(BrregError, match="Invalid checkpoint"):
+        FileCheckpoint(path).load()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_search_oppdateringer(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=f"{OPPDATERINGER_URL}?oppdateringsid=21866451",
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "oppdateringer-enheter-response.json").read_bytes(),
+    )
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=(
+            "https://data.brreg.no/enhetsregisteret/api/oppdateringer/underenheter"
+            "?oppdateringsid=19076321"
+        ),
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "oppdateringer-underenheter-response.json").read_bytes(),
+    )
+    query = OppdateringQuery(oppdateringsid=21866451)
+
+    async with enhetsregisteret.AsyncClient() as client:
+        enheter = await client.search_enhet_oppdateringer(query)
+        underenheter = await client.search_underenhet_oppdateringer(
+            OppdateringQuery(oppdateringsid=19076321),
+        )
+        enhet_page = await enheter.get_page(0)
+        underenhet_page = await underenheter.get_page(0)
+
+    assert enhet_page is not None
+    assert len(enhet_page.items) == 3
+    assert underenhet_page is not None
+    assert [o.organisasjonsnummer for o in underenhet_page.items] == ["334455660"]
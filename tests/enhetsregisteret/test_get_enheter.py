@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import pytest
+from pytest_httpx2 import HTTPXMock
+
+from brreg import enhetsregisteret
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+def test_get_enheter(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=(
+            "https://data.brreg.no/enhetsregisteret/api/enheter"
+            "?organisasjonsnummer=818511752%2C976030788%2C971497017"
+            "&size=3"
+        ),
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(
+            DATA_DIR / "enheter-search-organisasjonsnummer-response.json"
+        ).read_bytes(),
+    )
+
+    result = enhetsregisteret.Client().get_enheter(
+        ["818511752", "976 030 788", "971497017", "976030788"],
+    )
+
+    assert len(httpx_mock.get_requests()) == 1  # pyright: ignore[reportUnknownMemberType]
+
+    # Duplicates are looked up once, and the input order is kept:
+    assert list(result) == ["818511752", "976030788", "971497017"]
+    assert result["818511752"] is None
+    enhet = result["976030788"]
+    assert enhet is not None
+    assert enhet.navn == "SESAM AS"
+    enhet = result["971497017"]
+    assert enhet is not None
+    assert enhet.navn == "SESAM FAMILIEBARNEHAGE"
+
+
+def test_get_enheter_in_batches(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=(
+            "https://data.brreg.no/enhetsregisteret/api/enheter"
+            "?organisasjonsnummer=976030788%2C971497017"
+            "&size=2"
+        ),
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(
+            DATA_DIR / "enheter-search-organisasjonsnummer-response.json"
+        ).read_bytes(),
+    )
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=(
+            "https://data.brreg.no/enhetsregisteret/api/enheter"
+            "?organisasjonsnummer=818511752"
+            "&size=1"
+        ),
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "enheter-search-empty-response.json").read_bytes(),
+    )
+
+    result = enhetsregisteret.Client().get_enheter(
+        ["976030788", "971497017", "818511752"],
+        batch_size=2,
+    )
+
+    assert len(httpx_mock.get_requests()) == 2  # pyright: ignore[reportUnknownMemberType]
+    assert {orgnr: enhet is not None for orgnr, enhet in result.items()} == {
+        "976030788": True,
+        "971497017": True,
+        "818511752": False,
+    }
+
+
+def test_get_enheter_with_no_input() -> None:
+    assert enhetsregisteret.Client().get_enheter([]) == {}
+
+
+@pytest.mark.parametrize("batch_size", [0, 101])
+def test_get_enheter_with_invalid_batch_size(batch_size: int) -> None:
+    with pytest.raises(ValueError, match="batch_size must be between 1 and 100"):
+        enhetsregisteret.Client().get_enheter(["976030788"], batch_size=batch_size)
+
+
+def test_get_underenheter(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=(
+            "https://data.brreg.no/enhetsregisteret/api/underenheter"
+            "?organisasjonsnummer=334455660%2C818511752"
+            "&size=2"
+        ),
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "underenheter-search-response.json").read_bytes(),
+    )
+
+    result = enhetsregisteret.Client().get_underenheter(["334455660", "818511752"])
+
+    underenhet = result["334455660"]
+    assert underenhet is not None
+    assert underenhet.organisasjonsnummer == "334455660"
+    assert result["818511752"] is None
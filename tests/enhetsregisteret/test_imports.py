@@ -0,0 +1,63 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import brreg
+from brreg import enhetsregisteret
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Looks up an enhet in a fresh interpreter, and prints the models that were
+# built along the way.
+GET_ENHET = """
+import sys
+
+import httpx2
+from pydantic import BaseModel
+
+from brreg.enhetsregisteret import Client, _pagination, _queries, _responses
+
+content = open(sys.argv[1], "rb").read()
+transport = httpx2.MockTransport(lambda _: httpx2.Response(200, content=content))
+Client(transport=transport).get_enhet("112233445")
+
+for module in (_pagination, _queries, _responses):
+    for name, value in vars(module).items():
+        if (
+            isinstance(value, type)
+            and issubclass(value, BaseModel)
+            and value is not BaseModel
+            and value.__pydantic_complete__
+        ):
+            print(name)
+"""
+
+
+def test_lazy_exports() -> None:
+    assert set(enhetsregisteret.__all__) <= set(dir(enhetsregisteret))
+    assert enhetsregisteret.Client is enhetsregisteret._client.Client  # noqa: SLF001
+
+
+@pytest.mark.parametrize("module", [brreg, enhetsregisteret])
+def test_unknown_attribute(module: object) -> None:
+    with pytest.raises(AttributeError, match="has no attribute 'foo'"):
+        getattr(module, "foo")  # noqa: B009
+
+
+def test_get_enhet_only_builds_the_models_it_uses() -> None:
+    result = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            GET_ENHET,
+            str(DATA_DIR / "enheter-details-response.json"),
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    # Pydantic always builds generic models, like Page, on import.
+    assert set(result.stdout.split()) - {"Page"} == {"Enhet"}
@@ -0,0 +1,245 @@
+from pathlib import Path
+
+import httpx2
+import pytest
+from pytest_httpx2 import HTTPXMock
+
+from brreg import BrregRestError
+from brreg.enhetsregisteret import (
+    AsyncClient,
+    Client,
+    EnhetQuery,
+    Histogram,
+    MemoryCache,
+    RequestEvent,
+    RequestStats,
+    RetryPolicy,
+)
+from brreg.enhetsregisteret._instrumentation import Observation
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+BASE_URL = "https://data.brreg.no/enhetsregisteret/api"
+ENHET_URL = f"{BASE_URL}/enheter/112233445"
+
+
+def add_enhet(httpx_mock: HTTPXMock, status_code: int = 200) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=ENHET_URL,
+        status_code=status_code,
+        content=(DATA_DIR / "enheter-details-response.json").read_bytes(),
+    )
+
+
+def add_search_pages(httpx_mock: HTTPXMock) -> None:
+    for query, filename in [
+        ("navn=Sesam&size=2", "enheter-search-page1-response.json"),
+        ("navn=Sesam&page=1&size=2", "enheter-search-page2-response.json"),
+        ("navn=Sesam&size=1", "enheter-search-response.json"),
+    ]:
+        httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+            method="GET",
+            url=f"{BASE_URL}/enheter?{query}",
+            status_code=200,
+            content=(DATA_DIR / filename).read_bytes(),
+        )
+
+
+def event(**kwargs: object) -> RequestEvent:
+    values: dict[str, object] = {
+        "endpoint": "enhet",
+        "target": "112233445",
+        "status_code": 200,
+        "bytes_received": 100,
+        "connect_time": None,
+        "ttfb": None,
+        "total_time": 0.02,
+        "parse_time": 0.001,
+        "cache": None,
+        "retries": 0,
+        "error": None,
+    }
+    return RequestEvent(**{**values, **kwargs})  # type: ignore[arg-type]
+
+
+def test_lookup_event(httpx_mock: HTTPXMock) -> None:
+    add_enhet(httpx_mock)
+    events: list[RequestEvent] = []
+
+    Client(on_request=events.append).get_enhet("112233445")
+
+    (lookup,) = events
+    assert lookup.endpoint == "enhet"
+    assert lookup.target == "112233445"
+    assert lookup.status_code == 200
+    assert lookup.bytes_received == len(
+        (DATA_DIR / "enheter-details-response.json").read_bytes()
+    )
+    assert lookup.total_time > 0
+    assert lookup.parse_time is not None
+    assert lookup.cache is None
+    assert lookup.retries == 0
+    assert lookup.error is None
+
+
+def test_cached_lookup_events(httpx_mock: HTTPXMock) -> None:
+    add_enhet(httpx_mock)
+    events: list[RequestEvent] = []
+    client = Client(cache=MemoryCache(), on_request=events.append)
+
+    client.get_enhet("112233445")
+    client.get_enhet("112233445")
+
+    assert [(e.cache, e.status_code) for e in events] == [("miss", 200), ("hit", None)]
+    assert events[1].parse_time is not None
+
+
+def test_search_events(httpx_mock: HTTPXMock) -> None:
+    add_search_pages(httpx_mock)
+    events: list[RequestEvent] = []
+
+    client = Client(on_request=events.append)
+    cursor = client.search_enhet(EnhetQuery(navn="Sesam", size=2))
+    list(cursor.items)
+    client.count_enheter(EnhetQuery(navn="Sesam"))
+
+    assert [(e.endpoint, e.target) for e in events] == [
+        ("search_enhet", "size=2&navn=Sesam"),
+        ("search_enhet", "size=2&page=1&navn=Sesam"),
+        ("count_enheter", "size=1&navn=Sesam"),
+    ]
+    assert all(e.parse_time is not None for e in events)
+
+
+def test_error_events(
+    httpx_mock: HTTPXMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("brreg.enhetsregisteret._retry.time.sleep", lambda _: None)
+    for _ in range(3):
+        add_enhet(httpx_mock, status_code=503)
+    httpx_mock.add_exception(httpx2.ConnectError("Connection refused"))  # pyright: ignore[reportUnknownMemberType]
+    events: list[RequestEvent] = []
+    client = Client(retry=RetryPolicy(max_retries=2), on_request=events.append)
+
+    with pytest.raises(BrregRestError):
+        client.get_enhet("112233445")
+    with pytest.raises(BrregRestError):
+        Client(on_request=events.append).get_enhet("112233445")
+
+    failed, refused = events
+    assert failed.status_code == 503
+    assert failed.retries == 2
+    assert isinstance(failed.error, BrregRestError)
+    assert failed.parse_time is None
+    assert refused.status_code is None
+    assert isinstance(refused.error, BrregRestError)
+
+
+def test_trace() -> None:
+    observation = Observation("enhet", "112233445")
+
+    for name in [
+        "connection.connect_tcp.started",
+        "connection.connect_tcp.complete",
+        "connection.start_tls.started",
+        "connection.start_tls.complete",
+        "http11.send_request_headers.started",
+        "http11.receive_response_headers.complete",
+    ]:
+        observation.trace(name, {})
+
+    lookup = observation.event(None)
+    assert lookup.connect_time is not None
+    assert lookup.ttfb is not None
+    assert lookup.ttfb >= lookup.connect_time
+
+
+def test_request_stats() -> None:
+    stats = RequestStats(buckets=(0.01, 0.1, 1.0))
+
+    stats(event(total_time=0.005))
+    stats(event(total_time=0.05, cache="miss", retries=2))
+    stats(event(total_time=0.05, cache="hit", parse_time=None, bytes_received=0))
+    stats(event(total_time=5.0, error=ValueError("Boom")))
+    stats(event(endpoint="search_enhet"))
+
+    snapshot = stats.snapshot()
+    enhet = snapshot["enhet"]
+    assert enhet.requests == 4
+    assert enhet.errors == 1
+    assert enhet.cache_hits == 1
+    assert enhet.cache_misses == 1
+    assert enhet.retries == 2
+    assert enhet.bytes_received == 300
+    assert enhet.latency.counts == [1, 2, 0, 1]
+    assert enhet.latency.quantile(0.5) == 0.1
+    assert enhet.latency.quantile(1) == float("inf")
+    assert enhet.latency.mean == pytest.approx(5.105 / 4)
+    assert enhet.parse_time.count == 3
+    assert snapshot["search_enhet"].requests == 1
+
+    # The snapshot is a copy.
+    stats(event())
+    assert enhet.requests == 4
+    assert stats.snapshot(reset=True)["enhet"].requests == 5
+    assert stats.snapshot() == {}
+
+
+def test_histogram() -> None:
+    histogram = Histogram.empty((1.0, 2.0))
+
+    assert histogram.mean is None
+    assert histogram.quantile(0.5) is None
+    with pytest.raises(ValueError, match="q must be between 0 and 1"):
+        histogram.quantile(1.5)
+
+
+def test_invalid_buckets() -> None:
+    with pytest.raises(ValueError, match="strictly increasing"):
+        RequestStats(buckets=(1.0, 0.5))
+
+
+def test_client_with_request_stats(httpx_mock: HTTPXMock) -> None:
+    add_enhet(httpx_mock)
+    stats = RequestStats()
+
+    Client(on_request=stats).get_enhet("112233445")
+
+    assert stats.snapshot()["enhet"].latency.count == 1
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_events(httpx_mock: HTTPXMock) -> None:
+    add_enhet(httpx_mock)
+    add_search_pages(httpx_mock)
+    events: list[RequestEvent] = []
+
+    async with AsyncClient(cache=MemoryCache(), on_request=events.append) as client:
+        await client.get_enhet("112233445")
+        await client.get_enhet("112233445")
+        cursor = await client.search_enhet(EnhetQuery(navn="Sesam", size=2))
+        await cursor.get_page(1)
+        await client.count_enheter(EnhetQuery(navn="Sesam", size=2))
+
+    assert [(e.endpoint, e.cache, e.status_code) for e in events] == [
+        ("enhet", "miss", 200),
+        ("enhet", "hit", None),
+        ("search_enhet", None, 200),
+        ("search_enhet", None, 200),
+        ("count_enheter", None, 200),
+    ]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_trace() -> None:
+    observation = Observation("enhet", "112233445")
+
+    await observation.atrace("connection.connect_tcp.started", {})
+    await observation.atrace("connection.connect_tcp.complete", {})
+    await observation.atrace("http2.receive_response_headers.complete", {})
+
+    assert observation.connect_time is not None
+    assert observation.ttfb is not None
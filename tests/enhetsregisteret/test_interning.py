@@ -0,0 +1,137 @@
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+from pytest_httpx2 import HTTPXMock
+
+from brreg.enhetsregisteret import (
+    AsyncClient,
+    Client,
+    Enhet,
+    EnhetQuery,
+    Interner,
+    read_enheter,
+)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+BASE_URL = "https://data.brreg.no/enhetsregisteret/api"
+
+
+def add_fixture(httpx_mock: HTTPXMock, url: str, filename: str) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=f"{BASE_URL}{url}",
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / filename).read_bytes(),
+        is_reusable=True,
+    )
+
+
+def test_lookups_share_values(httpx_mock: HTTPXMock) -> None:
+    add_fixture(httpx_mock, "/enheter/112233445", "enheter-details-response.json")
+    interner = Interner()
+    client = Client(interner=interner)
+
+    first = client.get_enhet("112233445")
+    second = client.get_enhet("112233445")
+
+    assert client.interner is interner
+    assert first is not None
+    assert second is not None
+    assert first is not second
+    assert first == second
+    assert first.organisasjonsform is second.organisasjonsform
+    assert first.naeringskode1 is second.naeringskode1
+    assert first.postadresse is not None
+    assert second.postadresse is not None
+    assert first.postadresse is not second.postadresse
+    assert first.postadresse.poststed is second.postadresse.poststed
+    assert first.postadresse.kommune is second.postadresse.kommune
+
+
+def test_search_pages_share_values(httpx_mock: HTTPXMock) -> None:
+    add_fixture(httpx_mock, "/enheter?size=2", "enheter-search-page1-response.json")
+    add_fixture(
+        httpx_mock,
+        "/enheter?size=2&page=1",
+        "enheter-search-page2-response.json",
+    )
+    client = Client(interner=Interner())
+
+    enheter = list(client.search_enhet(EnhetQuery(size=2)).items)
+
+    assert [e.organisasjonsform.kode for e in enheter] == ["AS", "FLI", "FLI"]
+    assert enheter[1].organisasjonsform is enheter[2].organisasjonsform
+
+
+def test_roller_share_values(httpx_mock: HTTPXMock) -> None:
+    add_fixture(
+        httpx_mock,
+        "/enheter/810004622/roller",
+        "enheter-roller-enhet-response.json",
+    )
+    client = Client(interner=Interner())
+
+    first = client.get_roller("810004622")
+    second = client.get_roller("810004622")
+
+    first_enhet = first[0].roller[0].enhet
+    second_enhet = second[0].roller[0].enhet
+    assert first_enhet is not None
+    assert second_enhet is not None
+    assert first_enhet.organisasjonsform is second_enhet.organisasjonsform
+
+
+def test_read_enheter_shares_values(tmp_path: Path) -> None:
+    enhet = json.loads((DATA_DIR / "enheter-details-response.json").read_bytes())
+    path = tmp_path / "enheter.json.gz"
+    path.write_bytes(gzip.compress(json.dumps([enhet, enhet]).encode()))
+    interner = Interner()
+
+    first, second = read_enheter(path, interner=interner)
+
+    assert first.organisasjonsform is second.organisasjonsform
+    assert first.institusjonell_sektorkode is second.institusjonell_sektorkode
+    assert len(interner) > 0
+
+
+def test_missing_values_are_kept() -> None:
+    enhet = Enhet.model_validate(
+        {
+            "organisasjonsnummer": "112233445",
+            "navn": "SESAM STASJON",
+            "organisasjonsform": {"kode": "AS", "beskrivelse": "Aksjeselskap"},
+            "postadresse": {"poststed": "OSLO"},
+        },
+    )
+
+    Interner().intern(enhet)
+
+    assert enhet.postadresse is not None
+    assert enhet.postadresse.poststed == "OSLO"
+    assert enhet.postadresse.kommune is None
+    assert enhet.naeringskode1 is None
+
+
+def test_raw_parse_mode_is_not_supported() -> None:
+    with pytest.raises(ValueError, match="parse_mode 'raw'"):
+        Client(parse_mode="raw", interner=Interner())
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_lookups_share_values(httpx_mock: HTTPXMock) -> None:
+    add_fixture(httpx_mock, "/enheter/112233445", "enheter-details-response.json")
+    interner = Interner()
+
+    async with AsyncClient(interner=interner) as client:
+        first = await client.get_enhet("112233445")
+        second = await client.get_enhet("112233445")
+
+    assert client.interner is interner
+    assert client.parse_mode == "validate"
+    assert first is not None
+    assert second is not None
+    assert first.organisasjonsform is second.organisasjonsform
@@ -0,0 +1,330 @@
+import asyncio
+import gzip
+import json
+import threading
+from pathlib import Path
+
+import httpx2
+import pytest
+from pytest_httpx2 import HTTPXMock
+
+from brreg import BrregRestError
+from brreg.enhetsregisteret import (
+    AdaptiveLimiter,
+    AsyncClient,
+    Client,
+    LimitChange,
+    RetryPolicy,
+)
+from brreg.enhetsregisteret._limiter import ReleasingStream
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+BASE_URL = "https://data.brreg.no/enhetsregisteret/api"
+ENHET_URL = f"{BASE_URL}/enheter/112233445"
+
+
+def add_enhet(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=ENHET_URL,
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "enheter-details-response.json").read_bytes(),
+    )
+
+
+def add_status(httpx_mock: HTTPXMock, status_code: int) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=ENHET_URL,
+        status_code=status_code,
+    )
+
+
+def run_request(limiter: AdaptiveLimiter, outcome: str, latency: float) -> None:
+    started = limiter.acquire()
+    limiter.release(started, outcome, latency=latency)  # type: ignore[arg-type]
+
+
+def test_limit_grows_additively() -> None:
+    changes: list[LimitChange] = []
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=3, on_change=changes.append)
+
+    for _ in range(10):
+        run_request(limiter, "ok", 0.1)
+
+    assert limiter.limit == 3
+    assert limiter.in_flight == 0
+    assert limiter.latency == pytest.approx(0.1)
+    assert changes == [LimitChange(2, 3, "increase", 0)]
+
+
+@pytest.mark.parametrize("outcome", ["rate_limited", "server_error", "error"])
+def test_limit_is_cut_multiplicatively(outcome: str) -> None:
+    changes: list[LimitChange] = []
+    limiter = AdaptiveLimiter(initial_limit=8, on_change=changes.append)
+
+    run_request(limiter, outcome, 0.1)
+
+    assert limiter.limit == 4
+    assert changes == [LimitChange(8, 4, outcome, 0)]
+
+
+def test_limit_is_cut_once_per_round() -> None:
+    limiter = AdaptiveLimiter(initial_limit=8, min_limit=3)
+    first = limiter.acquire()
+    second = limiter.acquire()
+
+    limiter.release(first, "server_error")
+    limiter.release(second, "server_error")
+    assert limiter.limit == 4
+
+    run_request(limiter, "server_error", 0.1)
+    assert limiter.limit == 3
+
+    run_request(limiter, "server_error", 0.1)
+    assert limiter.limit == 3
+
+
+def test_limit_is_cut_on_latency_spikes() -> None:
+    changes: list[LimitChange] = []
+    limiter = AdaptiveLimiter(initial_limit=8, on_change=changes.append)
+
+    run_request(limiter, "ok", 0.1)
+    run_request(limiter, "ok", 0.2)
+    run_request(limiter, "ok", 1.0)
+
+    assert limiter.limit == 4
+    assert changes[-1] == LimitChange(8, 4, "latency", 0)
+
+
+def test_cancelled_requests_leave_the_limit() -> None:
+    changes: list[LimitChange] = []
+    limiter = AdaptiveLimiter(initial_limit=2, on_change=changes.append)
+
+    for _ in range(10):
+        run_request(limiter, "cancelled", 0.1)
+
+    assert limiter.limit == 2
+    assert limiter.in_flight == 0
+    assert limiter.latency is None
+    assert changes == []
+
+
+def test_latency_can_be_ignored() -> None:
+    limiter = AdaptiveLimiter(initial_limit=8, latency_tolerance=None)
+
+    run_request(limiter, "ok", 0.1)
+    run_request(limiter, "ok", 10.0)
+
+    assert limiter.limit == 8
+
+
+def test_acquire_waits_for_a_free_slot() -> None:
+    limiter = AdaptiveLimiter(initial_limit=1, max_limit=1)
+    started = limiter.acquire()
+    acquired = threading.Event()
+
+    def worker() -> None:
+        run_request(limiter, "ok", 0.1)
+        acquired.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert not acquired.wait(0.05)
+
+    limiter.release(started, "ok")
+    thread.join()
+    assert acquired.is_set()
+
+
+def test_rate_is_limited(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleeps: list[float] = []
+    monkeypatch.setattr("brreg.enhetsregisteret._limiter.time.sleep", sleeps.append)
+    limiter = AdaptiveLimiter(rate=10, burst=2)
+
+    for _ in range(4):
+        run_request(limiter, "ok", 0.1)
+
+    assert len(sleeps) == 2
+    assert sleeps[0] == pytest.approx(0.1, abs=0.01)
+    assert sleeps[1] == pytest.approx(0.2, abs=0.01)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"min_limit": 0},
+        {"initial_limit": 100},
+        {"min_limit": 8, "initial_limit": 4},
+        {"backoff_ratio": 1},
+        {"rate": 0},
+    ],
+)
+def test_invalid_limiter(kwargs: dict[str, float]) -> None:
+    with pytest.raises(ValueError, match="must"):
+        AdaptiveLimiter(**kwargs)  # type: ignore[arg-type]
+
+
+def test_stream_is_released_once() -> None:
+    releases: list[None] = []
+    stream = ReleasingStream(
+        httpx2.ByteStream(b""),
+        lambda: releases.append(None),
+    )
+
+    stream.close()
+    stream.close()
+
+    assert releases == [None]
+
+
+def test_client_reports_outcomes(httpx_mock: HTTPXMock) -> None:
+    add_enhet(httpx_mock)
+    add_status(httpx_mock, 429)
+    httpx_mock.add_exception(httpx2.ConnectError("Connection refused"))  # pyright: ignore[reportUnknownMemberType]
+    httpx_mock.add_exception(httpx2.UnsupportedProtocol("Bad URL"))  # pyright: ignore[reportUnknownMemberType]
+    changes: list[LimitChange] = []
+    limiter = AdaptiveLimiter(initial_limit=8, on_change=changes.append)
+
+    with Client(limiter=limiter) as client:
+        assert client.get_enhet("112233445") is not None
+        for _ in range(3):
+            with pytest.raises(BrregRestError):
+                client.get_enhet("112233445")
+
+    assert limiter.in_flight == 0
+    assert limiter.latency is not None
+    assert [change.reason for change in changes] == ["rate_limited", "error"]
+    assert limiter.limit == 2
+
+
+def test_unexpected_errors_do_not_grow_the_limit(httpx_mock: HTTPXMock) -> None:
+    for _ in range(10):
+        httpx_mock.add_exception(httpx2.UnsupportedProtocol("Bad URL"))  # pyright: ignore[reportUnknownMemberType]
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=3)
+
+    with Client(limiter=limiter) as client:
+        for _ in range(10):
+            with pytest.raises(BrregRestError):
+                client.get_enhet("112233445")
+
+    assert limiter.limit == 2
+    assert limiter.in_flight == 0
+
+
+def test_client_with_limiter_and_retries(
+    httpx_mock: HTTPXMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("brreg.enhetsregisteret._retry.time.sleep", lambda _: None)
+    add_status(httpx_mock, 503)
+    add_enhet(httpx_mock)
+    limiter = AdaptiveLimiter(initial_limit=8)
+
+    client = Client(limiter=limiter, retry=RetryPolicy())
+
+    assert client.get_enhet("112233445") is not None
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+def test_streamed_download_holds_its_slot(httpx_mock: HTTPXMock) -> None:
+    page = json.loads((DATA_DIR / "enheter-search-response.json").read_bytes())
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=f"{BASE_URL}/enheter/lastned",
+        status_code=200,
+        content=gzip.compress(json.dumps(page["_embedded"]["enheter"]).encode()),
+    )
+    limiter = AdaptiveLimiter()
+
+    enheter = Client(limiter=limiter).download_enheter()
+
+    assert next(enheter).organisasjonsnummer == "112233445"
+    assert limiter.in_flight == 1
+    assert list(enheter) == []
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_client_reports_outcomes(httpx_mock: HTTPXMock) -> None:
+    add_enhet(httpx_mock)
+    add_status(httpx_mock, 502)
+    httpx_mock.add_exception(httpx2.ReadTimeout("Timed out"))  # pyright: ignore[reportUnknownMemberType]
+    httpx_mock.add_exception(httpx2.UnsupportedProtocol("Bad URL"))  # pyright: ignore[reportUnknownMemberType]
+    changes: list[LimitChange] = []
+    limiter = AdaptiveLimiter(initial_limit=8, on_change=changes.append)
+
+    async with AsyncClient(limiter=limiter) as client:
+        assert await client.get_enhet("112233445") is not None
+        for _ in range(3):
+            with pytest.raises(BrregRestError):
+                await client.get_enhet("112233445")
+
+    assert limiter.in_flight == 0
+    assert [change.reason for change in changes] == ["server_error", "error"]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_cancelled_request_does_not_grow_the_limit() -> None:
+    started = asyncio.Event()
+
+    async def hang(_: httpx2.Request) -> httpx2.Response:
+        started.set()
+        await asyncio.Event().wait()
+        raise AssertionError  # pragma: no cover
+
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=3)
+    async with AsyncClient(
+        limiter=limiter, transport=httpx2.MockTransport(hang)
+    ) as client:
+        for _ in range(10):
+            started.clear()
+            task = asyncio.create_task(client.get_enhet("112233445"))
+            await started.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    assert limiter.limit == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_acquire_waits_for_a_free_slot() -> None:
+    limiter = AdaptiveLimiter(initial_limit=1, max_limit=1)
+    started = await limiter.acquire_async()
+
+    waiting = asyncio.ensure_future(limiter.acquire_async())
+    cancelled = asyncio.ensure_future(limiter.acquire_async())
+    await asyncio.sleep(0)
+    assert not waiting.done()
+
+    cancelled.cancel()
+    limiter.release(started, "ok")
+    limiter.release(await waiting, "ok")
+
+    assert limiter.in_flight == 0
+    assert cancelled.cancelled()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_rate_is_limited(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleeps: list[float] = []
+
+    async def sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    monkeypatch.setattr("brreg.enhetsregisteret._limiter.asyncio.sleep", sleep)
+    limiter = AdaptiveLimiter(rate=5, burst=1)
+
+    for _ in range(2):
+        limiter.release(await limiter.acquire_async(), "ok")
+
+    assert len(sleeps) == 1
+    assert sleeps[0] == pytest.approx(0.2, abs=0.01)
@@ -0,0 +1,264 @@
+import datetime as dt
+import gzip
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+from pytest_httpx2 import HTTPXMock
+
+from brreg import BrregRestError, enhetsregisteret
+from brreg.enhetsregisteret import DumpFile, Enhet, Mirror, Underenhet
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+SNAPSHOT_AT = dt.datetime(2024, 1, 2, tzinfo=dt.timezone.utc)
+
+
+def load_enheter() -> list[Enhet]:
+    page = json.loads((DATA_DIR / "enheter-search-page1-response.json").read_bytes())
+    return [
+        Enhet.model_validate(data)
+        for data in page["_embedded"]["enheter"]
+        + [
+            json.loads(
+                (DATA_DIR / "enheter-details-deleted-response.json").read_bytes()
+            )
+        ]
+    ]
+
+
+def load_underenheter() -> list[Underenhet]:
+    data = json.loads((DATA_DIR / "underenheter-search-response.json").read_bytes())
+    return [Underenhet.model_validate(u) for u in data["_embedded"]["underenheter"]]
+
+
+@pytest.fixture
+def mirror(tmp_path: Path) -> Mirror:
+    return Mirror(tmp_path / "mirror.sqlite3")
+
+
+def test_get_enhet_from_mirror(mirror: Mirror) -> None:
+    enheter = load_enheter()
+
+    assert mirror.load("enheter", enheter, snapshot_at=SNAPSHOT_AT) == 3
+
+    assert mirror.get_enhet("976 030 788") == enheter[0]
+    assert mirror.get_enhet("112233445") is None
+    assert mirror.get_underenhet("976030788") is None
+    status = mirror.status("enheter")
+    assert status.entities == 3
+    assert status.snapshot_at == SNAPSHOT_AT
+    assert status.oppdateringsid is None
+    assert status.up_to == SNAPSHOT_AT
+    assert status.synced_at is None
+    assert mirror.status("underenheter").entities == 0
+    mirror.close()
+
+
+def test_mirror_is_shared_between_instances(tmp_path: Path) -> None:
+    mirror1 = Mirror(tmp_path / "mirror.sqlite3")
+    mirror1.load("underenheter", load_underenheter(), snapshot_at=SNAPSHOT_AT)
+
+    mirror2 = Mirror(tmp_path / "mirror.sqlite3")
+
+    underenhet = mirror2.get_underenhet("334455660")
+    assert underenhet is not None
+    assert underenhet == load_underenheter()[0]
+    mirror1.close()
+    mirror2.close()
+
+
+def test_reload_frees_pages(mirror: Mirror) -> None:
+    enhet = load_enheter()[0]
+    enheter = [
+        enhet.model_copy(update={"organisasjonsnummer": f"{i:09}", "navn": "x" * 1000})
+        for i in range(1000)
+    ]
+    mirror.load("enheter", enheter, snapshot_at=SNAPSHOT_AT)
+    conn = sqlite3.connect(mirror.path)
+    (page_count,) = conn.execute("PRAGMA page_count").fetchone()
+
+    mirror.load("enheter", [enhet], snapshot_at=SNAPSHOT_AT)
+
+    assert conn.execute("PRAGMA page_count").fetchone()[0] < page_count / 10
+    assert conn.execute("PRAGMA freelist_count").fetchone() == (0,)
+    conn.close()
+    mirror.close()
+
+
+def test_mirror_closes_its_own_client(tmp_path: Path) -> None:
+    with Mirror(tmp_path / "mirror.sqlite3") as mirror:
+        pass
+
+    assert mirror.client._client.is_closed  # noqa: SLF001
+
+
+def test_mirror_leaves_given_client_open(tmp_path: Path) -> None:
+    client = enhetsregisteret.Client()
+
+    Mirror(tmp_path / "mirror.sqlite3", client=client).close()
+
+    assert not client._client.is_closed  # noqa: SLF001
+    client.close()
+
+
+def test_mirror_falls_back_to_client(httpx_mock: HTTPXMock, tmp_path: Path) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/underenheter/776655441",
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "underenheter-details-response.json").read_bytes(),
+    )
+    mirror = Mirror(tmp_path / "mirror.sqlite3", fallback=True)
+
+    underenhet = mirror.get_underenhet("776655441")
+
+    assert underenhet is not None
+    assert underenhet.navn == "SESAM STASJON"
+
+
+def test_load_dump(httpx_mock: HTTPXMock, mirror: Mirror, tmp_path: Path) -> None:
+    data = [e.model_dump(mode="json", by_alias=True) for e in load_enheter()]
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url="https://data.brreg.no/enhetsregisteret/api/enheter/lastned",
+        status_code=200,
+        headers={"last-modified": "Tue, 02 Jan 2024 05:00:00 GMT"},
+        content=gzip.compress(json.dumps(data).encode()),
+    )
+    dump = enhetsregisteret.Client().save_dump("enheter", tmp_path)
+
+    assert mirror.load_dump(dump) == 3
+
+    assert mirror.get_enhet("971497017") is not None
+    assert mirror.status("enheter").snapshot_at == dt.datetime(
+        2024, 1, 2, 5, tzinfo=dt.timezone.utc
+    )
+
+
+def test_load_dump_without_last_modified(mirror: Mirror, tmp_path: Path) -> None:
+    path = tmp_path / "underenheter.csv"
+    path.write_text(
+        "organisasjonsnummer,navn,organisasjonsform.kode,organisasjonsform.beskrivelse\n"
+        "334455660,SESAM FILIAL,BEDR,Bedrift\n"
+    )
+    dump = DumpFile(
+        dataset="underenheter",
+        file_format="csv",
+        path=path,
+        size=path.stat().st_size,
+        etag=None,
+        last_modified=None,
+        downloaded_at=SNAPSHOT_AT.timestamp(),
+        changed=True,
+    )
+
+    assert mirror.load_dump(dump) == 1
+
+    assert mirror.status("underenheter").snapshot_at == SNAPSHOT_AT
+
+
+def add_feed_responses(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=(
+            "https://data.brreg.no/enhetsregisteret/api/oppdateringer/enheter"
+            "?size=3&dato=2024-01-02T00%3A00%3A00Z"
+        ),
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "oppdateringer-enheter-response.json").read_bytes(),
+    )
+
+
+def test_sync_applies_changes(httpx_mock: HTTPXMock, mirror: Mirror) -> None:
+    add_feed_responses(httpx_mock)
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=(
+            "https://data.brreg.no/enhetsregisteret/api/enheter"
+            "?organisasjonsnummer=976030788%2C971497017&size=2"
+        ),
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(
+            DATA_DIR / "enheter-search-organisasjonsnummer-response.json"
+        ).read_bytes(),
+    )
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=(
+            "https://data.brreg.no/enhetsregisteret/api/oppdateringer/enheter"
+            "?size=3&oppdateringsid=21866461"
+        ),
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "enheter-search-empty-response.json").read_bytes(),
+    )
+    mirror.load("enheter", load_enheter()[2:], snapshot_at=SNAPSHOT_AT)
+    assert mirror.get_enhet("123456789") is not None
+
+    assert mirror.sync("enheter", batch_size=3) == 3
+
+    assert mirror.get_enhet("976030788") is not None
+    assert mirror.get_enhet("971497017") is not None
+    assert mirror.get_enhet("123456789") is None
+    status = mirror.status("enheter")
+    assert status.entities == 2
+    assert status.oppdateringsid == 21866460
+    assert status.up_to == dt.datetime(2024, 1, 2, 5, 2, 41, 2000, dt.timezone.utc)
+    assert status.synced_at is not None
+
+
+def test_sync_rolls_back_unfinished_batch(
+    httpx_mock: HTTPXMock,
+    mirror: Mirror,
+) -> None:
+    add_feed_responses(httpx_mock)
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=(
+            "https://data.brreg.no/enhetsregisteret/api/enheter"
+            "?organisasjonsnummer=976030788%2C971497017&size=2"
+        ),
+        status_code=500,
+    )
+    mirror.load("enheter", load_enheter()[2:], snapshot_at=SNAPSHOT_AT)
+
+    with pytest.raises(BrregRestError):
+        mirror.sync("enheter", batch_size=3)
+
+    assert mirror.get_enhet("123456789") is not None
+    status = mirror.status("enheter")
+    assert (status.entities, status.oppdateringsid) == (1, None)
+
+
+def test_sync_underenheter(httpx_mock: HTTPXMock, mirror: Mirror) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=(
+            "https://data.brreg.no/enhetsregisteret/api/oppdateringer/underenheter"
+            "?size=100&dato=2024-01-02T00%3A00%3A00Z"
+        ),
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "oppdateringer-underenheter-response.json").read_bytes(),
+    )
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=(
+            "https://data.brreg.no/enhetsregisteret/api/underenheter"
+            "?organisasjonsnummer=334455660&size=1"
+        ),
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "underenheter-search-response.json").read_bytes(),
+    )
+    mirror.load("underenheter", [], snapshot_at=SNAPSHOT_AT)
+
+    assert mirror.sync("underenheter") == 1
+
+    assert mirror.get_underenhet("334455660") is not None
+    assert mirror.status("underenheter").oppdateringsid == 19076321
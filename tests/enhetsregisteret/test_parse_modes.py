@@ -0,0 +1,176 @@
+import datetime as dt
+import gzip
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from pytest_httpx2 import HTTPXMock
+
+from brreg import BrregError
+from brreg.enhetsregisteret import (
+    AsyncClient,
+    Checkpoint,
+    Client,
+    Enhet,
+    EnhetQuery,
+    MemoryCache,
+    OppdateringQuery,
+    ParseMode,
+    read_underenheter,
+)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+BASE_URL = "https://data.brreg.no/enhetsregisteret/api"
+
+
+def add_response(httpx_mock: HTTPXMock, url: str, content: bytes) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=f"{BASE_URL}{url}",
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=content,
+    )
+
+
+def add_fixture(httpx_mock: HTTPXMock, url: str, filename: str) -> None:
+    add_response(httpx_mock, url, (DATA_DIR / filename).read_bytes())
+
+
+@pytest.mark.parametrize("parse_mode", ["fast", "construct"])
+def test_invalid_parse_mode(parse_mode: str) -> None:
+    with pytest.raises(ValueError, match="parse_mode must be one of"):
+        Client(parse_mode=parse_mode)  # type: ignore[arg-type]
+
+
+def test_raw_lookups(httpx_mock: HTTPXMock) -> None:
+    add_fixture(httpx_mock, "/enheter/112233445", "enheter-details-response.json")
+    add_fixture(
+        httpx_mock,
+        "/enheter/810004622/roller",
+        "enheter-roller-person-response.json",
+    )
+    client = Client(parse_mode="raw")
+
+    enhet: Any = client.get_enhet("112233445")
+    rollegrupper: Any = client.get_roller("810004622")
+
+    assert enhet == json.loads(
+        (DATA_DIR / "enheter-details-response.json").read_bytes()
+    )
+    assert rollegrupper[0]["type"]["kode"] == "STYR"
+
+
+@pytest.mark.parametrize("parse_mode", ["validate", "raw"])
+def test_search_enhet(httpx_mock: HTTPXMock, parse_mode: ParseMode) -> None:
+    add_fixture(httpx_mock, "/enheter?navn=Sesam", "enheter-search-response.json")
+
+    cursor = Client(parse_mode=parse_mode).search_enhet(EnhetQuery(navn="Sesam"))
+
+    page = cursor.get_page(0)
+    assert page is not None
+    assert page.page_size == 1
+    assert page.total_elements == 1
+    assert page.total_pages == 1
+    item: Any = page.items[0]
+    if parse_mode == "raw":
+        assert item["organisasjonsnummer"] == "112233445"
+    else:
+        assert item.organisasjonsnummer == "112233445"
+        assert item.registreringsdato_enhetsregisteret == dt.date(2017, 10, 20)
+
+
+def test_search_when_empty(httpx_mock: HTTPXMock) -> None:
+    add_fixture(httpx_mock, "/enheter?navn=x", "enheter-search-empty-response.json")
+
+    cursor = Client(parse_mode="raw").search_enhet(EnhetQuery(navn="x"))
+
+    assert list(cursor.items) == []
+
+
+def test_raw_oppdateringer(httpx_mock: HTTPXMock) -> None:
+    add_fixture(
+        httpx_mock,
+        "/oppdateringer/underenheter?oppdateringsid=1",
+        "oppdateringer-underenheter-response.json",
+    )
+
+    cursor = Client(parse_mode="raw").search_underenhet_oppdateringer(
+        OppdateringQuery(oppdateringsid=1),
+    )
+
+    (oppdatering,) = cursor.items
+    assert oppdatering["oppdateringsid"] == 19076321  # type: ignore[index]
+
+
+def test_raw_get_enheter(httpx_mock: HTTPXMock) -> None:
+    add_fixture(
+        httpx_mock,
+        "/enheter?organisasjonsnummer=112233445%2C999999999&size=2",
+        "enheter-search-response.json",
+    )
+
+    enheter: dict[str, Any] = Client(parse_mode="raw").get_enheter(
+        ["112233445", "999999999"],
+    )
+
+    assert enheter["112233445"]["navn"] == "SESAM STASJON"
+    assert enheter["999999999"] is None
+
+
+def test_raw_does_not_support_changes() -> None:
+    client = Client(parse_mode="raw")
+
+    with pytest.raises(ValueError, match="does not support parse_mode 'raw'"):
+        client.iter_enhet_changes(Checkpoint(1))
+    with pytest.raises(ValueError, match="does not support parse_mode 'raw'"):
+        client.iter_underenhet_changes(Checkpoint(1))
+
+
+def test_only_validated_objects_are_cached(httpx_mock: HTTPXMock) -> None:
+    add_fixture(httpx_mock, "/enheter/112233445", "enheter-details-response.json")
+    cache = MemoryCache()
+
+    raw: Any = Client(cache=cache, parse_mode="raw").get_enhet("112233445")
+    enhet = Client(cache=cache).get_enhet("112233445")
+
+    assert isinstance(raw, dict)
+    assert isinstance(enhet, Enhet)
+
+
+def test_raw_read_underenheter(tmp_path: Path) -> None:
+    page = json.loads((DATA_DIR / "underenheter-search-response.json").read_bytes())
+    path = tmp_path / "underenheter.json.gz"
+    path.write_bytes(
+        gzip.compress(json.dumps(page["_embedded"]["underenheter"]).encode())
+    )
+
+    (underenhet,) = read_underenheter(path, parse_mode="raw")
+
+    assert underenhet == page["_embedded"]["underenheter"][0]
+
+
+def test_raw_invalid_json(httpx_mock: HTTPXMock) -> None:
+    add_response(httpx_mock, "/enheter?navn=x", b"{")
+
+    with pytest.raises(BrregError):
+        Client(parse_mode="raw").search_enhet(EnhetQuery(navn="x"))
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_raw_get_enheter(httpx_mock: HTTPXMock) -> None:
+    add_fixture(
+        httpx_mock,
+        "/enheter?organisasjonsnummer=112233445&size=1",
+        "enheter-search-response.json",
+    )
+    add_fixture(httpx_mock, "/enheter/112233445", "enheter-details-response.json")
+
+    async with AsyncClient(parse_mode="raw", cache=MemoryCache()) as client:
+        enheter: dict[str, Any] = await client.get_enheter(["112233445"])
+        enhet: Any = await client.get_enhet("112233445")
+
+    assert enheter["112233445"]["navn"] == "SESAM STASJON"
+    assert enhet["organisasjonsnummer"] == "112233445"
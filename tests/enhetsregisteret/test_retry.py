@@ -0,0 +1,263 @@
+import datetime as dt
+import email.utils
+from pathlib import Path
+
+import httpx2
+import pytest
+from pytest_httpx2 import HTTPXMock
+
+from brreg import BrregRestError
+from brreg.enhetsregisteret import AsyncClient, Client, EnhetQuery, RetryPolicy
+from brreg.enhetsregisteret._retry import Attempts, retry_after
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+BASE_URL = "https://data.brreg.no/enhetsregisteret/api"
+ENHET_URL = f"{BASE_URL}/enheter/112233445"
+
+NO_BACKOFF = RetryPolicy(backoff=0)
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    delays: list[float] = []
+    monkeypatch.setattr("brreg.enhetsregisteret._retry.time.sleep", delays.append)
+    return delays
+
+
+def add_status(
+    httpx_mock: HTTPXMock,
+    status_code: int,
+    headers: dict[str, str] | None = None,
+    url: str = ENHET_URL,
+) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=url,
+        status_code=status_code,
+        headers=headers,
+    )
+
+
+def add_enhet(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=ENHET_URL,
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "enheter-details-response.json").read_bytes(),
+    )
+
+
+@pytest.mark.parametrize("status_code", [500, 502, 503, 504, 429])
+def test_retries_server_errors(
+    httpx_mock: HTTPXMock,
+    sleeps: list[float],
+    status_code: int,
+) -> None:
+    add_status(httpx_mock, status_code)
+    add_enhet(httpx_mock)
+
+    with Client(retry=NO_BACKOFF) as client:
+        enhet = client.get_enhet("112233445")
+
+    assert enhet is not None
+    assert enhet.navn == "SESAM STASJON"
+    assert sleeps == [0]
+
+
+def test_retries_connection_errors(httpx_mock: HTTPXMock, sleeps: list[float]) -> None:
+    httpx_mock.add_exception(httpx2.ConnectError("Connection refused"))  # pyright: ignore[reportUnknownMemberType]
+    add_enhet(httpx_mock)
+
+    enhet = Client(retry=NO_BACKOFF).get_enhet("112233445")
+
+    assert enhet is not None
+    assert len(sleeps) == 1
+
+
+def test_retries_searches(httpx_mock: HTTPXMock, sleeps: list[float]) -> None:
+    add_status(httpx_mock, 502, url=f"{BASE_URL}/enheter?navn=Sesam")
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=f"{BASE_URL}/enheter?navn=Sesam",
+        status_code=200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "enheter-search-response.json").read_bytes(),
+    )
+
+    cursor = Client(retry=NO_BACKOFF).search_enhet(EnhetQuery(navn="Sesam"))
+
+    assert [enhet.navn for enhet in cursor.items] == ["SESAM STASJON"]
+    assert len(sleeps) == 1
+
+
+def test_does_not_retry_client_errors(httpx_mock: HTTPXMock) -> None:
+    add_status(httpx_mock, 400)
+
+    with pytest.raises(BrregRestError) as exc_info:
+        Client(retry=NO_BACKOFF).get_enhet("112233445")
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.retries == 0
+
+
+def test_not_found_is_not_retried(httpx_mock: HTTPXMock) -> None:
+    add_status(httpx_mock, 404)
+
+    assert Client(retry=NO_BACKOFF).get_enhet("112233445") is None
+
+
+def test_exhausted_retries_are_reported(
+    httpx_mock: HTTPXMock,
+    sleeps: list[float],
+) -> None:
+    for _ in range(3):
+        add_status(httpx_mock, 502)
+
+    with pytest.raises(BrregRestError) as exc_info:
+        Client(retry=RetryPolicy(max_retries=2)).get_enhet("112233445")
+
+    assert exc_info.value.status_code == 502
+    assert exc_info.value.retries == 2
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 0.5
+    assert 0 <= sleeps[1] <= 1.0
+
+
+def test_exhausted_connection_retries_are_reported(
+    httpx_mock: HTTPXMock,
+    sleeps: list[float],
+) -> None:
+    for _ in range(2):
+        httpx_mock.add_exception(httpx2.ReadTimeout("Timed out"))  # pyright: ignore[reportUnknownMemberType]
+
+    with pytest.raises(BrregRestError) as exc_info:
+        Client(retry=RetryPolicy(max_retries=1, backoff=0)).get_enhet("112233445")
+
+    assert exc_info.value.status_code is None
+    assert exc_info.value.retries == 1
+    assert sleeps == [0]
+
+
+def test_honours_retry_after(httpx_mock: HTTPXMock, sleeps: list[float]) -> None:
+    add_status(httpx_mock, 429, headers={"Retry-After": "7"})
+    add_status(httpx_mock, 503, headers={"Retry-After": "2"})
+    add_enhet(httpx_mock)
+
+    enhet = Client(retry=NO_BACKOFF).get_enhet("112233445")
+
+    assert enhet is not None
+    assert sleeps == [7, 2]
+
+
+def test_total_timeout_limits_retry_after(httpx_mock: HTTPXMock) -> None:
+    add_status(httpx_mock, 503, headers={"Retry-After": "120"})
+
+    with pytest.raises(BrregRestError) as exc_info:
+        Client(retry=RetryPolicy(total_timeout=60)).get_enhet("112233445")
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.retries == 0
+
+
+def test_without_total_timeout(httpx_mock: HTTPXMock, sleeps: list[float]) -> None:
+    add_status(httpx_mock, 503, headers={"Retry-After": "120"})
+    add_enhet(httpx_mock)
+
+    policy = RetryPolicy(total_timeout=None)
+    assert Client(retry=policy).get_enhet("112233445") is not None
+
+    assert sleeps == [120]
+
+
+@pytest.mark.parametrize(
+    ("status_code", "value", "expected"),
+    [
+        (429, "3", 3.0),
+        (503, "1.5", 1.5),
+        (503, "-1", 0.0),
+        (503, "Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+        (503, "Wed, 21 Oct 2015 07:28:00 -0000", 0.0),
+        (503, "soon", None),
+        (500, "3", None),
+    ],
+)
+def test_retry_after(status_code: int, value: str, expected: float | None) -> None:
+    response = httpx2.Response(status_code, headers={"Retry-After": value})
+
+    assert retry_after(response) == expected
+
+
+def test_retry_after_in_the_future() -> None:
+    when = dt.datetime.now(tz=dt.timezone.utc) + dt.timedelta(seconds=30)
+    value = email.utils.format_datetime(when, usegmt=True)
+    response = httpx2.Response(503, headers={"Retry-After": value})
+
+    delay = retry_after(response)
+
+    assert delay is not None
+    assert 25 < delay <= 30
+
+
+def test_retry_after_missing() -> None:
+    assert retry_after(httpx2.Response(503)) is None
+
+
+def test_does_not_retry_unsafe_methods() -> None:
+    request = httpx2.Request("POST", ENHET_URL)
+    attempts = Attempts(RetryPolicy(), request)
+
+    assert attempts.next_delay(httpx2.Response(503)) is None
+    assert attempts.next_delay(None) is None
+
+
+def test_backoff_grows_up_to_max_backoff() -> None:
+    policy = RetryPolicy(backoff=1, max_backoff=5)
+
+    for retry, limit in [(0, 1), (1, 2), (2, 4), (3, 5), (10, 5)]:
+        for _ in range(20):
+            assert 0 <= policy.backoff_delay(retry) <= limit
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"max_retries": -1}, {"backoff": -1}, {"max_backoff": -1}],
+)
+def test_invalid_policy(kwargs: dict[str, float]) -> None:
+    with pytest.raises(ValueError, match="must"):
+        RetryPolicy(**kwargs)  # type: ignore[arg-type]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_retries(
+    httpx_mock: HTTPXMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    delays: list[float] = []
+
+    async def sleep(delay: float) -> None:
+        delays.append(delay)
+
+    monkeypatch.setattr("brreg.enhetsregisteret._retry.asyncio.sleep", sleep)
+    add_status(httpx_mock, 503, headers={"Retry-After": "4"})
+    httpx_mock.add_exception(httpx2.ConnectError("Connection refused"))  # pyright: ignore[reportUnknownMemberType]
+    add_enhet(httpx_mock)
+
+    async with AsyncClient(retry=RetryPolicy(max_retries=2, backoff=0)) as client:
+        enhet = await client.get_enhet("112233445")
+
+    assert enhet is not None
+    assert delays == [4, 0]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_exhausted_connection_retries(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_exception(httpx2.ConnectError("Connection refused"))  # pyright: ignore[reportUnknownMemberType]
+
+    async with AsyncClient(retry=RetryPolicy(max_retries=0)) as client:
+        with pytest.raises(BrregRestError) as exc_info:
+            await client.get_enhet("112233445")
+
+    assert exc_info.value.retries == 0
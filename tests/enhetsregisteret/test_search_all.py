@@ -0,0 +1,251 @@
+import asyncio
+import datetime as dt
+import json
+from pathlib import Path
+
+import httpx2
+import pytest
+
+from brreg import BrregError
+from brreg.enhetsregisteret import AsyncClient, Client, EnhetQuery, UnderenhetQuery
+from brreg.enhetsregisteret._partitioning import split_query
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+ENHET = json.loads((DATA_DIR / "enheter-search-response.json").read_bytes())[
+    "_embedded"
+]["enheter"][0]
+
+# The organization number, kommunenummer, and registration date of the
+# entities in the mock register.
+REGISTER = [
+    ("100000001", "0301", "2020-01-10"),
+    ("100000002", "0301", "2020-03-10"),
+    ("100000003", "0301", "2020-05-10"),
+    ("100000004", "0301", "2020-08-10"),
+    ("100000005", "0301", "2020-11-10"),
+    ("100000006", "4601", "2020-02-10"),
+    ("100000007", "5001", "2020-02-10"),
+    # An entity that moves while we search.
+    ("100000001", "5001", "2020-01-10"),
+]
+
+
+class MockApi:
+    """Mock search API that only serves the first ``window`` results."""
+
+    def __init__(self, register: list[tuple[str, str, str]], window: int) -> None:
+        self.register = register
+        self.window = window
+        self.queries: list[dict[str, str]] = []
+
+    def __call__(self, request: httpx2.Request) -> httpx2.Response:
+        params = dict(request.url.params)
+        self.queries.append(params)
+        page = int(params.get("page", "0"))
+        size = int(params.get("size", "20"))
+        if (page + 1) * size > self.window:
+            return httpx2.Response(400)
+
+        kommunenumre = params.get("kommunenummer", "").split(",")
+        fra = params.get("fraRegistreringsdatoEnhetsregisteret", "0000")
+        til = params.get("tilRegistreringsdatoEnhetsregisteret", "9999")
+        matches = [
+            {
+                **ENHET,
+                "organisasjonsnummer": orgnr,
+                "registreringsdatoEnhetsregisteret": date,
+                "forretningsadresse": {
+                    **ENHET["forretningsadresse"],
+                    "kommunenummer": kommunenummer,
+                },
+            }
+            for orgnr, kommunenummer, date in self.register
+            if kommunenummer in kommunenumre and fra <= date <= til
+        ]
+        return httpx2.Response(
+            200,
+            json={
+                "_embedded": {"enheter": matches[page * size : (page + 1) * size]},
+                "page": {
+                    "size": size,
+                    "totalElements": len(matches),
+                    "totalPages": -(-len(matches) // size),
+                    "number": page,
+                },
+            },
+        )
+
+
+QUERY = EnhetQuery(
+    kommunenummer=["0301", "4601", "5001"],
+    fra_registreringsdato_enhetsregisteret=dt.date(2020, 1, 1),
+    til_registreringsdato_enhetsregisteret=dt.date(2020, 12, 31),
+    size=2,
+)
+
+
+@pytest.fixture
+def window(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("brreg.enhetsregisteret._client.SEARCH_WINDOW", 4)
+
+
+@pytest.mark.usefixtures("window")
+def test_cursor_is_truncated_to_the_search_window() -> None:
+    client = Client(transport=httpx2.MockTransport(MockApi(REGISTER, window=4)))
+
+    cursor = client.search_enhet(QUERY)
+
+    assert cursor.truncated
+    assert cursor.page_numbers == range(2)
+    assert len(list(cursor.items)) == 4
+
+
+def test_cursor_is_not_truncated_by_default() -> None:
+    client = Client(transport=httpx2.MockTransport(MockApi(REGISTER, window=10_000)))
+
+    cursor = client.search_enhet(QUERY)
+
+    assert not cursor.truncated
+    assert cursor.page_numbers == range(4)
+
+
+@pytest.mark.usefixtures("window")
+def test_search_all_splits_the_query() -> None:
+    api = MockApi(REGISTER, window=4)
+    client = Client(transport=httpx2.MockTransport(api))
+
+    enheter = list(client.search_all_enheter(QUERY, max_workers=2))
+
+    assert sorted(enhet.organisasjonsnummer for enhet in enheter) == [
+        f"10000000{i}" for i in range(1, 8)
+    ]
+    # The kommunenummer are split first, and then the registration dates.
+    assert {
+        (
+            query["kommunenummer"],
+            query["fraRegistreringsdatoEnhetsregisteret"],
+            query["tilRegistreringsdatoEnhetsregisteret"],
+        )
+        for query in api.queries
+        if "page" not in query
+    } == {
+        ("0301,4601,5001", "2020-01-01", "2020-12-31"),
+        ("0301", "2020-01-01", "2020-12-31"),
+        ("4601,5001", "2020-01-01", "2020-12-31"),
+        ("0301", "2020-01-01", "2020-07-01"),
+        ("0301", "2020-07-02", "2020-12-31"),
+    }
+
+
+def test_search_all_fits_in_one_search() -> None:
+    api = MockApi(REGISTER, window=10_000)
+    client = Client(transport=httpx2.MockTransport(api))
+
+    enheter = list(client.search_all_enheter(QUERY.model_copy(update={"page": 3})))
+
+    assert len(enheter) == 7
+    assert [query.get("page") for query in api.queries] == [None, "1", "2", "3"]
+    assert api.queries[0]["size"] == "2"
+
+
+@pytest.mark.usefixtures("window")
+def test_search_all_fails_if_the_query_can_not_be_split() -> None:
+    register = [(f"20000000{i}", "0301", "2020-01-10") for i in range(5)]
+    client = Client(transport=httpx2.MockTransport(MockApi(register, window=4)))
+
+    with pytest.raises(BrregError, match="Can not get all 5 results"):
+        list(client.search_all_enheter(QUERY))
+
+
+def test_search_all_with_no_workers() -> None:
+    with pytest.raises(ValueError, match="max_workers must be at least 1"):
+        list(Client().search_all_enheter(QUERY, max_workers=0))
+
+
+def test_search_all_underenheter() -> None:
+    def handler(request: httpx2.Request) -> httpx2.Response:
+        assert request.url.params["size"] == "1000"
+        return httpx2.Response(
+            200,
+            content=(DATA_DIR / "underenheter-search-response.json").read_bytes(),
+        )
+
+    client = Client(transport=httpx2.MockTransport(handler))
+
+    underenheter = list(client.search_all_underenheter(UnderenhetQuery()))
+
+    assert len(underenheter) == 1
+
+
+def test_split_query_without_dates() -> None:
+    queries = split_query(EnhetQuery(kommunenummer=["0301"]))
+
+    assert queries is not None
+    first, second = queries
+    assert first.fra_registreringsdato_enhetsregisteret == dt.date(1800, 1, 1)
+    assert second.til_registreringsdato_enhetsregisteret is not None
+    assert second.til_registreringsdato_enhetsregisteret > dt.date.today()  # noqa: DTZ011
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+@pytest.mark.usefixtures("window")
+async def test_async_search_all_splits_the_query() -> None:
+    api = MockApi(REGISTER, window=4)
+
+    async with AsyncClient(transport=httpx2.MockTransport(api)) as client:
+        cursor = await client.search_enhet(QUERY)
+        enheter = [
+            enhet async for enhet in client.search_all_enheter(QUERY, max_concurrency=2)
+        ]
+
+    assert cursor.truncated
+    assert cursor.page_numbers == range(2)
+    assert len(enheter) == 7
+    assert len({enhet.organisasjonsnummer for enhet in enheter}) == 7
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+@pytest.mark.usefixtures("window")
+async def test_async_search_all_fails_if_the_query_can_not_be_split() -> None:
+    register = [(f"20000000{i}", "0301", "2020-01-10") for i in range(5)]
+
+    async with AsyncClient(
+        transport=httpx2.MockTransport(MockApi(register, window=4)),
+    ) as client:
+        with pytest.raises(BrregError, match="Can not get all 5 results"):
+            [enhet async for enhet in client.search_all_enheter(QUERY)]
+        with pytest.raises(ValueError, match="max_concurrency must be at least 1"):
+            [
+                enhet
+                async for enhet in client.search_all_underenheter(
+                    UnderenhetQuery(),
+                    max_concurrency=0,
+                )
+            ]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+@pytest.mark.usefixtures("window")
+async def test_async_search_all_cancels_searches_when_closed() -> None:
+    api = MockApi(REGISTER, window=4)
+    released = asyncio.Event()
+
+    async def handler(request: httpx2.Request) -> httpx2.Response:
+        if request.url.params.get("kommunenummer") == "0301":
+            await released.wait()
+        return api(request)
+
+    async with AsyncClient(transport=httpx2.MockTransport(handler)) as client:
+        enheter = client.search_all_enheter(QUERY)
+        enhet = await anext(enheter)
+        await enheter.aclose()  # type: ignore[attr-defined]
+
+    assert enhet.organisasjonsnummer == "100000006"
+    assert [query["kommunenummer"] for query in api.queries if "page" not in query] == [
+        "0301,4601,5001",
+        "4601,5001",
+    ]
@@ -2,6 +2,8 @@ from datetime import date
 from pathlib import Path
 
 import httpx2
+import pytest
+from pydantic import ValidationError
 from pytest_httpx2 import HTTPXMock
 
 import brreg
@@ -31,6 +33,30 @@ def test_enhet_query() -> None:
     )
 
 
+def test_enhet_query_is_hashable() -> None:
+    query = enhetsregisteret.EnhetQuery(kommunenummer=["0301", "4601"])
+
+    assert query.kommunenummer == ("0301", "4601")
+    assert hash(query) == hash(
+        enhetsregisteret.EnhetQuery(kommunenummer=("0301", "4601")),
+    )
+    with pytest.raises(ValidationError, match="Instance is frozen"):
+        query.navn = "Sesam"  # pyright: ignore[reportAttributeAccessIssue]
+
+
+def test_enhet_query_copies() -> None:
+    query = enhetsregisteret.EnhetQuery(sort="ASC", navn="Sesam", size=10)
+    assert query.as_url_query() == "sort=ASC&size=10&navn=Sesam"
+
+    page = query.model_copy(update={"page": 2})
+    assert page.as_url_query() == "sort=ASC&size=10&page=2&navn=Sesam"
+    assert page.page == 2
+
+    other = query.model_copy(update={"navn": "Rema", "sort": None})
+    assert other.as_url_query() == "size=10&navn=Rema"
+    assert query.as_url_query() == "sort=ASC&size=10&navn=Sesam"
+
+
 def test_search_enhet(httpx_mock: HTTPXMock) -> None:
     httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
         method="GET",
@@ -19,7 +19,7 @@ def test_underenhet_query() -> None:
 
     assert query.navn == "Sesam"
     assert query.fra_registreringsdato_enhetsregisteret == date(2015, 1, 1)
-    assert query.naeringskode == ["90.012", "90.013"]
+    assert query.naeringskode == ("90.012", "90.013")
 
     assert query.as_url_query() == (
         "navn=Sesam"
@@ -0,0 +1,183 @@
+from pathlib import Path
+
+import httpx2
+import pytest
+from pytest_httpx2 import HTTPXMock
+
+from brreg import BrregRestError
+from brreg.enhetsregisteret import AdaptiveLimiter, AsyncClient, Client, RetryPolicy
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+BASE_URL = "https://data.brreg.no/enhetsregisteret/api"
+
+
+def enhet_handler(request: httpx2.Request) -> httpx2.Response:
+    assert request.url == f"{BASE_URL}/enheter/112233445"
+    return httpx2.Response(
+        200,
+        headers={"content-type": "application/json"},
+        content=(DATA_DIR / "enheter-details-response.json").read_bytes(),
+    )
+
+
+def add_index(httpx_mock: HTTPXMock, status_code: int = 200) -> None:
+    httpx_mock.add_response(  # pyright: ignore[reportUnknownMemberType]
+        method="GET",
+        url=f"{BASE_URL}/",
+        status_code=status_code,
+        is_reusable=True,
+    )
+
+
+def test_custom_transport() -> None:
+    client = Client(transport=httpx2.MockTransport(enhet_handler))
+
+    enhet = client.get_enhet("112233445")
+
+    assert enhet is not None
+    assert enhet.navn == "SESAM STASJON"
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"http2": True}, {"limits": httpx2.Limits(max_connections=10)}],
+)
+def test_custom_transport_with_transport_options(kwargs: dict[str, object]) -> None:
+    with pytest.raises(ValueError, match="custom transport"):
+        Client(transport=httpx2.MockTransport(enhet_handler), **kwargs)  # type: ignore[arg-type]
+
+
+def test_transport_options(httpx_mock: HTTPXMock) -> None:
+    add_index(httpx_mock)
+    timeout = httpx2.Timeout(10, connect=2)
+
+    with Client(
+        limits=httpx2.Limits(max_connections=10, keepalive_expiry=30),
+        timeout=timeout,
+        http2=True,
+    ) as client:
+        client.warm_up()
+
+    (request,) = httpx_mock.get_requests()  # pyright: ignore[reportUnknownMemberType]
+    assert request.extensions["timeout"] == timeout.as_dict()
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"retry": RetryPolicy()}, {"limiter": AdaptiveLimiter()}],
+)
+def test_proxies_from_environment(
+    monkeypatch: pytest.MonkeyPatch,
+    kwargs: dict[str, object],
+) -> None:
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example:3128")
+    monkeypatch.setenv("NO_PROXY", "localhost")
+
+    with Client(**kwargs) as client:  # type: ignore[arg-type]
+        http = client._client  # noqa: SLF001
+        mounts = {pattern.pattern: t for pattern, t in http._mounts.items()}  # noqa: SLF001
+        transport = http._transport_for_url(httpx2.URL(BASE_URL))  # noqa: SLF001
+
+    assert "https://" in mounts
+    # The proxy transport is wrapped like the default transport:
+    assert transport is mounts["https://"]
+    assert type(transport) is type(http._transport)  # noqa: SLF001
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"retry": RetryPolicy()}])
+@pytest.mark.parametrize("no_proxy", ["data.brreg.no", ".brreg.no", "*"])
+def test_no_proxy_for_the_api(
+    monkeypatch: pytest.MonkeyPatch,
+    kwargs: dict[str, object],
+    no_proxy: str,
+) -> None:
+    monkeypatch.setenv("HTTP_PROXY", "proxy.example:3128")
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example:3128")
+    monkeypatch.setenv("NO_PROXY", no_proxy)
+
+    with Client(**kwargs) as client:  # type: ignore[arg-type]
+        http = client._client  # noqa: SLF001
+        transport = http._transport_for_url(httpx2.URL(BASE_URL))  # noqa: SLF001
+
+    assert transport is http._transport  # noqa: SLF001
+
+
+def test_all_proxy_without_scheme(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("ALL_PROXY", "proxy.example:3128")
+
+    with Client(retry=RetryPolicy()) as client:
+        http = client._client  # noqa: SLF001
+        mounts = {pattern.pattern for pattern in http._mounts}  # noqa: SLF001
+
+    assert mounts == {"http://", "https://"}
+
+
+def test_custom_transport_ignores_proxies_from_environment(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example:3128")
+
+    with Client(transport=httpx2.MockTransport(enhet_handler)) as client:
+        assert client._client._mounts == {}  # noqa: SLF001
+
+
+def test_warm_up_opens_connections(httpx_mock: HTTPXMock) -> None:
+    add_index(httpx_mock, status_code=404)
+
+    Client().warm_up(connections=3)
+
+    assert len(httpx_mock.get_requests()) == 3  # pyright: ignore[reportUnknownMemberType]
+
+
+def test_warm_up_errors(httpx_mock: HTTPXMock) -> None:
+    httpx_mock.add_exception(httpx2.ConnectError("Connection refused"))  # pyright: ignore[reportUnknownMemberType]
+
+    with pytest.raises(BrregRestError, match="Connection refused"):
+        Client().warm_up()
+
+
+def test_warm_up_with_no_connections() -> None:
+    with pytest.raises(ValueError, match="connections must be at least 1"):
+        Client().warm_up(connections=0)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_custom_transport() -> None:
+    async with AsyncClient(transport=httpx2.MockTransport(enhet_handler)) as client:
+        enhet = await client.get_enhet("112233445")
+
+    assert enhet is not None
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"retry": RetryPolicy()}, {"limiter": AdaptiveLimiter()}],
+)
+async def test_async_proxies_from_environment(
+    monkeypatch: pytest.MonkeyPatch,
+    kwargs: dict[str, object],
+) -> None:
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example:3128")
+
+    async with AsyncClient(**kwargs) as client:  # type: ignore[arg-type]
+        http = client._client  # noqa: SLF001
+        transport = http._transport_for_url(httpx2.URL(BASE_URL))  # noqa: SLF001
+
+    assert transport is not http._transport  # noqa: SLF001
+    assert type(transport) is type(http._transport)  # noqa: SLF001
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_async_warm_up(httpx_mock: HTTPXMock) -> None:
+    add_index(httpx_mock)
+
+    async with AsyncClient(http2=True, timeout=None) as client:
+        await client.warm_up(connections=2)
+
+    requests = httpx_mock.get_requests()  # pyright: ignore[reportUnknownMemberType]
+    assert len(requests) == 2
+    assert requests[0].extensions["timeout"] == httpx2.Timeout(None).as_dict()
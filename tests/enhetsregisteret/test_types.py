@@ -1,6 +1,7 @@
 import pytest
 
 from brreg.enhetsregisteret import (
+    CheckedOrganisasjonsnummerValidator,
     KommunenummerValidator,
     OrganisasjonsnummerValidator,
     SektorkodeValidator,
@@ -70,6 +71,33 @@ def test_organisasjonsnummer(
             assert OrganisasjonsnummerValidator.validate_python(value)
 
 
+@pytest.mark.parametrize(
+    ("value", "expected", "error"),
+    [
+        ("974760673", "974760673", None),
+        ("923 609 016", "923609016", None),
+        (974760673, "974760673", None),
+        # Check digit 0, from a remainder of 0
+        ("811176680", "811176680", None),
+        ("974760674", None, "Organisasjonsnummer has an invalid check digit"),
+        # No valid check digit, from a remainder of 1
+        ("112233445", None, "Organisasjonsnummer has an invalid check digit"),
+        ("aaabbbccc", None, r"String should match pattern '\^\\d\{9\}\$'"),
+    ],
+)
+def test_checked_organisasjonsnummer(
+    value: str,
+    expected: str | None,
+    error: str | None,
+) -> None:
+    if expected:
+        assert CheckedOrganisasjonsnummerValidator.validate_python(value) == expected
+
+    if error:
+        with pytest.raises(ValueError, match=error):
+            assert CheckedOrganisasjonsnummerValidator.validate_python(value)
+
+
 @pytest.mark.parametrize(
     ("value", "expected", "error"),
     [
@@ -0,0 +1,120 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+import numpy as np
+
+from brreg.enhetsregisteret import (
+    CheckedOrganisasjonsnummerValidator,
+    validate_organisasjonsnumre,
+)
+
+
+def is_valid(value: int) -> bool:
+    try:
+        CheckedOrganisasjonsnummerValidator.validate_python(value)
+    except ValueError:
+        return False
+    return True
+
+
+def test_validate_strings() -> None:
+    valid, normalized = validate_organisasjonsnumre(
+        [
+            "974760673",
+            "923 609 016",
+            "12345674",
+            "974760674",
+            "112233445",
+            "aaabbbccc",
+            "9747606730",
+            "",
+        ],
+    )
+
+    assert valid.tolist() == [True, True, True, False, False, False, False, False]
+    assert normalized.tolist() == [
+        "974760673",
+        "923609016",
+        "012345674",
+        "",
+        "",
+        "",
+        "",
+        "",
+    ]
+
+
+def test_validate_integers() -> None:
+    result = validate_organisasjonsnumre(
+        np.array([974760673, 12345674, 974760674, -974760673, 9747606730]),
+    )
+
+    assert result.valid.tolist() == [True, True, False, False, False]
+    assert result.normalized.tolist() == ["974760673", "012345674", "", "", ""]
+
+
+def test_validate_floats() -> None:
+    result = validate_organisasjonsnumre(
+        np.array([974760673.0, 12345674.0, 974760673.5, np.nan, np.inf]),
+    )
+
+    assert result.valid.tolist() == [True, True, False, False, False]
+    assert result.normalized.tolist() == ["974760673", "012345674", "", "", ""]
+
+
+def test_validate_pandas_integers_with_missing_values() -> None:
+    pd = pytest.importorskip("pandas")
+
+    for values in [
+        pd.Series([974760673, None]),
+        pd.Series([974760673, None], dtype="Int64"),
+        pd.array([974760673, None], dtype="Int64"),
+    ]:
+        result = validate_organisasjonsnumre(values)
+
+        assert result.valid.tolist() == [True, False]
+        assert result.normalized.tolist() == ["974760673", ""]
+
+
+def test_validate_pandas_strings() -> None:
+    pd = pytest.importorskip("pandas")
+
+    result = validate_organisasjonsnumre(
+        pd.Series(["974 760 673", None], dtype="string"),
+    )
+
+    assert result.valid.tolist() == [True, False]
+
+
+def test_validate_mixed_and_iterables() -> None:
+    result = validate_organisasjonsnumre(iter([974760673, "923609016", None]))
+
+    assert result.valid.tolist() == [True, True, False]
+
+
+def test_validate_keeps_shape() -> None:
+    result = validate_organisasjonsnumre(np.array([["974760673"], ["x"]]))
+
+    assert result.valid.shape == (2, 1)
+    assert result.normalized.shape == (2, 1)
+
+
+@pytest.mark.parametrize(
+    "values",
+    [[], np.array([], dtype=np.int64), np.array([], dtype=np.str_)],
+)
+def test_validate_empty(values: list[str]) -> None:
+    result = validate_organisasjonsnumre(values)
+
+    assert result.valid.shape == (0,)
+    assert result.normalized.shape == (0,)
+
+
+def test_validate_agrees_with_scalar_validator() -> None:
+    numbers = np.random.default_rng(0).integers(0, 10**9, 10_000)
+
+    result = validate_organisasjonsnumre(numbers)
+
+    expected = [is_valid(number) for number in numbers.tolist()]
+    assert result.valid.tolist() == expected